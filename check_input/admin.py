@@ -1,10 +1,11 @@
 from check_input.models import SuspiciousInput
 from django.contrib import admin
-from django.contrib.contenttypes.models import ContentType
 
 
 class SuspiciousInputAdmin(admin.ModelAdmin):
-    list_display = ("text", "user", "get_app")
+    list_display = ("text", "user", "get_app", "status")
+    list_filter = ("status",)
+    list_select_related = ("user", "content_type")
     readonly_fields = (
         "text",
         "user",
@@ -16,7 +17,7 @@ class SuspiciousInputAdmin(admin.ModelAdmin):
     )
 
     def get_app(self, obj):
-        app = ContentType.objects.get_for_id(obj.content_type_id)
+        app = obj.content_type
 
         return "%s/%s" % (app.app_label, app.name)
 
@@ -0,0 +1,111 @@
+"""Search the stored user input for spam.
+
+Useful after the anti spam keywords were extended. The objects are read in
+chunks ordered by id, so the memory use is bounded. Per kind of input the
+number of hits and the throughput are reported.
+
+"""
+
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+
+from check_input import spam
+from check_input.models import SuspiciousInput
+from pybb.models import Post, Topic
+from threadedcomments.models import ThreadedComment
+from wiki.models import Article, ChangeSet
+
+# Name, model, field with the text and field with the id of the user
+SOURCES = [
+    ("topics", Topic, "name", "user_id"),
+    ("posts", Post, "body", "user_id"),
+    ("comments", ThreadedComment, "comment", "user_id"),
+    ("wiki", Article, "content", "creator_id"),
+    ("wikiedits", ChangeSet, "comment", "editor_id"),
+]
+
+
+class Command(BaseCommand):
+    help = "Search forum posts, comments and the wiki for spam."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sources",
+            nargs="*",
+            help="Only search these kinds of input: %s."
+            % ", ".join(s[0] for s in SOURCES),
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Objects read per query."
+        )
+        parser.add_argument(
+            "--record",
+            action="store_true",
+            help="Store the hits as suspicious input, like new spam.",
+        )
+
+    def _chunks(self, model, text_field, user_field, size):
+        last = 0
+        while True:
+            rows = list(
+                model.objects.filter(pk__gt=last)
+                .order_by("pk")
+                .values_list("pk", user_field, text_field)[:size]
+            )
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    def _record(self, model, hits):
+        """Store the hits which aren't stored yet."""
+        content_type = ContentType.objects.get_for_model(model)
+        known = set(
+            SuspiciousInput.objects.filter(
+                content_type=content_type, object_id__in=[h[0] for h in hits]
+            ).values_list("object_id", flat=True)
+        )
+        max_chars = SuspiciousInput._meta.get_field("text").max_length
+        SuspiciousInput.objects.bulk_create(
+            SuspiciousInput(
+                content_type=content_type,
+                object_id=pk,
+                user_id=user_id,
+                text=text[:max_chars],
+            )
+            for pk, user_id, text in hits
+            if pk not in known and user_id is not None
+        )
+
+    def handle(self, *args, **options):
+        sources = options["sources"]
+        unknown = set(sources) - set(s[0] for s in SOURCES)
+        if unknown:
+            raise CommandError("Unknown input: %s" % ", ".join(sorted(unknown)))
+        for name, model, text_field, user_field in SOURCES:
+            if sources and name not in sources:
+                continue
+            start = time.monotonic()
+            scanned = found = 0
+            for rows in self._chunks(
+                model, text_field, user_field, options["chunk_size"]
+            ):
+                hits = []
+                for i, match in spam.scan(row[2] for row in rows):
+                    hits.append(rows[i])
+                    if options["verbosity"] > 1:
+                        self.stdout.write(
+                            "%s %d: %r" % (model._meta.label_lower, rows[i][0], match)
+                        )
+                if hits and options["record"]:
+                    self._record(model, hits)
+                scanned += len(rows)
+                found += len(hits)
+
+            elapsed = time.monotonic() - start
+            self.stdout.write(
+                "%s: %d scanned, %d spam, %.1fs (%d per second)"
+                % (name, scanned, found, elapsed, scanned / elapsed if elapsed else 0)
+            )
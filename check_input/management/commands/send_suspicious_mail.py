@@ -1,27 +1,42 @@
 from django.core.management.base import BaseCommand
-from check_input.models import SuspiciousInput
 from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from django.urls import reverse
+
+from check_input.models import SuspiciousInput
 
 
 class Command(BaseCommand):
-    help = "Send email if suspicious content is found"
+    help = "Send email if suspicious content is waiting for a review"
 
     def handle(self, *args, **options):
-        spams = SuspiciousInput.objects.all()
-        if spams:
-            message = "There were %d hidden posts found:" % len(spams)
+        pending = SuspiciousInput.objects.pending()
+        counts = (
+            pending.values("content_type__app_label", "content_type__model")
+            .annotate(count=Count("id"))
+            .order_by("content_type__app_label", "content_type__model")
+        )
+        if counts:
+            message = "There were %d hidden posts found:" % sum(
+                c["count"] for c in counts
+            )
+            for c in counts:
+                message += "\n %s/%s: %d" % (
+                    c["content_type__app_label"],
+                    c["content_type__model"],
+                    c["count"],
+                )
 
-            for spam in spams:
-                app = ContentType.objects.get_for_id(spam.content_type_id)
+            for spam in pending.select_related("user", "content_type").order_by("id"):
+                app = spam.content_type
                 message += "\nIn %s/%s: " % (app.app_label, app.model)
                 message += "\n User '%s' wrote: %s" % (spam.user, spam.text)
 
-            message += (
-                "\n\nAdmin page: https://%s/admin/pybb/post/"
-                % Site.objects.get_current().domain
+            message += "\n\nModeration queue: https://%s%s" % (
+                Site.objects.get_current().domain,
+                reverse("moderation_queue"),
             )
             recipients = [addr[1] for addr in settings.ADMINS]
             send_mail(
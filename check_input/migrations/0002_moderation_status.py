@@ -0,0 +1,52 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:53
+
+from django.db import migrations, models
+
+
+def approve_visible(apps, schema_editor):
+    """Input in posts and topics which are shown was approved already."""
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    SuspiciousInput = apps.get_model("check_input", "SuspiciousInput")
+    Post = apps.get_model("pybb", "Post")
+    for model, visible in (
+        ("post", Post.objects.filter(hidden=False).values("pk")),
+        ("topic", Post.objects.filter(hidden=False).values("topic_id")),
+    ):
+        try:
+            content_type = ContentType.objects.get(app_label="pybb", model=model)
+        except ContentType.DoesNotExist:
+            continue
+        SuspiciousInput.objects.filter(
+            content_type=content_type, object_id__in=visible
+        ).update(status=1)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("check_input", "0001_initial"),
+        ("pybb", "0006_auto_20221208_1825"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="suspiciousinput",
+            name="status",
+            field=models.PositiveSmallIntegerField(
+                choices=[(0, "pending"), (1, "no spam"), (2, "spam")], default=0
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="suspiciousinput",
+            index=models.Index(
+                fields=["content_type", "object_id", "status"],
+                name="check_input_content_46d6e5_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="suspiciousinput",
+            index=models.Index(
+                fields=["status", "-id"], name="check_input_status_63e502_idx"
+            ),
+        ),
+        migrations.RunPython(approve_visible, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,22 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
-from django.conf import settings
-import re
+
+from check_input import spam
+
+
+class SuspiciousInputQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(status=SuspiciousInput.PENDING)
+
+    def for_objects(self, *objects):
+        """Filter the input found in any of objects."""
+        query = models.Q(pk__in=[])
+        for obj in objects:
+            query |= models.Q(
+                content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+            )
+        return self.filter(query)
 
 
 class SuspiciousInput(models.Model):
@@ -30,12 +44,28 @@ class SuspiciousInput(models.Model):
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey("content_type", "object_id")
 
+    PENDING = 0
+    APPROVED = 1
+    REJECTED = 2
+    STATUS_CHOICES = (
+        (PENDING, "pending"),
+        (APPROVED, "no spam"),
+        (REJECTED, "spam"),
+    )
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=PENDING)
+
+    objects = SuspiciousInputQuerySet.as_manager()
+
     class Meta:
         ordering = ["content_type_id"]
         default_permissions = (
             "change",
             "delete",
         )
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "status"]),
+            models.Index(fields=["status", "-id"]),
+        ]
 
     def __str__(self):
         return self.text
@@ -49,11 +79,7 @@ class SuspiciousInput(models.Model):
             self.text = self.text[:max_chars]
 
     def is_suspicious(self):
-        if any(x in self.text.lower() for x in settings.ANTI_SPAM_KWRDS):
-            return True
-        if re.search(settings.ANTI_SPAM_PHONE_NR, self.text):
-            return True
-        return False
+        return spam.is_spam(self.text)
 
     @classmethod
     def check_input(cls, *args, **kwargs):
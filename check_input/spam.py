@@ -0,0 +1,54 @@
+"""Spam detection for user input.
+
+A text is spam if it contains one of the ANTI_SPAM_KWRDS, regardless of
+case, or matches ANTI_SPAM_PHONE_NR. The keywords are compiled once into a
+single regular expression, which is compiled again when the settings
+change.
+
+"""
+
+import re
+
+from django.conf import settings
+
+# (settings the matchers were compiled from, keyword matcher, phone matcher)
+_compiled = (None, None, None)
+
+
+def _matchers():
+    global _compiled
+    keywords = tuple(settings.ANTI_SPAM_KWRDS)
+    phone_nr = settings.ANTI_SPAM_PHONE_NR
+    compiled = _compiled
+    if compiled[0] != (keywords, phone_nr):
+        keyword_re = None
+        if keywords:
+            # Longest first, so the reported match is the whole keyword
+            alternatives = sorted(set(keywords), key=len, reverse=True)
+            keyword_re = re.compile("|".join(map(re.escape, alternatives)))
+        phone_re = re.compile(phone_nr) if phone_nr else None
+        compiled = _compiled = ((keywords, phone_nr), keyword_re, phone_re)
+    return compiled[1:]
+
+
+def scan(texts):
+    """Yield (index, spam) for the texts containing spam."""
+    keyword_re, phone_re = _matchers()
+    for i, text in enumerate(texts):
+        # The keywords are searched in the lowercased text
+        found = keyword_re and keyword_re.search(text.lower())
+        if not found and phone_re:
+            found = phone_re.search(text)
+        if found:
+            yield i, found.group(0)
+
+
+def match(text):
+    """Return the spam found in text, or None."""
+    for i, found in scan([text]):
+        return found
+    return None
+
+
+def is_spam(text):
+    return match(text) is not None
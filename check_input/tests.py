@@ -0,0 +1,119 @@
+import io
+import re
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from check_input import spam, views
+from check_input.models import SuspiciousInput
+from pybb.models import Category, Forum, Post, Topic
+from threadedcomments.models import ThreadedComment
+from wiki.models import Article
+
+
+@override_settings(
+    ANTI_SPAM_KWRDS=["spam", "cheap pills"], ANTI_SPAM_PHONE_NR=re.compile(r"\d{8,16}")
+)
+class TestSpam_Scan_ExceptCorrectResult(TestCase):
+    def runTest(self):
+        self.assertEqual(spam.match("Buy CHEAP PILLS now"), "cheap pills")
+        self.assertEqual(spam.match("Call 0123456789"), "0123456789")
+        self.assertIsNone(spam.match("A friendly post"))
+        self.assertEqual(list(spam.scan(["ok", "Spam!", "ok too"])), [(1, "spam")])
+
+        # Changed settings are picked up
+        with self.settings(ANTI_SPAM_KWRDS=["eggs"], ANTI_SPAM_PHONE_NR=""):
+            self.assertFalse(spam.is_spam("spam 0123456789"))
+            self.assertTrue(spam.is_spam("Ham and eggs"))
+        self.assertTrue(spam.is_spam("spam"))
+
+
+@override_settings(ANTI_SPAM_KWRDS=["spam"], ANTI_SPAM_PHONE_NR="")
+class TestRescanSpam_RecordsHitsOnce_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("spammer", "spammer@example.com", "pw")
+        article = Article.objects.create(title="Page", content="Some spam")
+        for i in range(5):
+            ThreadedComment.objects.create(
+                content_object=article,
+                user=self.user,
+                comment="spam" if i % 2 else "Nice page",
+            )
+
+    def runTest(self):
+        out = io.StringIO()
+        call_command("rescan_spam", "comments", "wiki", chunk_size=2, stdout=out)
+        self.assertIn("comments: 5 scanned, 2 spam", out.getvalue())
+        self.assertIn("wiki: 1 scanned, 1 spam", out.getvalue())
+        self.assertFalse(SuspiciousInput.objects.exists())
+
+        for i in range(2):
+            call_command("rescan_spam", "comments", record=True, stdout=out)
+        self.assertEqual(SuspiciousInput.objects.filter(user=self.user).count(), 2)
+
+
+class TestModerationQueue_ExceptCorrectResult(TestCase):
+    @override_settings(ANTI_SPAM_KWRDS=["spam"], ANTI_SPAM_PHONE_NR="")
+    def setUp(self):
+        self.user = User.objects.create_user("spammer", "spammer@example.com", "pw")
+        category = Category.objects.create(name="General")
+        forum = Forum.objects.create(category=category, name="Talk")
+        self.topic = Topic.objects.create(forum=forum, name="Topic", user=self.user)
+        self.posts = [
+            Post.objects.create(
+                topic=self.topic, user=self.user, body="Post %d" % i, hidden=True
+            )
+            for i in range(3)
+        ]
+        for post in self.posts:
+            SuspiciousInput.check_input(
+                content_object=post, user=self.user, text="spam"
+            )
+        self.moderator = User.objects.create_superuser(
+            "moderator", "moderator@example.com", "pw"
+        )
+
+    @override_settings(ADMINS=[("Admin", "admin@example.com")])
+    def runTest(self):
+        self.assertTrue(self.posts[0].is_spam())
+        # Input found in a topic doesn't belong to the post with the same id
+        SuspiciousInput.objects.update(
+            content_type=ContentType.objects.get_for_model(Topic)
+        )
+        self.assertFalse(self.posts[0].is_spam())
+        SuspiciousInput.objects.update(
+            content_type=ContentType.objects.get_for_model(Post)
+        )
+
+        self.posts[0].unhide_post()
+        self.assertFalse(self.posts[0].is_spam())
+        self.assertEqual(SuspiciousInput.objects.pending().count(), 2)
+
+        self.client.force_login(self.moderator)
+        url = reverse("moderation_queue")
+        with mock.patch.object(views, "QUEUE_PAGE_SIZE", 1):
+            response = self.client.get(url)
+            self.assertEqual(
+                [i.object_id for i in response.context["items"]], [self.posts[2].pk]
+            )
+            response = self.client.get(url, {"before": response.context["next_cursor"]})
+            self.assertEqual(
+                [i.object_id for i in response.context["items"]], [self.posts[1].pk]
+            )
+            self.assertIsNone(response.context["next_cursor"])
+
+        response = self.client.post(url, {"items": ["1x"], "action": "approve"})
+        self.assertEqual(response.status_code, 400)
+        pk = SuspiciousInput.objects.get(object_id=self.posts[1].pk).pk
+        self.client.post(url, {"items": [pk], "action": "approve"})
+        self.posts[1].refresh_from_db()
+        self.assertFalse(self.posts[1].hidden)
+
+        call_command("send_suspicious_mail")
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("pybb/post: 1", mail.outbox[0].body)
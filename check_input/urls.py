@@ -3,4 +3,5 @@ from check_input import views
 
 urlpatterns = [
     url(r"^$", views.moderate_info, name="found_spam"),
+    url(r"^queue/$", views.moderation_queue, name="moderation_queue"),
 ]
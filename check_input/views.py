@@ -1,18 +1,30 @@
 from django.shortcuts import render
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponseRedirect
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+)
+from django.contrib.auth.decorators import login_required
 from django.conf import settings
 from django.contrib.auth import logout
 from django.contrib.auth.models import User
 from check_input.models import SuspiciousInput
 
+QUEUE_PAGE_SIZE = 50
+
 
 def moderate_info(request):
     """Redirect to the moderate comments info page."""
 
     # We need the try to catch logged out users
     try:
-        hidden_posts_count = SuspiciousInput.objects.filter(user=request.user).count()
+        hidden_posts_count = (
+            SuspiciousInput.objects.filter(user=request.user)
+            .exclude(status=SuspiciousInput.APPROVED)
+            .count()
+        )
     except TypeError:
         return HttpResponseRedirect("/")
 
@@ -33,3 +45,53 @@ def moderate_info(request):
         "act_count": hidden_posts_count,
     }
     return render(request, "check_input/moderate_info.html", context=context)
+
+
+def _approve(items):
+    """Show the hidden posts of items again."""
+    for item in items:
+        obj = item.content_object
+        if item.content_type.model == "topic" and obj is not None:
+            obj = obj.posts.first()
+        if getattr(obj, "hidden", False) and hasattr(obj, "unhide_post"):
+            obj.unhide_post()
+
+
+@login_required
+def moderation_queue(request):
+    """Page through the pending suspicious input, newest first."""
+    if not request.user.has_perm("check_input.change_suspiciousinput"):
+        return HttpResponseForbidden()
+
+    pending = SuspiciousInput.objects.pending()
+    if request.method == "POST":
+        try:
+            ids = [int(pk) for pk in request.POST.getlist("items")]
+        except ValueError:
+            return HttpResponseBadRequest()
+        selected = pending.filter(pk__in=ids)
+        if request.POST.get("action") == "approve":
+            _approve(selected.select_related("content_type"))
+            selected.update(status=SuspiciousInput.APPROVED)
+        elif request.POST.get("action") == "reject":
+            selected.update(status=SuspiciousInput.REJECTED)
+        return HttpResponseRedirect(request.get_full_path())
+
+    before = request.GET.get("before")
+    if before:
+        try:
+            pending = pending.filter(pk__lt=int(before))
+        except ValueError:
+            raise Http404
+    items = list(
+        pending.select_related("user", "content_type")
+        .prefetch_related("content_object")
+        .order_by("-id")[: QUEUE_PAGE_SIZE + 1]
+    )
+    context = {
+        "items": items[:QUEUE_PAGE_SIZE],
+        "next_cursor": (
+            items[QUEUE_PAGE_SIZE - 1].pk if len(items) > QUEUE_PAGE_SIZE else None
+        ),
+    }
+    return render(request, "check_input/moderation_queue.html", context=context)
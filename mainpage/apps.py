@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class MainpageConfig(AppConfig):
+    name = "mainpage"
+
+    def ready(self):
+        from mainpage.signals import setup_signals
+
+        setup_signals()
@@ -0,0 +1,97 @@
+"""Conditional GET for content views.
+
+The versions of the page cache tags (see mainpage.page_cache) change with
+every change of the tagged objects. So they are a cheap version of a page,
+which is known before the view runs. The decorator conditional() turns them
+into ETag and Last-Modified headers and answers matching conditional
+requests with 304 Not Modified, without rendering anything.
+
+Pages also depend on the boxes shown on every page and, for logged in
+users, on their unread messages and the topics they have read. Both are
+part of the ETag of pages. Last-Modified is only sent to anonymous
+visitors.
+
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from mainpage import fragments, page_cache
+
+
+def _user_version(user):
+    """Return what a page of a logged in user depends on."""
+    from pybb.models import Read
+
+    unread_messages = user.received_messages.filter(
+        read_at__isnull=True, recipient_deleted_at__isnull=True
+    ).count()
+    last_read = Read.objects.filter(user=user).aggregate(Max("time"))["time__max"]
+    return "%s-%s-%s" % (user.pk, unread_messages, last_read)
+
+
+def conditional(tags_func, page=True):
+    """Decorator making a view conditional.
+
+    tags_func(request, *args, **kwargs) returns the tags of the page, or
+    None if there is nothing to validate, e.g. for a missing object.
+
+    page - False for responses without the boxes of the site and
+           independent of the user, like feeds and sitemaps
+
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            tags = tags_func(request, *args, **kwargs)
+            if not tags:
+                return view(request, *args, **kwargs)
+
+            tags = set(tags)
+            if page:
+                tags.add(fragments.PAGE_TAG)
+            versions = page_cache.versions(tags)
+            page_cache.known_versions(request, versions)
+            parts = ["%s=%r" % item for item in sorted(versions.items())]
+            last_modified = int(max(versions.values()))
+            if page and request.user.is_authenticated:
+                parts.append(_user_version(request.user))
+                last_modified = None
+            etag = '"%s"' % hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    response.setdefault("ETag", etag)
+                    if last_modified:
+                        response.setdefault("Last-Modified", http_date(last_modified))
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def shared(tags_func):
+    """Decorator for views which are the same for everybody, like feeds.
+
+    Conditional requests are answered as with conditional(tags_func,
+    page=False), all others get the response stored by
+    page_cache.shared(tags_func).
+
+    """
+
+    def decorator(view):
+        return conditional(tags_func, page=False)(page_cache.shared(tags_func)(view))
+
+    return decorator
@@ -0,0 +1,78 @@
+"""Cache for the boxes shown on every page.
+
+The navigation and the boxes at the side are the same for most visitors,
+so they are rendered once per audience and shared by all its visitors:
+
+ - "anonymous": visitors who are not logged in
+ - "user": logged in users
+ - "internal": users allowed to see the internal forums
+
+A fragment is fresh for settings.FRAGMENT_CACHE_TIMEOUT seconds. After that
+the first request renders it again, while concurrent requests keep getting
+the stale version for up to settings.FRAGMENT_CACHE_STALE seconds instead
+of rendering it as well. Changes to the shown objects remove the fragments
+at once, see mainpage.signals.
+
+Data which is the same for everybody, like the open polls, is cached in
+the same way with the audience "all".
+
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from mainpage import page_cache
+
+AUDIENCES = ("anonymous", "user", "internal")
+VARIANTS = AUDIENCES + ("all",)
+# Tag purged with every change of a fragment, see mainpage.conditional
+PAGE_TAG = "fragments"
+
+
+def audience(user):
+    """Return the audience of user."""
+    from pybb.util import allowed_for
+
+    if user is None or user.is_anonymous:
+        return "anonymous"
+    if allowed_for(user):
+        return "internal"
+    return "user"
+
+
+def _key(name, audience):
+    return "fragment-%s-%s" % (name, audience)
+
+
+def get(name, audience, render):
+    """Return the fragment name for audience, render() creates it."""
+    key = _key(name, audience)
+    now = time.time()
+    entry = cache.get(key)
+    refreshing = False
+    if entry is not None:
+        fresh_until, value = entry
+        if fresh_until > now:
+            return value
+        # Stale: only one request renders it again
+        refreshing = cache.add(key + "-refresh", True, settings.FRAGMENT_CACHE_TIMEOUT)
+        if not refreshing:
+            return value
+
+    value = render()
+    cache.set(
+        key,
+        (now + settings.FRAGMENT_CACHE_TIMEOUT, value),
+        settings.FRAGMENT_CACHE_TIMEOUT + settings.FRAGMENT_CACHE_STALE,
+    )
+    if refreshing:
+        cache.delete(key + "-refresh")
+    return value
+
+
+def invalidate(*names):
+    """Remove the fragments for all audiences."""
+    cache.delete_many([_key(n, a) for n in names for a in VARIANTS])
+    page_cache.purge(PAGE_TAG)
@@ -0,0 +1,97 @@
+"""Deduplicate uploaded files stored before the content storage was used.
+
+Every file referenced by maps, minimaps, wiki images and forum attachments
+gets hashed and hard linked into the content addressed storage. Files with
+identical content then share one copy on disk. The names in the database
+are left untouched, because e.g. the urls of wiki images are part of the
+article texts.
+
+"""
+
+import hashlib
+import os
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from mainpage.storage import content_storage
+from pybb.models import Attachment
+from wlimages.models import Image
+from wlmaps.models import Map
+
+
+class Command(BaseCommand):
+    help = "Hash uploaded files and store files with the same content only once."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the space which would be reclaimed.",
+        )
+
+    def _legacy_paths(self):
+        for m in Map.objects.only("file", "minimap"):
+            for f in (m.file, m.minimap):
+                if f and not content_storage.owns(f.name):
+                    yield content_storage.path(f.name)
+        for img in Image.objects.only("image"):
+            if img.image and not content_storage.owns(img.image.name):
+                yield content_storage.path(img.image.name)
+        for att in Attachment.objects.only("path"):
+            if not content_storage.owns(att.path):
+                yield att.get_absolute_path()
+
+    @staticmethod
+    def _hash(path):
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _link(self, source, target):
+        """Atomically replace target with a hard link to source."""
+
+        tmp = target + ".dedupe"
+        os.link(source, tmp)
+        os.replace(tmp, target)
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        files = reclaimed = 0
+        seen = set()
+        # Maps the blob names to the first file having this content
+        blobs = {}
+
+        for path in self._legacy_paths():
+            if path in seen or not os.path.isfile(path):
+                continue
+            seen.add(path)
+            files += 1
+
+            ext = os.path.splitext(path)[1].lower()
+            blob = content_storage.path(content_storage.name_for(self._hash(path), ext))
+
+            if blob not in blobs and not os.path.exists(blob):
+                # First file with this content
+                blobs[blob] = path
+                if not dry_run:
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    os.link(path, blob)
+                continue
+
+            if os.path.samefile(path, blobs.get(blob, blob)):
+                continue
+
+            reclaimed += os.path.getsize(path)
+            if not dry_run:
+                self._link(blob, path)
+
+        self.stdout.write(
+            "Checked {} files, {} {}reclaimed.".format(
+                files,
+                filesizeformat(reclaimed),
+                "would be " if dry_run else "",
+            )
+        )
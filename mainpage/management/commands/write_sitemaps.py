@@ -0,0 +1,25 @@
+"""Write the sitemap files served as /sitemap.xml.
+
+Only the shards whose content changed since the last run are rendered
+again, so this can run often, e.g. every hour from cron.
+
+"""
+
+from django.core.management.base import BaseCommand
+
+from mainpage import sitemap_files
+
+
+class Command(BaseCommand):
+    help = "Write the changed parts of the sitemap to SITEMAP_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Write all parts, also the unchanged ones.",
+        )
+
+    def handle(self, *args, **options):
+        written, removed = sitemap_files.write(force=options["force"])
+        self.stdout.write("Wrote %d sitemaps, removed %d." % (written, removed))
@@ -1,3 +1,78 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 
-# Create your models here.
+
+class StoredFileManager(models.Manager):
+    """Counts the references of the files.
+
+    The row of a file is locked while its references are changed and while
+    the file is stored or deleted, so a file is never deleted after a new
+    reference to it was added.
+
+    """
+
+    def _lock(self, name, size):
+        while True:
+            obj = self.get_or_create(name=name, defaults={"size": size})[0]
+            try:
+                return self.select_for_update().get(pk=obj.pk)
+            except self.model.DoesNotExist:
+                # Deleted by _remove() meanwhile
+                continue
+
+    def add_reference(self, name, size):
+        """Add a reference to name.
+
+        The row stays locked until the surrounding transaction is
+        committed, so the file can be stored in the same transaction.
+
+        """
+        with transaction.atomic():
+            obj = self._lock(name, size)
+            self.filter(pk=obj.pk).update(references=F("references") + 1)
+
+    def release(self, name, delete_file):
+        """Remove one reference to name and return the remaining ones.
+
+        If none are left, delete_file(name) is called after the commit.
+
+        """
+        with transaction.atomic():
+            try:
+                obj = self.select_for_update().get(name=name)
+            except self.model.DoesNotExist:
+                return 0
+            if obj.references > 0:
+                obj.references -= 1
+                obj.save(update_fields=["references"])
+            if obj.references == 0:
+                transaction.on_commit(lambda: self._remove(name, delete_file))
+            return obj.references
+
+    def _remove(self, name, delete_file):
+        with transaction.atomic():
+            try:
+                obj = self.select_for_update().get(name=name)
+            except self.model.DoesNotExist:
+                return
+            # Unless a reference was added meanwhile
+            if obj.references == 0:
+                delete_file(name)
+                obj.delete()
+
+
+class StoredFile(models.Model):
+    """A file of the content addressed storage.
+
+    See mainpage.storage.
+
+    """
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveIntegerField()
+    references = models.PositiveIntegerField(default=0)
+
+    objects = StoredFileManager()
+
+    def __str__(self):
+        return self.name
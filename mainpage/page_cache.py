@@ -0,0 +1,269 @@
+"""Full page cache for anonymous visitors.
+
+Views opt in by tagging the request with the objects the page shows::
+
+    page_cache.tag(request, page_cache.tag_for(topic))
+
+or with the decorator page_cache.tagged(...) for fixed tags. Only tagged
+pages are cached, and only for anonymous GET and HEAD requests.
+
+The pages are stored compressed and are keyed by path, query string and
+language. Each tag has a version in the cache, and a page is only served if
+the versions of its tags are unchanged since it was stored. purge(*tags),
+called from the signal handlers in mainpage.signals, changes the versions
+and so removes all pages showing these objects at once. The versions are
+taken when the view tags the page, before it is rendered.
+
+A page is neither served nor stored for requests with pending messages or
+responses setting cookies. Csrf tokens are taken out before storing and
+replaced with a token of the visitor when serving.
+
+Cache hits skip the view. Counters the view would have increased can be
+registered with count_hit().
+
+Responses which are the same for everybody, like feeds, are stored with the
+decorator shared(tags_func) instead, for logged in users as well.
+
+"""
+
+import hashlib
+import re
+import time
+import zlib
+from functools import wraps
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotModified
+from django.middleware.csrf import get_token
+from django.utils.translation import get_language
+
+CSRF_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+# Can't be part of a html page
+CSRF_HOLE = b"\0csrf\0"
+
+
+def tag_for(model, pk=None):
+    """Return the tag for an object, or with pk None for all objects of
+    model.
+
+    model may also be an instance.
+
+    """
+    if not isinstance(model, type):
+        model, pk = model.__class__, model.pk
+    label = model._meta.label_lower
+    return label if pk is None else "%s-%s" % (label, pk)
+
+
+def tag(request, *tags):
+    """Mark the page of request as cacheable, depending on tags.
+
+    The versions of the tags are taken now, before the page is rendered,
+    so a change made meanwhile is not hidden by an old page stored with the
+    new versions.
+
+    """
+    request.page_cache_tags = getattr(request, "page_cache_tags", set()) | set(tags)
+    recorded = getattr(request, "page_cache_versions", None)
+    if recorded is None:
+        # Not a cacheable request, see PageCacheMiddleware
+        return
+    known = getattr(request, "page_cache_known", {})
+    missing = [t for t in tags if t not in recorded and t not in known]
+    found = versions(missing) if missing else {}
+    for t in tags:
+        recorded.setdefault(t, known.get(t, found.get(t)))
+
+
+def known_versions(request, found):
+    """Let tag() use the versions found, which were read before the view
+    ran, e.g. by mainpage.conditional."""
+    request.page_cache_known = dict(getattr(request, "page_cache_known", {}), **found)
+
+
+def tagged(*tags):
+    """Decorator for views which depend only on fixed tags."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            tag(request, *tags)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count_hit(request, obj, field):
+    """Increase field of obj by one also when the page is served from the
+    cache."""
+    request.page_cache_counters = getattr(request, "page_cache_counters", []) + [
+        (obj._meta.label, obj.pk, field)
+    ]
+
+
+def purge(*tags):
+    """Remove the pages depending on any of the tags."""
+    now = time.time()
+    cache.set_many({"page-tag-%s" % t: now for t in tags}, None)
+
+
+def _versions(tags):
+    keys = {"page-tag-%s" % t: t for t in tags}
+    found = cache.get_many(keys)
+    return {keys[k]: v for k, v in found.items()}
+
+
+def versions(tags):
+    """Return a dict of tag: version, the version is the time of the last
+    purge."""
+    found = _versions(tags)
+    missing = [t for t in tags if t not in found]
+    if missing:
+        # Start the versions now. If another request does this first, its
+        # versions are used.
+        now = time.time()
+        for t in missing:
+            cache.add("page-tag-%s" % t, now, None)
+        found = _versions(tags)
+    return found
+
+
+def _key(request, prefix="page"):
+    key = "%s?%s|%s" % (
+        request.path,
+        request.META.get("QUERY_STRING", ""),
+        get_language(),
+    )
+    return "%s-%s" % (prefix, hashlib.md5(key.encode("utf-8")).hexdigest())
+
+
+def shared(tags_func):
+    """Decorator storing the responses of a view which are the same for
+    every user.
+
+    tags_func(request, *args, **kwargs) returns the tags of the response,
+    or None if it shouldn't be stored. A stored response is served until
+    one of its tags is purged, so the view only runs again after a change.
+
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            tags = None
+            if request.method in ("GET", "HEAD"):
+                tags = tags_func(request, *args, **kwargs)
+            if not tags:
+                return view(request, *args, **kwargs)
+
+            key = _key(request, "shared")
+            entry = cache.get(key)
+            if entry is not None and _versions(entry["tags"]) == entry["tags"]:
+                return HttpResponse(
+                    zlib.decompress(entry["body"]), content_type=entry["content_type"]
+                )
+
+            # Taken before rendering, so a change made meanwhile is not
+            # hidden by an old response stored with the new versions
+            current = versions(tags)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                entry = {
+                    "tags": current,
+                    "body": zlib.compress(response.content),
+                    "content_type": response["Content-Type"],
+                }
+                cache.set(key, entry, settings.SHARED_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _cacheable_request(request):
+    return (
+        request.method in ("GET", "HEAD")
+        and request.user.is_anonymous
+        and not len(get_messages(request))
+    )
+
+
+class PageCacheMiddleware(object):
+    """Serves and stores the pages, see above.
+
+    Must be placed after the MessageMiddleware and after the middleware
+    setting security headers, since cache hits don't pass the middleware
+    following this one.
+
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _cacheable_request(request):
+            return self.get_response(request)
+
+        key = _key(request)
+        entry = cache.get(key)
+        if entry is not None and _versions(entry["tags"]) == entry["tags"]:
+            return self._serve(request, entry)
+
+        # Filled by tag()
+        request.page_cache_versions = {}
+        response = self.get_response(request)
+        if request.page_cache_versions and self._cacheable_response(request, response):
+            entry = self._store(request, key, request.page_cache_versions, response)
+            response["ETag"] = entry["etag"]
+        return response
+
+    @staticmethod
+    def _cacheable_response(request, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not response.has_header("Cache-Control")
+            and not len(get_messages(request))
+        )
+
+    @staticmethod
+    def _store(request, key, current, response):
+        body = CSRF_RE.sub(
+            lambda m: m.group(1) + CSRF_HOLE + m.group(2), response.content
+        )
+        entry = {
+            "tags": current,
+            "body": zlib.compress(body),
+            "content_type": response["Content-Type"],
+            # Validators set by the view, see mainpage.conditional
+            "etag": response.get("ETag") or '"%s"' % hashlib.sha1(body).hexdigest(),
+            "last_modified": response.get("Last-Modified"),
+            "counters": getattr(request, "page_cache_counters", []),
+        }
+        cache.set(key, entry, settings.PAGE_CACHE_TIMEOUT)
+        return entry
+
+    @staticmethod
+    def _serve(request, entry):
+        for label, pk, field in entry["counters"]:
+            apps.get_model(label).objects.filter(pk=pk).update(**{field: F(field) + 1})
+
+        if request.META.get("HTTP_IF_NONE_MATCH") == entry["etag"]:
+            response = HttpResponseNotModified()
+        else:
+            body = zlib.decompress(entry["body"])
+            if CSRF_HOLE in body:
+                body = body.replace(CSRF_HOLE, get_token(request).encode("ascii"))
+            response = HttpResponse(body, content_type=entry["content_type"])
+        response["ETag"] = entry["etag"]
+        if entry["last_modified"]:
+            response["Last-Modified"] = entry["last_modified"]
+        return response
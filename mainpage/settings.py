@@ -91,7 +91,7 @@ INSTALLED_APPS = [
     "nocaptcha_recaptcha",
     # Our own apps
     "wiki.templatetags.restructuredtext",
-    "mainpage",
+    "mainpage.apps.MainpageConfig",
     "wlhelp",
     "wlimages",
     "wlwebchat",
@@ -130,6 +130,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # After all middleware setting headers, cache hits skip the following ones
+    "mainpage.page_cache.PageCacheMiddleware",
     "django.contrib.redirects.middleware.RedirectFallbackMiddleware",
     # Foreign middleware
     "dj_pagination.middleware.PaginationMiddleware",
@@ -189,6 +191,22 @@ WIKI_SPECIAL_PAGES = [
 FORBIDDEN_WIKI_TITLES = [
     "trash",
 ]
+# Diff engine for wiki diffs and revisions: "dmp" (diff_match_patch) or
+# "lines" (difflib line diff, refined by diff_match_patch). Compare them
+# on the real wiki with './manage.py benchmark_diff'.
+WIKI_DIFF_ENGINE = "dmp"
+# Seconds a single diff may take, coarser diffs are returned afterwards
+WIKI_DIFF_TIMEOUT = 1.0
+# Characters of text shown in a diff, larger diffs are truncated
+WIKI_DIFF_MAX_SIZE = 200000
+# Seconds rendered diffs between revisions are cached
+WIKI_DIFF_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Recent changes shown per page and in the feeds, and seconds they are cached
+WIKI_RECENT_CHANGES_PER_PAGE = 50
+WIKI_RECENT_CHANGES_CACHE_TIMEOUT = 60
+# Titles resolved to articles kept in each process, and seconds they are kept
+WIKI_TITLE_CACHE_SIZE = 2000
+WIKI_TITLE_CACHE_TIMEOUT = 60
 ######################
 # User configuration #
 ######################
@@ -344,6 +362,25 @@ HAYSTACK_CONNECTIONS = {
 # or for ChangeLog displays
 WIDELANDS_SVN_DIR = ""
 
+#########################
+# Derivatives of images #
+#########################
+# Resized variants of uploaded images, see wlimages.derivatives
+IMAGE_DERIVATIVE_WIDTHS = [80, 160, 320, 640, 1280]
+IMAGE_DERIVATIVE_WORKERS = 2
+IMAGE_DERIVATIVE_TIMEOUT = 30  # Seconds
+# Only images below these directories of MEDIA_ROOT have derivatives. Files
+# in 'cas' are named by the hash of their content.
+IMAGE_DERIVATIVE_SOURCES = [
+    "cas/",
+    "wlimages/",
+    "wlprofile/",
+    "wlscreens/screens/",
+    "wlmaps/minimaps/",
+]
+# Created in advance by: ./manage.py pregenerate_derivatives
+IMAGE_DERIVATIVE_PREGENERATE = [(80, "webp"), (160, "webp")]
+
 ###############
 # Screenshots #
 ###############
@@ -353,6 +390,12 @@ THUMBNAIL_SIZE = (160, 160)
 # Maps #
 ########
 MAPS_PER_PAGE = 10
+# Uploaded maps are processed in background threads by this tool. Set
+# MAP_INGEST_WORKERS to 0 to process uploads within the request. Uploads
+# left over by a restart are processed by 'manage.py process_map_uploads'.
+MAP_INGEST_TOOL = "wl_map_info"
+MAP_INGEST_WORKERS = 2
+MAP_INGEST_TIMEOUT = 120  # Seconds
 
 ##############################################
 ## Recipient(s) who get an email if someone ##
@@ -460,6 +503,33 @@ CACHES = {
     }
 }
 
+##################
+# Fragment cache #
+##################
+# Seconds the navigation and side boxes are served from the cache before
+# they get rendered again, and seconds a stale version may be served
+# meanwhile. See mainpage/fragments.py
+FRAGMENT_CACHE_TIMEOUT = 5 * 60
+FRAGMENT_CACHE_STALE = 60
+
+##############
+# Page cache #
+##############
+# Seconds whole pages are cached for anonymous visitors. Changes of the
+# shown objects remove them earlier, see mainpage/page_cache.py
+PAGE_CACHE_TIMEOUT = 5 * 60
+# Seconds the feeds and other responses which are the same for everybody
+# are kept. They are also replaced as soon as their content changes.
+SHARED_CACHE_TIMEOUT = 24 * 60 * 60
+
+############
+# Sitemaps #
+############
+# Directory the sitemap files are written to by './manage.py write_sitemaps'
+# and the number of ids each of them covers. See mainpage/sitemap_files.py
+SITEMAP_ROOT = os.path.join(BASE_DIR, "media/sitemaps/")
+SITEMAP_SHARD_SIZE = 10000
+
 #########################
 # Notification settings #
 #########################
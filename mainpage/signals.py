@@ -0,0 +1,108 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from star_ratings.models import Rating
+
+from mainpage import fragments, page_cache
+from news.models import Post as NewsPost
+from notification.models import ObservedItem
+from pybb.models import Category, Forum, Post, Topic
+from threadedcomments.models import ThreadedComment
+from wiki.models import Article, ChangeSet
+from wlevents.models import Event
+from wlimages.models import Image
+from wlmaps.models import Map
+from wlpoll.models import Choice, Poll, Vote, invalidate_voted_polls
+
+# Fields of a topic which are not shown in any fragment or page. Saving
+# only these (e.g. when counting a view) keeps the cached versions.
+NON_FRAGMENT_FIELDS = {"views"}
+
+
+def forum_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields and set(update_fields) <= NON_FRAGMENT_FIELDS:
+        return
+    fragments.invalidate("last_posts", "forum_navigation")
+
+    tags = [page_cache.tag_for(Forum)]
+    if sender is Post:
+        tags.append(page_cache.tag_for(Topic, instance.topic_id))
+        try:
+            tags.append(page_cache.tag_for(instance.topic.forum))
+        except Topic.DoesNotExist:
+            pass
+    elif sender is Topic:
+        tags += [
+            page_cache.tag_for(instance),
+            page_cache.tag_for(Forum, instance.forum_id),
+        ]
+    elif sender is Forum:
+        tags.append(page_cache.tag_for(instance))
+    page_cache.purge(*tags)
+
+
+def polls_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    fragments.invalidate("open_polls")
+    try:
+        poll = instance if sender is Poll else instance.poll
+    except Poll.DoesNotExist:
+        return
+    poll.invalidate_results()
+
+
+def vote_deleted(instance, **kwargs):
+    invalidate_voted_polls(instance.user_id)
+    Poll(pk=instance.poll_id).invalidate_results()
+
+
+def events_changed(raw=False, **kwargs):
+    if raw:
+        return
+    fragments.invalidate("events")
+
+
+def object_changed(instance, raw=False, **kwargs):
+    """Purge the pages of an object and the lists of its model."""
+    if raw:
+        return
+    page_cache.purge(
+        page_cache.tag_for(instance), page_cache.tag_for(instance.__class__)
+    )
+
+
+def attachment_changed(instance, raw=False, **kwargs):
+    """Purge the pages of the object a comment, image or rating belongs to."""
+    if raw:
+        return
+    model = ContentType.objects.get_for_id(instance.content_type_id).model_class()
+    if model is not None:
+        page_cache.purge(
+            page_cache.tag_for(model, instance.object_id), page_cache.tag_for(model)
+        )
+
+
+def subscribers_changed(instance, action, **kwargs):
+    if action.startswith("post_") and isinstance(instance, Topic):
+        page_cache.purge(page_cache.tag_for(instance))
+
+
+def setup_signals():
+    for model in (Post, Topic, Forum, Category):
+        post_save.connect(forum_changed, sender=model)
+        post_delete.connect(forum_changed, sender=model)
+    for model in (Poll, Choice):
+        post_save.connect(polls_changed, sender=model)
+        post_delete.connect(polls_changed, sender=model)
+    post_delete.connect(vote_deleted, sender=Vote)
+    post_save.connect(events_changed, sender=Event)
+    post_delete.connect(events_changed, sender=Event)
+    for model in (Article, ChangeSet, NewsPost, Map):
+        post_save.connect(object_changed, sender=model)
+        post_delete.connect(object_changed, sender=model)
+    for model in (ThreadedComment, Image, Rating, ObservedItem):
+        post_save.connect(attachment_changed, sender=model)
+        post_delete.connect(attachment_changed, sender=model)
+    m2m_changed.connect(subscribers_changed, sender=Topic.subscribers.through)
@@ -0,0 +1,200 @@
+"""Sitemap index with the sitemaps written to files.
+
+The sections of the sitemap are split into shards by id range, each
+covering SITEMAP_SHARD_SIZE ids. Every shard has a watermark: a hash of the
+ids in its range and of the fields its entries depend on, which are listed
+in the watermark attribute of the section. write() renders only the shards
+whose watermark changed since its last run, and the index listing them.
+
+The files are stored in SITEMAP_ROOT and served with conditional GET. As
+long as write() never ran, the whole sitemap is generated per request.
+
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.sitemaps.views import sitemap
+from django.contrib.sites.models import Site
+from django.db.models import QuerySet
+from django.http import FileResponse, Http404
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from mainpage import page_cache
+from mainpage.conditional import conditional
+from mainpage.sitemaps import StaticViewSitemap
+from news.models import Post
+from news.sitemap import NewsSitemap
+from pybb.models import Forum
+from pybb.sitemap import ForumSitemap
+from wiki.models import Article
+from wiki.sitemap import WikiSitemap
+from wlhelp.generation import PAGE_TAG as WLHELP_TAG
+from wlhelp.sitemap import (
+    WlHelpBuildingSitemap,
+    WlHelpTribeSitemap,
+    WlHelpWareSitemap,
+    WlHelpWorkerSitemap,
+)
+
+SITEMAPS = {
+    "static": StaticViewSitemap,
+    "news": NewsSitemap,
+    "wiki": WikiSitemap,
+    "forum": ForumSitemap,
+    "wlhelptribe": WlHelpTribeSitemap,
+    "wlhelpware": WlHelpWareSitemap,
+    "wlhelpworker": WlHelpWorkerSitemap,
+    "wlhelpbuildings": WlHelpBuildingSitemap,
+}
+
+# Tags of all objects listed in the sitemap
+SITEMAP_TAGS = [
+    page_cache.tag_for(Article),
+    page_cache.tag_for(Post),
+    page_cache.tag_for(Forum),
+    WLHELP_TAG,
+]
+
+INDEX = "sitemap.xml"
+# The watermarks and times of the written shards
+STATE = "state.json"
+
+# The sitemap generated per request
+dynamic_sitemap = conditional(lambda request, **kwargs: SITEMAP_TAGS, page=False)(
+    sitemap
+)
+
+
+def filename(section, shard):
+    return "sitemap-%s-%d.xml" % (section, shard)
+
+
+def path(name):
+    return os.path.join(settings.SITEMAP_ROOT, name)
+
+
+def written():
+    return os.path.exists(path(INDEX))
+
+
+def _watermarks(section):
+    """Return {shard: watermark} of a section."""
+    items = section.items()
+    size = settings.SITEMAP_SHARD_SIZE
+    hashes = {}
+    if isinstance(items, QuerySet):
+        rows = items.order_by("pk").values_list("pk", *section.watermark).iterator()
+        shard_of = lambda row: row[0] // size
+    else:
+        rows = items
+        shard_of = lambda row: 0
+    for row in rows:
+        shard = shard_of(row)
+        if shard not in hashes:
+            hashes[shard] = hashlib.sha1()
+        hashes[shard].update(repr(row).encode("utf-8"))
+    return {shard: h.hexdigest() for shard, h in hashes.items()}
+
+
+def _render(section, shard, site):
+    items = section.items()
+    if isinstance(items, QuerySet):
+        size = settings.SITEMAP_SHARD_SIZE
+        items = items.filter(pk__gte=shard * size, pk__lt=(shard + 1) * size)
+        items = items.order_by("pk")
+    section.items = lambda: items
+    return render_to_string(
+        "sitemap.xml", {"urlset": section.get_urls(site=site, protocol="https")}
+    )
+
+
+def _write_file(name, content):
+    tmp = path(name) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path(name))
+
+
+def _w3c_date(timestamp):
+    """Format timestamp as W3C Datetime, as required by the sitemaps
+    protocol."""
+    return datetime.utcfromtimestamp(timestamp).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def _read_state():
+    try:
+        with open(path(STATE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write(force=False):
+    """Write the changed shards and the index.
+
+    Returns the number of shards written and removed.
+
+    """
+    os.makedirs(settings.SITEMAP_ROOT, exist_ok=True)
+    site = Site.objects.get_current()
+    state = _read_state()
+    new_state = {}
+    written = 0
+    for name, section in SITEMAPS.items():
+        for shard, watermark in sorted(_watermarks(section()).items()):
+            shard_name = filename(name, shard)
+            entry = state.get(shard_name)
+            if (
+                force
+                or entry is None
+                or entry[0] != watermark
+                or not os.path.exists(path(shard_name))
+            ):
+                _write_file(shard_name, _render(section(), shard, site))
+                entry = [watermark, time.time()]
+                written += 1
+            new_state[shard_name] = entry
+
+    removed = set(state) - set(new_state)
+    for shard_name in removed:
+        if os.path.exists(path(shard_name)):
+            os.remove(path(shard_name))
+
+    shards = [
+        {
+            "location": "https://%s%s"
+            % (site.domain, reverse("sitemap_shard", args=[n])),
+            "lastmod": _w3c_date(t),
+        }
+        for n, (w, t) in sorted(new_state.items())
+    ]
+    _write_file(
+        INDEX, render_to_string("mainpage/sitemap_index.xml", {"shards": shards})
+    )
+    _write_file(STATE, json.dumps(new_state))
+    return written, len(removed)
+
+
+def serve(request, name):
+    """Return the sitemap file name, or 304 Not Modified."""
+    try:
+        stat = os.stat(path(name))
+    except FileNotFoundError:
+        raise Http404
+    etag = '"%x-%x"' % (stat.st_mtime_ns, stat.st_size)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = FileResponse(open(path(name), "rb"), content_type="application/xml")
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return response
@@ -1,30 +1,17 @@
 from django.conf.urls import url
 
-from django.contrib.sitemaps.views import sitemap
-from .sitemaps import StaticViewSitemap
-from wiki.sitemap import *
-from news.sitemap import *
-from pybb.sitemap import *
-from wlhelp.sitemap import *
-
-
-sitemaps = {
-    "static": StaticViewSitemap,
-    "news": NewsSitemap,
-    "wiki": WikiSitemap,
-    "forum": ForumSitemap,
-    "wlhelptribe": WlHelpTribeSitemap,
-    "wlhelpware": WlHelpWareSitemap,
-    "wlhelpworker": WlHelpWorkerSitemap,
-    "wlhelpbuildings": WlHelpBuildingSitemap,
-}
+from mainpage import views
 
 urlpatterns = [
     # Creating a sitemap.xml
     url(
-        r"^$",
-        sitemap,
-        {"sitemaps": sitemaps},
+        r"^sitemap\.xml/?$",
+        views.sitemap_index,
         name="django.contrib.sitemaps.views.sitemap",
-    )
+    ),
+    url(
+        r"^(?P<name>sitemap-\w+-\d+\.xml)$",
+        views.sitemap_shard,
+        name="sitemap_shard",
+    ),
 ]
@@ -4,6 +4,9 @@ from django.urls import reverse
 
 class SitemapHTTPS(Sitemap):
     protocol = "https"
+    # Fields the entries depend on, besides the id. See
+    # mainpage/sitemap_files.py
+    watermark = ()
 
 
 class StaticViewSitemap(SitemapHTTPS):
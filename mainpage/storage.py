@@ -0,0 +1,99 @@
+"""Content addressed storage for uploaded files.
+
+Files are stored under the sha256 hash of their content, e.g.:
+
+    cas/3a/7b/3a7b...e9.png
+
+So identical uploads are stored only once. The number of model fields
+referencing a file is counted in mainpage.models.StoredFile; a file gets
+removed from disk once the deletion of its last reference is committed.
+
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    prefix = "cas"
+
+    def owns(self, name):
+        """Return True if name is a file stored by this storage.
+
+        Files stored before this storage was used have other names and
+        are handled like in a FileSystemStorage.
+
+        """
+        return name.startswith(self.prefix + "/")
+
+    def name_for(self, digest, ext=""):
+        return "/".join((self.prefix, digest[:2], digest[2:4], digest + ext))
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save(), so there
+        # is no need to find a free name here
+        return name
+
+    def _save(self, name, content):
+        from mainpage.models import StoredFile
+
+        ext = os.path.splitext(name)[1].lower()
+        tmp_dir = self.path(os.path.join(self.prefix, "tmp"))
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        # Write to a temporary file while hashing, then move it atomically
+        # to its final location
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    sha.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+
+            name = self.name_for(sha.hexdigest(), ext)
+            full_path = self.path(name)
+            # The reference locks the file until the transaction is
+            # committed, so it can't be deleted after the check
+            with transaction.atomic():
+                StoredFile.objects.add_reference(name, size)
+                if os.path.exists(full_path):
+                    os.remove(tmp_path)
+                else:
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    os.replace(tmp_path, full_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return name
+
+    def share(self, name):
+        """Count one more field referencing the stored file name."""
+        from mainpage.models import StoredFile
+
+        if self.owns(name):
+            StoredFile.objects.add_reference(name, self.size(name))
+
+    def delete(self, name):
+        from mainpage.models import StoredFile
+
+        if not self.owns(name):
+            return super().delete(name)
+
+        StoredFile.objects.release(name, super().delete)
+
+
+content_storage = ContentAddressedStorage()
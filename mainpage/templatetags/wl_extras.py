@@ -4,6 +4,7 @@
 from django import template
 from django.utils.safestring import mark_safe
 from django.conf import settings
+from mainpage import fragments
 from mainpage.wl_utils import return_git_path
 import subprocess
 
@@ -50,3 +51,36 @@ def git_data():
         except subprocess.CalledProcessError as e:
             text = e
     return text
+
+
+class SharedFragmentNode(template.Node):
+    def __init__(self, nodelist, name):
+        self.nodelist = nodelist
+        self.name = name
+
+    def render(self, context):
+        request = context.get("request")
+        audience = fragments.audience(getattr(request, "user", None))
+        return fragments.get(
+            self.name.resolve(context), audience, lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def shared_fragment(parser, token):
+    """Render the content once per audience and share it between requests.
+
+    Usage::
+
+        {% shared_fragment "name" %}...{% endshared_fragment %}
+
+    See mainpage.fragments. The content must not depend on the user other
+    than by its audience.
+
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError("%r takes a fragment name" % bits[0])
+    nodelist = parser.parse(("endshared_fragment",))
+    parser.delete_first_token()
+    return SharedFragmentNode(nodelist, parser.compile_filter(bits[1]))
@@ -11,8 +11,8 @@ from mainpage.forms import RegistrationWithCaptchaForm
 admin.autodiscover()
 
 urlpatterns = [
-    # Creating a sitemap.xml
-    url(r"^sitemap\.xml", include("mainpage.sitemap_urls")),
+    # The sitemap index and its shards
+    url(r"^", include("mainpage.sitemap_urls")),
     # Static view of robots.txt
     url(
         r"^robots\.txt",
@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, modify_settings
+from django.urls import reverse
+
+from wiki.models import Article
+
+
+# Without the page cache, which would answer the requests itself
+@modify_settings(MIDDLEWARE={"remove": "mainpage.page_cache.PageCacheMiddleware"})
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(title="Cond", content="Text")
+        self.url = reverse("wiki_article", args=["Cond"])
+
+    def test_not_modified_until_changed(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.article.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_users_get_own_etags(self):
+        etag = self.client.get(self.url)["ETag"]
+        user = User.objects.create_user("reader", "reader@example.com", "pw")
+        self.client.force_login(user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed(self):
+        url = reverse("wiki_history_feed_rss")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from pybb.models import Category, Forum, Post, Topic
+
+
+class TestFeeds(TestCase):
+    def get_without_forum_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertFalse([q for q in queries if "pybb_" in q["sql"]])
+        return response
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("poster", "poster@example.com", "pw")
+        category = Category.objects.create(name="General")
+        self.forum = Forum.objects.create(category=category, name="Talk")
+        self.other = Forum.objects.create(category=category, name="Other")
+        for forum in (self.forum, self.other):
+            topic = Topic.objects.create(
+                forum=forum, name="About %s" % forum.name, user=self.user
+            )
+            Post.objects.create(
+                topic=topic, user=self.user, body="Hello", markup="markdown"
+            )
+        self.hidden = Topic.objects.create(
+            forum=self.forum, name="Spam", user=self.user
+        )
+        Post.objects.create(
+            topic=self.hidden,
+            user=self.user,
+            body="Spam",
+            markup="markdown",
+            hidden=True,
+        )
+
+    def test_forum_feeds(self):
+        response = self.client.get(reverse("pybb_feed_posts", args=[self.forum.pk]))
+        self.assertContains(response, "About Talk @ Talk")
+        self.assertNotContains(response, "About Other")
+        self.assertNotContains(response, "Spam")
+
+        response = self.client.get(reverse("pybb_feed_topics"))
+        self.assertContains(response, "About Other")
+        self.assertContains(response, "poster wrote")
+        self.assertNotContains(response, "Spam")
+
+    def test_feed_is_stored_until_changed(self):
+        url = reverse("pybb_feed_posts")
+        self.client.get(url)
+        response = self.get_without_forum_queries(url)
+        self.assertNotContains(response, "Reply")
+
+        Post.objects.create(
+            topic=Topic.objects.get(forum=self.other),
+            user=self.user,
+            body="Reply",
+            markup="markdown",
+        )
+        response = self.client.get(url)
+        self.assertContains(response, "Reply")
+
+        # Logged in users get the stored feed as well
+        self.client.force_login(self.user)
+        self.assertContains(self.get_without_forum_queries(url), "Reply")
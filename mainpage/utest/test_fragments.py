@@ -0,0 +1,50 @@
+import datetime
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+
+from mainpage import fragments
+from wlevents.models import Event
+
+
+class TestFragments(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+        return "rendered %d" % self.renders
+
+    def test_fragment_is_shared(self):
+        self.assertEqual(fragments.get("box", "user", self.render), "rendered 1")
+        self.assertEqual(fragments.get("box", "user", self.render), "rendered 1")
+        self.assertEqual(fragments.get("box", "internal", self.render), "rendered 2")
+        fragments.invalidate("box")
+        self.assertEqual(fragments.get("box", "user", self.render), "rendered 3")
+
+    def test_stale_fragment_is_rendered_once(self):
+        cache.set(fragments._key("box", "user"), (0, "stale"))
+        cache.add(fragments._key("box", "user") + "-refresh", True)
+        # Another request is rendering it already
+        self.assertEqual(fragments.get("box", "user", self.render), "stale")
+        cache.delete(fragments._key("box", "user") + "-refresh")
+        self.assertEqual(fragments.get("box", "user", self.render), "rendered 1")
+
+    def test_template_tag_and_signals(self):
+        template = Template(
+            "{% load wl_extras wlevents_extras %}"
+            '{% shared_fragment "events" %}{% get_future_events as events %}'
+            "{% for e in events %}{{ e.name }}{% endfor %}{% endshared_fragment %}"
+        )
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        context = Context({"request": request})
+        self.assertEqual(template.render(context), "")
+        Event.objects.create(name="Release", link="/", start_date=datetime.date.today())
+        self.assertEqual(template.render(context), "Release")
+        # Only the lookup in the database cache is left
+        with self.assertNumQueries(1):
+            self.assertEqual(template.render(context), "Release")
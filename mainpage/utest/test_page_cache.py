@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.signals import template_rendered
+from django.urls import reverse
+
+from wiki.models import Article
+
+
+class TestPageCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(
+            title="Cached", content="First text", markup="mrk"
+        )
+        self.url = reverse("wiki_article", args=["Cached"])
+
+    def test_page_is_cached_and_purged(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "First text")
+        etag = response["ETag"]
+
+        # Served from the cache without running the view
+        Article.objects.filter(pk=self.article.pk).update(content="Other text")
+        response = self.client.get(self.url)
+        self.assertIsNone(response.context)
+        self.assertContains(response, "First text")
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # Saving the article purges the page
+        self.article.content = "Second text"
+        self.article.save()
+        self.assertContains(self.client.get(self.url), "Second text")
+
+    def test_change_while_rendering_is_not_hidden(self):
+        def save_article(**kwargs):
+            template_rendered.disconnect(save_article)
+            self.article.content = "Second text"
+            self.article.save()
+
+        # The article is changed after the view read it
+        template_rendered.connect(save_article)
+        self.assertContains(self.client.get(self.url), "First text")
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context)
+        self.assertContains(response, "Second text")
+
+    def test_csrf_token_is_replaced(self):
+        response = self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertIsNone(response.context)
+        self.assertNotIn(b"\0", response.content)
+        self.assertIn(b'name="csrfmiddlewaretoken" value="', response.content)
+        self.assertIn("csrftoken", response.cookies)
+
+    def test_security_headers_on_cache_hits(self):
+        miss = self.client.get(self.url)
+        hit = self.client.get(self.url)
+        self.assertIsNone(hit.context)
+        self.assertEqual(miss["X-Frame-Options"], "SAMEORIGIN")
+        self.assertEqual(hit["X-Frame-Options"], "SAMEORIGIN")
+
+    def test_logged_in_users_get_fresh_pages(self):
+        self.client.get(self.url)
+        user = User.objects.create_user("reader", "reader@example.com", "pw")
+        self.client.force_login(user)
+        self.assertIsNotNone(self.client.get(self.url).context)
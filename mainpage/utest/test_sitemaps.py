@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from mainpage import sitemap_files
+from wiki.models import Article
+
+
+class TestSitemapFiles(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.override = override_settings(SITEMAP_ROOT=self.root, SITEMAP_SHARD_SIZE=1)
+        self.override.enable()
+        self.articles = [
+            Article.objects.create(title="Page%d" % i, content="") for i in range(5)
+        ]
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.root)
+
+    def test_generated_until_written(self):
+        response = self.client.get("/sitemap.xml")
+        self.assertContains(response, "/wiki/Page4/")
+        self.assertNotContains(response, "<sitemapindex")
+
+    def test_only_changed_shards_are_written(self):
+        written, removed = sitemap_files.write()
+        self.assertGreater(written, 1)
+        self.assertEqual(sitemap_files.write(), (0, 0))
+
+        self.articles[4].title = "Renamed"
+        self.articles[4].save()
+        self.assertEqual(sitemap_files.write(), (1, 0))
+        self.articles[4].delete()
+        self.assertEqual(sitemap_files.write(), (0, 1))
+
+        shard = sitemap_files.filename("wiki", self.articles[0].pk)
+        response = self.client.get("/sitemap.xml")
+        self.assertContains(response, reverse("sitemap_shard", args=[shard]))
+        self.assertNotContains(response, "Page0")
+        with open(sitemap_files.path(sitemap_files.INDEX)) as f:
+            index = f.read()
+        self.assertRegex(
+            index,
+            r"<lastmod>\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\+00:00</lastmod>",
+        )
+
+        response = self.client.get(reverse("sitemap_shard", args=[shard]))
+        self.assertIn(b"/wiki/Page0/", b"".join(response.streaming_content))
+        response = self.client.get(
+            reverse("sitemap_shard", args=[shard]),
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            reverse("sitemap_shard", args=["sitemap-wiki-99.xml"])
+        )
+        self.assertEqual(response.status_code, 404)
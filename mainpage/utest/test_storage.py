@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from mainpage.models import StoredFile
+from mainpage.storage import ContentAddressedStorage
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestContentAddressedStorage(TestCase):
+    def setUp(self):
+        self.storage = ContentAddressedStorage()
+
+    def test_same_content_is_stored_once(self):
+        name1 = self.storage.save("a/first.png", ContentFile(b"data"))
+        name2 = self.storage.save("b/second.png", ContentFile(b"data"))
+        self.assertEqual(name1, name2)
+        self.assertTrue(name1.startswith("cas/"))
+        self.assertTrue(name1.endswith(".png"))
+        self.assertEqual(StoredFile.objects.get(name=name1).references, 2)
+
+    def test_different_content_gets_different_names(self):
+        name1 = self.storage.save("first.png", ContentFile(b"data"))
+        name2 = self.storage.save("first.png", ContentFile(b"other data"))
+        self.assertNotEqual(name1, name2)
+
+
+# The files are deleted after the commit
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestContentAddressedStorageDeletion(TransactionTestCase):
+    def setUp(self):
+        self.storage = ContentAddressedStorage()
+
+    def test_file_is_removed_with_last_reference(self):
+        name = self.storage.save("first.png", ContentFile(b"data"))
+        self.storage.save("second.png", ContentFile(b"data"))
+
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+        # No temporary files are left
+        self.assertEqual(os.listdir(self.storage.path("cas/tmp")), [])
+
+    def test_file_is_kept_if_referenced_again(self):
+        name = self.storage.save("first.png", ContentFile(b"data"))
+        with transaction.atomic():
+            self.storage.delete(name)
+            # Like a concurrent upload of the same file before the commit
+            self.storage.save("second.png", ContentFile(b"data"))
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(StoredFile.objects.get(name=name).references, 1)
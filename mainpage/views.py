@@ -3,6 +3,7 @@ from .templatetags.wl_markdown import do_wl_markdown
 from operator import itemgetter
 from django.core.mail import send_mail
 from mainpage.forms import ContactForm
+from mainpage import sitemap_files
 from django.shortcuts import render
 from django.http import HttpResponseRedirect, HttpResponse
 import sys
@@ -239,3 +240,18 @@ def view_locale(request):
         + os.environ.get("DISPLAY", "Not set")
     )
     return HttpResponse(loc_info)
+
+
+def sitemap_index(request):
+    """The sitemap index written by './manage.py write_sitemaps'.
+
+    The whole sitemap is generated as long as it wasn't written yet.
+
+    """
+    if sitemap_files.written():
+        return sitemap_files.serve(request, sitemap_files.INDEX)
+    return sitemap_files.dynamic_sitemap(request, sitemaps=sitemap_files.SITEMAPS)
+
+
+def sitemap_shard(request, name):
+    return sitemap_files.serve(request, name)
@@ -1,8 +1,27 @@
+import datetime
+
 from django.contrib.syndication.views import Feed, FeedDoesNotExist
 from django.core.exceptions import ObjectDoesNotExist
 from django.urls import reverse
+from mainpage import page_cache
 from news.models import Post, Category
 
+
+def feed_tags(request):
+    """Return the page cache tags of the feed.
+
+    Posts dated in the future show up without being saved again, so the
+    feed is not cached while there are any.
+
+    """
+    scheduled = Post.objects.exclude(status=1).filter(
+        publish__gt=datetime.datetime.now()
+    )
+    if scheduled.exists():
+        return None
+    return [page_cache.tag_for(Post)]
+
+
 # Validated through http://validator.w3.org/feed/
 
 
@@ -7,6 +7,7 @@ from mainpage.sitemaps import SitemapHTTPS
 class NewsSitemap(SitemapHTTPS):
     changefreq = "yearly"
     priority = 0.5
+    watermark = ("slug", "publish")
 
     def items(self):
         start_date = datetime.today() - timedelta(days=365 * 2)
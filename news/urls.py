@@ -1,8 +1,8 @@
 from django.conf.urls import *
 from django.views.generic import ListView
 from news.views import NewsList, YearNews, MonthNews, NewsDetail, CategoryView
-from news.feeds import NewsPostsFeed
-
+from news.feeds import NewsPostsFeed, feed_tags
+from mainpage.conditional import shared
 
 urlpatterns = [
     url(
@@ -21,5 +21,8 @@ urlpatterns = [
         r"^$", NewsList.as_view(template_name="news/post_list.html"), name="news_index"
     ),
     # Feed
-    url(r"^feed/$", NewsPostsFeed()),
+    url(
+        r"^feed/$",
+        shared(feed_tags)(NewsPostsFeed()),
+    ),
 ]
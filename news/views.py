@@ -1,4 +1,7 @@
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from mainpage import page_cache
+from mainpage.conditional import conditional
 from news.models import Post, Category
 from django.views.generic import (
     ListView,
@@ -9,6 +12,7 @@ from django.views.generic import (
 )
 
 
+@method_decorator(page_cache.tagged(page_cache.tag_for(Post)), name="dispatch")
 class NewsList(ArchiveIndexView):
     template_name = "news/category_posts.html"
     model = Post
@@ -22,6 +26,7 @@ class NewsList(ArchiveIndexView):
         return context
 
 
+@method_decorator(page_cache.tagged(page_cache.tag_for(Post)), name="dispatch")
 class YearNews(YearArchiveView):
     model = Post
     template_name = "news/post_archive_year.html"
@@ -29,18 +34,24 @@ class YearNews(YearArchiveView):
     make_object_list = True
 
 
+@method_decorator(page_cache.tagged(page_cache.tag_for(Post)), name="dispatch")
 class MonthNews(MonthArchiveView):
     model = Post
     template_name = "news/post_archive_month.html"
     date_field = "publish"
 
 
+@method_decorator(page_cache.tagged(page_cache.tag_for(Post)), name="dispatch")
+@method_decorator(
+    conditional(lambda request, **kwargs: [page_cache.tag_for(Post)]), name="dispatch"
+)
 class NewsDetail(DateDetailView):
     model = Post
     template_name = "news/post_detail.html"
     date_field = "publish"
 
 
+@method_decorator(page_cache.tagged(page_cache.tag_for(Post)), name="dispatch")
 class CategoryView(ListView):
     template_name = "news/category_posts.html"
 
@@ -1,36 +1,46 @@
 from django.contrib.syndication.views import Feed
 from django.urls import reverse
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import OuterRef, Subquery
 from django.utils.feedgenerator import Atom1Feed
 from pybb.models import Post, Topic, Forum
+from wlprofile.models import Profile
 from django.conf import settings
 
 
+def with_profiles(users):
+    """Attach the existing profiles to users with a single query."""
+    profiles = Profile.objects.in_bulk(set(u.pk for u in users), field_name="user_id")
+    for u in users:
+        if u.pk in profiles:
+            u.wlprofile = profiles[u.pk]
+
+
 class PybbFeed(Feed):
+    """Feed for all forums, or for a single one.
+
+    The object of the feed is the forum, or None for all forums.
+
+    """
+
     feed_type = Atom1Feed
 
     def title(self, obj):
-        if obj == self.all_objects:
+        if obj is None:
             return self.all_title
         else:
             return self.one_title % obj.name
 
-    def items(self, obj):
-        if obj == self.all_objects:
-            return obj.order_by("-created")[:15]
-        else:
-            return self.items_for_object(obj)
-
     def link(self, obj):
-        if obj == self.all_objects:
+        if obj is None:
             return reverse("pybb_index")
-        return "/ewfwevw%s" % reverse("pybb_forum", args=(obj.pk,))
+        return reverse("pybb_forum", args=(obj.pk,))
 
     def get_object(self, request, *args, **kwargs):
         """Implement getting feeds for a specific subforum."""
         if not "topic_id" in kwargs:
             # Latest Posts/Topics on all forums
-            return self.all_objects
+            return None
         else:
             # Latest Posts/Topics for specific Forum
             try:
@@ -57,11 +67,14 @@ class LastPosts(PybbFeed):
     title_template = "pybb/feeds/posts_title.html"
     description_template = "pybb/feeds/posts_description.html"
 
-    all_objects = Post.objects.public()
-
-    def items_for_object(self, obj):
-        # Latest posts for forum 'xy'
-        return Post.objects.public(limit=15)
+    def items(self, obj):
+        posts = Post.objects.public().select_related("topic__forum", "user")
+        if obj is not None:
+            # Latest posts for forum 'xy'
+            posts = posts.filter(topic__forum=obj)
+        posts = list(posts[:15])
+        with_profiles([p.user for p in posts])
+        return posts
 
 
 # Validated through http://validator.w3.org/feed/
@@ -73,15 +86,25 @@ class LastTopics(PybbFeed):
     title_template = "pybb/feeds/topics_title.html"
     description_template = "pybb/feeds/topics_description.html"
 
-    all_objects = Topic.objects.exclude(forum__category__internal=True).exclude(
-        posts__hidden=True
-    )
-
-    def items_for_object(self, item):
-        # Latest topics on forum 'xy'
-        return (
+    def items(self, obj):
+        first_post = (
+            Post.objects.filter(topic=OuterRef("pk")).order_by("created").values("pk")
+        )
+        topics = (
             Topic.objects.exclude(forum__category__internal=True)
             .exclude(posts__hidden=True)
-            .filter(forum=item)
-            .order_by("-created")[:15]
+            .select_related("forum")
+            .annotate(head_id=Subquery(first_post[:1]))
+            .order_by("-created")
         )
+        if obj is not None:
+            # Latest topics on forum 'xy'
+            topics = topics.filter(forum=obj)
+        topics = list(topics[:15])
+
+        # The first posts are shown as description
+        heads = Post.objects.select_related("user").in_bulk([t.head_id for t in topics])
+        with_profiles([p.user for p in heads.values()])
+        for t in topics:
+            t.first_post = heads.get(t.head_id)
+        return topics
@@ -1,6 +1,5 @@
 import re
 from datetime import datetime
-import os
 
 from django import forms
 from django.conf import settings
@@ -12,6 +11,7 @@ from pybb import settings as pybb_settings
 from django.conf import settings
 from .util import validate_file
 from mainpage.validators import virus_scan, check_utf8mb3
+from mainpage.storage import content_storage
 
 
 class AddPostForm(forms.ModelForm):
@@ -92,17 +92,8 @@ class AddPostForm(forms.ModelForm):
                 name=memfile.name,
                 post=post,
             )
-            dir = os.path.join(settings.MEDIA_ROOT, pybb_settings.ATTACHMENT_UPLOAD_TO)
-            if not os.path.exists(dir):
-                os.makedirs(dir)
-
-            fname = "{}.0".format(post.id)
-            path = os.path.join(dir, fname)
-
-            with open(path, "wb") as f:
-                f.write(memfile.read())
-
-            obj.path = fname
+            # Identical attachments are stored only once
+            obj.path = content_storage.save(memfile.name, memfile)
             obj.save()
 
 
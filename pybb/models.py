@@ -14,6 +14,7 @@ from django.conf import settings
 from pybb.markups import mypostmarkup
 from pybb.util import urlize, unescape
 from pybb import settings as pybb_settings
+from mainpage.storage import content_storage
 
 from django.conf import settings
 from notification.models import send
@@ -276,10 +277,17 @@ class PublicPostsManager(models.Manager):
         date_from: Gathers all posts from this day until today.
         """
 
+        # A topic is hidden if its first post is hidden
+        first_hidden = (
+            Post.objects.filter(topic=models.OuterRef("topic"))
+            .order_by("created")
+            .values("hidden")[:1]
+        )
         qs = (
             self.get_queryset()
             .filter(topic__forum__category__internal=False, hidden=False)
-            .exclude(topic__in=Post.hidden_topics.all())
+            .annotate(topic_hidden=models.Subquery(first_hidden))
+            .filter(topic_hidden=False)
             .order_by("-created")
         )
 
@@ -349,6 +357,10 @@ class Post(RenderableItem):
         """Unhide post(s) and inform subscribers."""
         self.hidden = False
         self.save()
+        # Reviewed, so it leaves the moderation queue
+        SuspiciousInput.objects.pending().for_objects(self, self.topic).update(
+            status=SuspiciousInput.APPROVED
+        )
         if self.topic.post_count == 1:
             # The topic is new
             send(
@@ -381,12 +393,7 @@ class Post(RenderableItem):
             self.topic.delete()
 
     def is_spam(self):
-        try:
-            SuspiciousInput.objects.get(object_id=self.pk)
-            return True
-        except:
-            pass
-        return False
+        return SuspiciousInput.objects.pending().for_objects(self).exists()
 
 
 class Read(models.Model):
@@ -441,15 +448,21 @@ class Attachment(models.Model):
         return reverse("pybb_attachment", args=[self.hash])
 
     def get_absolute_path(self):
+        if content_storage.owns(self.path):
+            return content_storage.path(self.path)
+        # Attachments uploaded before the content storage was used
         return os.path.join(
             settings.MEDIA_ROOT, pybb_settings.ATTACHMENT_UPLOAD_TO, self.path
         )
 
     def delete(self, *args, **kwargs):
-        try:
-            os.remove(self.get_absolute_path())
-        except FileNotFoundError:
-            pass
+        if content_storage.owns(self.path):
+            content_storage.delete(self.path)
+        else:
+            try:
+                os.remove(self.get_absolute_path())
+            except FileNotFoundError:
+                pass
         super(Attachment, self).delete(*args, **kwargs)
 
 
@@ -5,6 +5,7 @@ from mainpage.sitemaps import SitemapHTTPS
 class ForumSitemap(SitemapHTTPS):
     changefreq = "monthly"
     priority = 0.5
+    watermark = ("updated",)
 
     def items(self):
         return Forum.objects.all()
@@ -28,12 +28,14 @@ def pybb_last_posts(context, number=8):
     else:
         last_posts = Post.objects.public(limit=BASE_COUNT)
 
-    check = []
+    check = set()
     answer = []
-    for post in last_posts:
-        if (post.topic_id not in check) and len(check) < number:
-            check = check + [post.topic_id]
-            answer = answer + [post]
+    for post in last_posts.select_related("topic__forum", "user"):
+        if post.topic_id not in check:
+            check.add(post.topic_id)
+            answer.append(post)
+            if len(answer) == number:
+                break
     return {
         "posts": answer,
     }
@@ -1,7 +1,13 @@
 from django.conf.urls import *
 
+from mainpage import page_cache
+from mainpage.conditional import shared
 from pybb import views
 from pybb.feeds import LastPosts, LastTopics
+from pybb.models import Forum
+
+# Every new post changes the feeds
+forum_feed = shared(lambda request, **kwargs: [page_cache.tag_for(Forum)])
 
 urlpatterns = [
     # Misc
@@ -20,10 +26,18 @@ urlpatterns = [
         name="mark_as_read",
     ),
     # Feeds
-    url("^feeds/topics/(?P<topic_id>\d+)/$", LastTopics(), name="pybb_feed_topics"),
-    url("^feeds/posts/(?P<topic_id>\d+)/$", LastPosts(), name="pybb_feed_posts"),
-    url("^feeds/topics/$", LastTopics(), name="pybb_feed_topics"),
-    url("^feeds/posts/$", LastPosts(), name="pybb_feed_posts"),
+    url(
+        "^feeds/topics/(?P<topic_id>\d+)/$",
+        forum_feed(LastTopics()),
+        name="pybb_feed_topics",
+    ),
+    url(
+        "^feeds/posts/(?P<topic_id>\d+)/$",
+        forum_feed(LastPosts()),
+        name="pybb_feed_posts",
+    ),
+    url("^feeds/topics/$", forum_feed(LastTopics()), name="pybb_feed_topics"),
+    url("^feeds/posts/$", forum_feed(LastPosts()), name="pybb_feed_posts"),
     # Topic
     url("^topic/(?P<topic_id>\d+)/$", views.show_topic, name="pybb_topic"),
     url(
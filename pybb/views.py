@@ -4,11 +4,14 @@ from datetime import date, timedelta
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef, Q
 from django.http import HttpResponseRedirect, HttpResponse, Http404
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.urls import reverse
+from mainpage import page_cache
+from mainpage.conditional import conditional
 from mainpage.templatetags.wl_markdown import do_wl_markdown
 from pybb import settings as pybb_settings
 from pybb.forms import AddPostForm, EditPostForm, LastPostsDayForm
@@ -31,6 +34,7 @@ except ImportError:
 
 
 def index_ctx(request):
+    page_cache.tag(request, page_cache.tag_for(Forum))
     if allowed_for(request.user):
         cats = Category.objects.all().select_related()
     else:
@@ -48,6 +52,7 @@ def show_category_ctx(request, category_id):
     if category.internal and not allowed_for(request.user):
         raise Http404
 
+    page_cache.tag(request, page_cache.tag_for(Forum))
     return {"category": category}
 
 
@@ -60,6 +65,7 @@ def show_forum_ctx(request, forum_id):
     if forum.category.internal and not allowed_for(request.user):
         raise Http404
 
+    page_cache.tag(request, page_cache.tag_for(forum))
     user_is_mod = pybb_moderated_by(forum, request.user)
 
     topics = forum.topics.order_by("-sticky", "-updated").select_related()
@@ -72,7 +78,9 @@ def show_forum_ctx(request, forum_id):
     }
 
 
-show_forum = render_to("pybb/forum.html")(show_forum_ctx)
+show_forum = conditional(
+    lambda request, forum_id: [page_cache.tag_for(Forum, forum_id)]
+)(render_to("pybb/forum.html")(show_forum_ctx))
 
 
 @login_required
@@ -123,7 +131,9 @@ def show_topic_ctx(request, topic_id):
         raise Http404()
 
     topic.views += 1
-    topic.save()
+    topic.save(update_fields=["views"])
+    page_cache.tag(request, page_cache.tag_for(topic))
+    page_cache.count_hit(request, topic, "views")
 
     if request.user.is_authenticated:
         topic.update_read(request.user)
@@ -152,12 +162,22 @@ def show_topic_ctx(request, topic_id):
         context.update({"subscribed": subscribed})
 
         is_spam = False
-        if topic.is_hidden:
-            is_spam = topic.posts.first().is_spam()
+        first_post = topic.posts.first()
+        if first_post.hidden:
+            # The subject or the first post may wait for a review
+            is_spam = (
+                SuspiciousInput.objects.pending()
+                .for_objects(topic, first_post)
+                .exists()
+            )
         context.update({"is_spam": is_spam})
 
     if user_is_mod:
-        posts = topic.posts.select_related()
+        pending = SuspiciousInput.objects.pending().filter(
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id=OuterRef("pk"),
+        )
+        posts = topic.posts.select_related().annotate(spam=Exists(pending))
     else:
         posts = topic.posts.exclude(hidden=True).select_related()
     context.update({"posts": posts})
@@ -184,7 +204,9 @@ def show_topic_ctx(request, topic_id):
     return context
 
 
-show_topic = render_to("pybb/topic.html")(show_topic_ctx)
+show_topic = conditional(
+    lambda request, topic_id: [page_cache.tag_for(Topic, topic_id)]
+)(render_to("pybb/topic.html")(show_topic_ctx))
 
 
 @login_required
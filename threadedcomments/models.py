@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from django.db import models
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
@@ -25,20 +27,39 @@ MARKUP_CHOICES = (
 DEFAULT_MARKUP = getattr(settings, "DEFAULT_MARKUP", PLAINTEXT)
 
 
+def _children_by_parent(nodes):
+    """Group nodes by the id of their parent, keeping their order."""
+    children = defaultdict(list)
+    for node in nodes:
+        children[node.parent_id].append(node)
+    return children
+
+
+def _walk(roots, children, depth):
+    """Returns ``roots`` and all their descendants in depth-first order and
+    annotates their ``depth``.
+
+    Every node is visited once, and no recursion is needed for deep
+    threads.
+
+    """
+    to_return = []
+    stack = [(node, depth) for node in reversed(roots)]
+    while stack:
+        node, depth = stack.pop()
+        node.depth = depth
+        to_return.append(node)
+        stack.extend((child, depth + 1) for child in reversed(children[node.id]))
+    return to_return
+
+
 def dfs(node, all_nodes, depth):
     """
-    Performs a recursive depth-first search starting at ``node``.  This function
+    Performs a depth-first search starting at ``node``.  This function
     also annotates an attribute, ``depth``, which is an integer that represents
     how deeply nested this node is away from the original object.
     """
-    node.depth = depth
-    to_return = [
-        node,
-    ]
-    for subnode in all_nodes:
-        if subnode.parent and subnode.parent.id == node.id:
-            to_return.extend(dfs(subnode, all_nodes, depth + 1))
-    return to_return
+    return _walk([node], _children_by_parent(all_nodes), depth)
 
 
 class ThreadedCommentManager(models.Manager):
@@ -77,23 +98,27 @@ class ThreadedCommentManager(models.Manager):
             .select_related()
             .order_by("date_submitted")
         )
-        to_return = []
+        # Fetch the existing profiles of the authors along, so rendering
+        # the avatars needs no query per comment
+        from wlprofile.models import Profile
+
+        profiles = Profile.objects.in_bulk(
+            set(c.user_id for c in children), field_name="user_id"
+        )
+        for c in children:
+            if c.user_id in profiles:
+                c.user.wlprofile = profiles[c.user_id]
+
+        by_parent = _children_by_parent(children)
         if root:
             if isinstance(root, int):
                 root_id = root
             else:
                 root_id = root.id
-            to_return = [c for c in children if c.id == root_id]
-            if to_return:
-                to_return[0].depth = 0
-                for child in children:
-                    if child.parent_id == root_id:
-                        to_return.extend(dfs(child, children, 1))
+            roots = [c for c in children if c.id == root_id]
         else:
-            for child in children:
-                if not child.parent:
-                    to_return.extend(dfs(child, children, 0))
-        return to_return
+            roots = by_parent[None]
+        return _walk(roots, by_parent, 0)
 
     def _generate_object_kwarg_dict(self, content_object, **kwargs):
         """Generates the most comment keyword arguments for a given
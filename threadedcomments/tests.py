@@ -0,0 +1,35 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from threadedcomments.models import ThreadedComment
+
+
+class TestGetTree_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("author", "author@example.com", "pw")
+        self.target = User.objects.create_user("target", "target@example.com", "pw")
+
+        def comment(text, parent=None):
+            return ThreadedComment.objects.create_for_object(
+                self.target, user=self.user, comment=text, parent=parent
+            )
+
+        a = comment("a")
+        b = comment("b")
+        a1 = comment("a1", a)
+        comment("a1x", a1)
+        comment("b1", b)
+        comment("a2", a)
+        self.a = a
+
+    def runTest(self):
+        tree = ThreadedComment.public.get_tree(self.target)
+        self.assertEqual(
+            [(c.comment, c.depth) for c in tree],
+            [("a", 0), ("a1", 1), ("a1x", 2), ("a2", 1), ("b", 0), ("b1", 1)],
+        )
+        tree = ThreadedComment.public.get_tree(self.target, root=self.a)
+        self.assertEqual(
+            [(c.comment, c.depth) for c in tree],
+            [("a", 0), ("a1", 1), ("a1x", 2), ("a2", 1)],
+        )
@@ -6,7 +6,9 @@ import pydot as d
 from django.conf import settings
 from widelandslib.tribe import *
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from os import makedirs, path
+import os
 import subprocess
 from tempfile import mkdtemp
 
@@ -297,12 +299,7 @@ def make_worker_graph(t, worker_name):
         rankdir="LR",
     )
 
-    buildings = [
-        bld
-        for bld in list(t.buildings.values())
-        if isinstance(bld, ProductionSite)
-        and (w.name in bld.workers or w.name in bld.recruits)
-    ]
+    buildings = w.productionsites
 
     for bld in buildings:
         add_building(
@@ -319,13 +316,12 @@ def make_worker_graph(t, worker_name):
 
     sg = Subgraph("%s_enhancements" % w.name, ordering="out", rankdir="TB", rank="same")
     # find exactly one level of enhancement
-    for other in list(t.workers.values()):
-        if other.becomes == w.name:
-            add_worker(sg, other)
-            g.add_edge(Edge(other.name, w.name, color="blue"))
-        elif w.becomes == other.name:
-            add_worker(sg, other)
-            g.add_edge(Edge(w.name, other.name, color="blue"))
+    for other in w.predecessors:
+        add_worker(sg, other)
+        g.add_edge(Edge(other.name, w.name, color="blue"))
+    if w.becomes and w.becomes in t.workers:
+        add_worker(sg, t.workers[w.becomes])
+        g.add_edge(Edge(w.name, w.becomes, color="blue"))
 
     add_worker(sg, w)
     g.add_subgraph(sg)
@@ -350,12 +346,7 @@ def make_ware_graph(t, ware_name):
         rankdir="LR",
     )
 
-    buildings = [
-        bld
-        for bld in list(t.buildings.values())
-        if isinstance(bld, ProductionSite)
-        and (w.name in bld.inputs or w.name in bld.outputs)
-    ]
+    buildings = w.productionsites
     [
         add_building(
             g,
@@ -378,49 +369,87 @@ def make_ware_graph(t, ware_name):
 
 
 def process_dotfile(directory):
-    subprocess.Popen(
-        (
-            "dot -Tpng -o %s/menu.png -Tcmapx -o %s/map.map %s/source.dot"
-            % (directory, directory, directory)
-        ).split(" ")
-    ).wait()
+    subprocess.run(
+        [
+            "dot",
+            "-Tpng",
+            "-o",
+            path.join(directory, "menu.png"),
+            "-Tcmapx",
+            "-o",
+            path.join(directory, "map.map"),
+            path.join(directory, "source.dot"),
+        ],
+        check=True,
+    )
     # with open(directory,"w") as html:
     # html.write(r"""<IMG SRC="menu.png" border="0px" usemap="#G"/>""" +
     # open(path.join(directory, "map.map")).read())
 
 
-def make_all_subgraphs(t):
+def process_dotfiles(directories, workers=None):
+    """Run dot for all directories, at most 'workers' at the same time.
+
+    Returns a dict of directory: exception for the failed ones.
+
+    """
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {executor.submit(process_dotfile, d): d for d in directories}
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                errors[futures[future]] = future.exception()
+    return errors
+
+
+def subgraph_directories(tdir, t):
+    """Yield (class, name, directory) for all help graphs of tribe t."""
+
+    for cls, objects in (
+        ("wares", t.wares),
+        ("workers", t.workers),
+        ("buildings", t.buildings),
+    ):
+        for name in objects:
+            yield cls, name, path.join(tdir, "help/%s/%s/%s/" % (t.name, cls, name))
+
+
+def write_all_subgraphs(t):
+    """Write the dot sources of all help graphs of tribe t.
+
+    Returns the temporary directory containing the sources.
+
+    """
     global tdir
     tdir = mkdtemp(prefix="widelands-help")
     if isinstance(t, str):
         t = Tribe(t)
-    print("making all subgraphs for tribe", t.name, "in", tdir)
-
-    print("  making wares")
+    print("writing all subgraphs for tribe", t.name, "in", tdir)
 
     for w in t.wares:
-        print("    " + w)
         make_ware_graph(t, w)
-        process_dotfile(path.join(tdir, "help/%s/wares/%s/" % (t.name, w)))
-
-    print("  making workers")
 
     for w in t.workers:
-        print("    " + w)
         make_worker_graph(t, w)
-        process_dotfile(path.join(tdir, "help/%s/workers/%s/" % (t.name, w)))
-
-    print("  making buildings")
 
     for b in t.buildings:
-        print("    " + b)
         make_building_graph(t, b)
-        process_dotfile(path.join(tdir, "help/%s/buildings/%s/" % (t.name, b)))
 
     rtdir, tdir = tdir, ""
     return rtdir
 
 
+def make_all_subgraphs(t, workers=None):
+    if isinstance(t, str):
+        t = Tribe(t)
+    rtdir = write_all_subgraphs(t)
+    process_dotfiles(
+        [directory for cls, name, directory in subgraph_directories(rtdir, t)],
+        workers,
+    )
+    return rtdir
+
+
 def add_bases(tribe, building, g):
     if b.enhanced_building:
         add_building()
@@ -13,50 +13,91 @@ except:
 
 
 class BaseDescr(object):
+    """A map object of a tribe.
+
+    The json is parsed once on construction, lookups of related objects go
+    through the indexes of the tribe.
+
+    """
+
+    __slots__ = ("tribe", "name", "descname", "icon")
+
     def __init__(self, tribe, name, descname, json):
         self.tribe = tribe
-        self._json = json
         self.name = name
         self.descname = descname
+        self.icon = json.get("icon")
 
     @property
     def image(self):
-        return p.abspath(p.join(settings.WIDELANDS_SVN_DIR, "data", self._json["icon"]))
+        return p.abspath(p.join(settings.WIDELANDS_SVN_DIR, "data", self.icon))
 
 
 class Ware(BaseDescr):
+    __slots__ = ()
+
+    @property
+    def producers(self):
+        """Production sites having this ware as output."""
+        return self.tribe.producers.get(self.name, [])
+
+    @property
+    def consumers(self):
+        """Production sites having this ware as input."""
+        return self.tribe.consumers.get(self.name, [])
+
+    @property
+    def productionsites(self):
+        """Production sites having this ware as input or output."""
+        return self.tribe.ware_sites.get(self.name, [])
+
     def __str__(self):
         return "Ware(%s)" % self.name
 
 
 class Worker(BaseDescr):
-    @property
-    def becomes(self):
-        if "becomes" in self._json:
-            return self._json["becomes"]["name"]
+    __slots__ = ("becomes",)
+
+    def __init__(self, tribe, name, descname, json):
+        BaseDescr.__init__(self, tribe, name, descname, json)
+        if "becomes" in json:
+            self.becomes = json["becomes"]["name"]
         else:
-            return None
+            self.becomes = None
+
+    @property
+    def predecessors(self):
+        """Workers which become this worker by experience."""
+        return self.tribe.predecessors.get(self.name, [])
+
+    @property
+    def productionsites(self):
+        """Production sites employing or recruiting this worker."""
+        return self.tribe.worker_sites.get(self.name, [])
 
     def __str__(self):
         return "Worker(%s)" % self.name
 
 
 class Building(BaseDescr):
-    @property
-    def enhanced_building(self):
-        if "enhanced" in self._json:
-            return True
-        else:
-            return False
+    __slots__ = ("enhanced_building", "enhancement", "buildcost", "size")
+
+    def __init__(self, tribe, name, descname, json):
+        BaseDescr.__init__(self, tribe, name, descname, json)
+        self.enhanced_building = "enhanced" in json
+        self.enhancement = json.get("enhancement")
+        self.buildcost = {
+            buildcost["name"]: buildcost["amount"]
+            for buildcost in json.get("buildcost", [])
+        }
+        self.size = json.get("size")
 
     @property
     def base_building(self):
         if not self.enhanced_building:
             return None
-        bases = [
-            b for b in list(self.tribe.buildings.values()) if b.enhancement == self.name
-        ]
-        if len(bases) == 0 and self.enhanced_building:
+        bases = self.tribe.bases.get(self.name, [])
+        if len(bases) == 0:
             raise Exception(
                 "Building %s has no bases in tribe %s" % (self.name, self.tribe.name)
             )
@@ -67,86 +108,42 @@ class Building(BaseDescr):
             )
         return bases[0]
 
-    @property
-    def enhancement(self):
-        if "enhancement" in self._json:
-            return self._json["enhancement"]
-        else:
-            return None
-
-    @property
-    def buildcost(self):
-        result = dict()
-        if "buildcost" in self._json:
-            for buildcost in self._json["buildcost"]:
-                result[buildcost["name"]] = buildcost["amount"]
-        return result
-
-    @property
-    def size(self):
-        return self._json["size"]
-
 
 class ProductionSite(Building):
+    __slots__ = ("outputs", "inputs", "workers", "recruits")
     btype = "productionsite"
 
-    @property
-    def outputs(self):
-        result = set()
-        if "produced_wares" in self._json:
-            for warename in self._json["produced_wares"]:
-                result.add(warename)
-        return result
-
-    @property
-    def inputs(self):
-        result = dict()
-        if "stored_wares" in self._json:
-            for ware in self._json["stored_wares"]:
-                result[ware["name"]] = ware["amount"]
-        return result
-
-    @property
-    def workers(self):
-        result = dict()
-        if "workers" in self._json:
-            for worker in self._json["workers"]:
-                result[worker["name"]] = worker["amount"]
-        return result
-
-    @property
-    def recruits(self):
-        result = set()
-        if "produced_workers" in self._json:
-            for workername in self._json["produced_workers"]:
-                result.add(workername)
-        return result
+    def __init__(self, tribe, name, descname, json):
+        Building.__init__(self, tribe, name, descname, json)
+        self.outputs = set(json.get("produced_wares", []))
+        self.inputs = {
+            ware["name"]: ware["amount"] for ware in json.get("stored_wares", [])
+        }
+        self.workers = {
+            worker["name"]: worker["amount"] for worker in json.get("workers", [])
+        }
+        self.recruits = set(json.get("produced_workers", []))
 
 
 class Warehouse(Building):
+    __slots__ = ()
     btype = "warehouse"
-    pass
 
 
 class TrainingSite(ProductionSite):
+    __slots__ = ()
     btype = "trainingsite"
-    pass
 
 
 class MilitarySite(Building):
+    __slots__ = ("conquers", "max_soldiers", "heal_per_second")
     btype = "militarysite"
 
-    @property
-    def conquers(self):
-        return self._json["conquers"]
-
-    @property
-    def max_soldiers(self):
-        return self._json["max_soldiers"]
-
-    @property
-    def heal_per_second(self):
-        return self._json["heal_per_second"]
+    def __init__(self, tribe, name, descname, json):
+        Building.__init__(self, tribe, name, descname, json)
+        self.conquers = json.get("conquers")
+        self.max_soldiers = json.get("max_soldiers")
+        self.heal_per_second = json.get("heal_per_second")
 
 
 class Tribe(object):
@@ -201,5 +198,39 @@ class Tribe(object):
                     self, building["name"], descname, building
                 )
 
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Index the relations between the map objects.
+
+        All lists keep the order of the json files, so the graphs made from
+        them are stable.
+
+        """
+        self.producers = {}
+        self.consumers = {}
+        self.ware_sites = {}
+        self.worker_sites = {}
+        self.bases = {}
+        self.predecessors = {}
+
+        for b in self.buildings.values():
+            if b.enhancement:
+                self.bases.setdefault(b.enhancement, []).append(b)
+            if not isinstance(b, ProductionSite):
+                continue
+            for ware in b.outputs:
+                self.producers.setdefault(ware, []).append(b)
+            for ware in b.inputs:
+                self.consumers.setdefault(ware, []).append(b)
+            for ware in set(b.outputs).union(b.inputs):
+                self.ware_sites.setdefault(ware, []).append(b)
+            for worker in set(b.workers).union(b.recruits):
+                self.worker_sites.setdefault(worker, []).append(b)
+
+        for w in self.workers.values():
+            if w.becomes:
+                self.predecessors.setdefault(w.becomes, []).append(w)
+
     def __str__(self):
         return "Tribe(%s)" % self.name
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
+from django.urls import path
+from wiki import exchange
 from wiki.models import Article, ChangeSet
 from wlimages.models import Image
 from django.contrib.contenttypes.admin import GenericTabularInline
@@ -26,6 +30,40 @@ class ArticleAdmin(admin.ModelAdmin):
     raw_id_fields = ("creator",)
     inlines = [InlineImages]
 
+    def get_urls(self):
+        return [
+            path(
+                "export/",
+                self.admin_site.admin_view(self.export_view),
+                name="wiki_article_export",
+            )
+        ] + super().get_urls()
+
+    def export_view(self, request):
+        """Stream the wiki as export_wiki does.
+
+        Takes the parameters format=ndjson|tar and after=<article id>.
+
+        """
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        try:
+            after = int(request.GET.get("after", 0))
+        except ValueError:
+            after = 0
+        exported = exchange.export_articles(after)
+        if request.GET.get("format") == "tar":
+            chunks = exchange.tar_chunks(exported)
+            content_type, filename = "application/x-tar", "wiki.tar"
+        else:
+            chunks = exchange.ndjson_chunks(exported)
+            content_type, filename = "application/x-ndjson", "wiki.ndjson"
+        response = StreamingHttpResponse(
+            (data for pk, data in chunks), content_type=content_type
+        )
+        response["Content-Disposition"] = 'attachment; filename="%s"' % filename
+        return response
+
 
 admin.site.register(Article, ArticleAdmin)
 
@@ -8,5 +8,7 @@ class WikiConfig(AppConfig):
 
     def ready(self):
         from wiki.management import create_notice_types
+        from wiki.signals import setup_signals
 
         signals.post_migrate.connect(create_notice_types, sender=self)
+        setup_signals()
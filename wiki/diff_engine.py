@@ -0,0 +1,132 @@
+"""Diff engines for wiki diffs and revision patches.
+
+The engine is selected with settings.WIKI_DIFF_ENGINE:
+
+ - "dmp": the bundled diff_match_patch, diffing character by character.
+ - "lines": a line level diff with difflib, where only replaced blocks of
+   lines are refined character by character with diff_match_patch.
+
+Diffing is limited to settings.WIKI_DIFF_TIMEOUT seconds per call. If the
+time is up the remaining differences are returned in a coarser form, which
+is still correct but less minimal.
+
+Patches are always in the diff_match_patch text format, so revisions stored
+by one engine can be applied by the other.
+
+"""
+
+import difflib
+import time
+
+from django.conf import settings
+
+from .diff_match_patch import diff_match_patch
+
+TRUNCATED_NOTICE = "<p><em>The difference is too large and has been truncated.</em></p>"
+
+
+class DiffMatchPatchEngine(object):
+    """The bundled pure Python diff_match_patch."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.dmp = diff_match_patch()
+        self.dmp.Diff_Timeout = timeout
+
+    def diff(self, text1, text2):
+        """Return a list of (operation, text) tuples turning text1 into
+        text2."""
+        return self.dmp.diff_main(text1, text2)
+
+    def cleanup_semantic(self, diffs):
+        self.dmp.diff_cleanupSemantic(diffs)
+
+    def pretty_html_chunks(self, diffs, limit=None):
+        """Yield the html of the diffs piece by piece.
+
+        After about limit characters of text the output is truncated and
+        TRUNCATED_NOTICE is yielded instead of the rest.
+
+        """
+        remaining = limit
+        for op, data in diffs:
+            if remaining is not None and len(data) > remaining:
+                yield self.dmp.diff_prettyHtml([(op, data[:remaining])])
+                yield TRUNCATED_NOTICE
+                return
+            if remaining is not None:
+                remaining -= len(data)
+            yield self.dmp.diff_prettyHtml([(op, data)])
+
+    def pretty_html(self, diffs, limit=None):
+        return "".join(self.pretty_html_chunks(diffs, limit))
+
+    def patch_make(self, text1, text2):
+        """Return the patch from text1 to text2 as text."""
+        diffs = self.diff(text1, text2)
+        if len(diffs) > 2:
+            self.dmp.diff_cleanupSemantic(diffs)
+            self.dmp.diff_cleanupEfficiency(diffs)
+        return self.dmp.patch_toText(self.dmp.patch_make(text1, diffs))
+
+    def patch_apply(self, patch, text):
+        """Apply a patch made by patch_make() to text and return the
+        result."""
+        return self.dmp.patch_apply(self.dmp.patch_fromText(patch), text)[0]
+
+    def patch_sizes(self, patch):
+        """Return the number of (deleted, inserted) characters of a patch
+        made by patch_make()."""
+        deleted = inserted = 0
+        for p in self.dmp.patch_fromText(patch):
+            for op, data in p.diffs:
+                if op == self.dmp.DIFF_DELETE:
+                    deleted += len(data)
+                elif op == self.dmp.DIFF_INSERT:
+                    inserted += len(data)
+        return deleted, inserted
+
+
+class LineDiffEngine(DiffMatchPatchEngine):
+    """Diff lines first, refine replaced lines character by character.
+
+    Wiki edits usually touch a few lines of a long page. Matching whole
+    lines is much cheaper than matching characters, so only the changed
+    blocks are handed to diff_match_patch.
+
+    """
+
+    def diff(self, text1, text2):
+        deadline = time.time() + self.timeout if self.timeout > 0 else None
+        lines1 = text1.splitlines(True)
+        lines2 = text2.splitlines(True)
+        matcher = difflib.SequenceMatcher(None, lines1, lines2, autojunk=False)
+
+        diffs = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            old = "".join(lines1[i1:i2])
+            new = "".join(lines2[j1:j2])
+            if tag == "equal":
+                diffs.append((self.dmp.DIFF_EQUAL, old))
+            elif tag == "delete":
+                diffs.append((self.dmp.DIFF_DELETE, old))
+            elif tag == "insert":
+                diffs.append((self.dmp.DIFF_INSERT, new))
+            elif deadline is None or time.time() < deadline:
+                diffs.extend(self.dmp.diff_main(old, new, False, deadline))
+            else:
+                diffs.append((self.dmp.DIFF_DELETE, old))
+                diffs.append((self.dmp.DIFF_INSERT, new))
+        self.dmp.diff_cleanupMerge(diffs)
+        return diffs
+
+
+ENGINES = {
+    "dmp": DiffMatchPatchEngine,
+    "lines": LineDiffEngine,
+}
+
+
+def get_engine(name=None):
+    """Return the engine called name, defaults to the configured one."""
+    return ENGINES[name or settings.WIKI_DIFF_ENGINE](settings.WIKI_DIFF_TIMEOUT)
@@ -0,0 +1,366 @@
+"""Export and import of the wiki with its full history.
+
+The wiki is exported article by article, ordered by the article id. Each
+article becomes a group of records: the article itself, followed by its
+changesets and images. Users are referenced by their username.
+
+Two formats are supported:
+
+ - ndjson: one json record per line.
+ - tar: per article a member "wiki/<id>.ndjson" with its records. The
+   files of its images are stored as "images/<name>" before it.
+
+Only a bounded number of articles is held in memory at any time, in both
+directions. The id of the last article written or read is the checkpoint
+from which an interrupted export or import can be resumed.
+
+"""
+
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.files import File
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from tagging.models import Tag
+
+from mainpage.storage import content_storage
+from wiki import resolver
+from wiki.models import Article, ChangeSet, RecentChange
+from wlimages.models import Image
+
+FORMATS = ("ndjson", "tar")
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+def _article_record(article):
+    return {
+        "type": "article",
+        "id": article.pk,
+        "title": article.title,
+        "content": article.content,
+        "summary": article.summary,
+        "markup": article.markup,
+        "creator": article.creator.username if article.creator else None,
+        "created_at": _date(article.created_at),
+        "last_update": _date(article.last_update),
+        "deleted": article.deleted,
+        "tags": article.tags,
+    }
+
+
+def _changeset_record(cs):
+    return {
+        "type": "changeset",
+        "article": cs.article_id,
+        "revision": cs.revision,
+        "editor": cs.editor.username if cs.editor else None,
+        "old_title": cs.old_title,
+        "old_markup": cs.old_markup,
+        "content_diff": cs.content_diff,
+        "comment": cs.comment,
+        "modified": _date(cs.modified),
+        "reverted": cs.reverted,
+        "chars_added": cs.chars_added,
+        "chars_removed": cs.chars_removed,
+    }
+
+
+def _image_record(img):
+    return {
+        "type": "image",
+        "article": img.object_id,
+        "name": img.name,
+        "revision": img.revision,
+        "user": img.user.username,
+        "date_submitted": _date(img.date_submitted),
+        "file": img.image.name,
+    }
+
+
+def export_articles(after=0, chunk_size=100):
+    """Yield (article id, records) for the articles with an id > after.
+
+    Articles belonging to a group are not exported.
+
+    """
+    article_type = ContentType.objects.get_for_model(Article)
+    while True:
+        articles = list(
+            Article.objects.filter(pk__gt=after, content_type__isnull=True)
+            .select_related("creator")
+            .order_by("pk")[:chunk_size]
+        )
+        if not articles:
+            return
+        ids = [a.pk for a in articles]
+
+        records = {a.pk: [_article_record(a)] for a in articles}
+        changesets = (
+            ChangeSet.objects.filter(article_id__in=ids)
+            .select_related("editor")
+            .order_by("article_id", "revision")
+        )
+        for cs in changesets.iterator():
+            records[cs.article_id].append(_changeset_record(cs))
+        images = (
+            Image.objects.filter(content_type=article_type, object_id__in=ids)
+            .select_related("user")
+            .order_by("object_id", "name", "revision")
+        )
+        for img in images.iterator():
+            records[img.object_id].append(_image_record(img))
+
+        for pk in ids:
+            yield pk, records.pop(pk)
+        after = ids[-1]
+
+
+def ndjson_chunks(exported):
+    """Yield (article id, bytes) of the exported articles as ndjson."""
+    for pk, records in exported:
+        yield pk, b"".join(
+            json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n" for r in records
+        )
+
+
+class _Buffer(object):
+    """Write only file object collecting the output of tarfile."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def tar_chunks(exported, compression=""):
+    """Yield (article id, bytes) of the exported articles as tar archive.
+
+    The last chunk closes the archive and has the article id None.
+
+    """
+    buf = _Buffer()
+    tar = tarfile.open(fileobj=buf, mode="w|" + compression)
+    for pk, records in exported:
+        for r in records:
+            if r["type"] == "image" and content_storage.exists(r["file"]):
+                info = tarfile.TarInfo("images/" + r["file"])
+                info.size = content_storage.size(r["file"])
+                info.mtime = time.time()
+                with content_storage.open(r["file"]) as f:
+                    tar.addfile(info, f)
+        data = b"".join(
+            json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n" for r in records
+        )
+        info = tarfile.TarInfo("wiki/%d.ndjson" % pk)
+        info.size = len(data)
+        info.mtime = time.time()
+        tar.addfile(info, io.BytesIO(data))
+        yield pk, buf.drain()
+    tar.close()
+    yield None, buf.drain()
+
+
+def read_ndjson(fileobj):
+    """Yield the records of an ndjson export."""
+    for line in fileobj:
+        line = line.strip()
+        if line:
+            yield json.loads(line.decode("utf-8") if isinstance(line, bytes) else line)
+
+
+def read_tar(fileobj, files):
+    """Yield the records of a tar export.
+
+    The image files are stored in the content storage on the way, files maps
+    their exported names to the new ones. The references added by storing
+    them are held until Importer.release_files() is called.
+
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            f = tar.extractfile(member)
+            if member.name.startswith("images/"):
+                name = member.name[len("images/") :]
+                # Members of a stream can't be seeked, as the storage does
+                with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as tmp:
+                    shutil.copyfileobj(f, tmp)
+                    files[name] = content_storage.save(
+                        os.path.basename(name), File(tmp, name)
+                    )
+            elif member.name.endswith(".ndjson"):
+                yield from read_ndjson(f)
+
+
+def read_checkpoint(path):
+    """Return the article id stored in the checkpoint file, or 0."""
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    return 0
+
+
+def write_checkpoint(path, pk):
+    if path:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("%d\n" % pk)
+        os.replace(tmp, path)
+
+
+class Importer(object):
+    """Create the articles of exported records in batches.
+
+    Articles with a title already present in the wiki are skipped, so
+    importing the same data twice is harmless. The images of the imported
+    articles add their own references to the files read by read_tar(), call
+    release_files() when done to drop the ones of the skipped articles.
+
+    """
+
+    def __init__(self, batch_size=100, after=0, files=None):
+        self.batch_size = batch_size
+        self.after = after
+        # Exported image file name -> name in the content storage
+        self.files = {} if files is None else files
+        self.batch = []
+        self.imported = self.skipped = 0
+        self.checkpoint = after
+
+    def release_files(self):
+        """Release the references held for the files read by read_tar()."""
+        for name in self.files.values():
+            content_storage.delete(name)
+        self.files.clear()
+
+    def feed(self, records):
+        """Import records, yield the checkpoint after each batch."""
+        for r in records:
+            if r["type"] == "article":
+                if r["id"] <= self.after:
+                    continue
+                if len(self.batch) >= self.batch_size:
+                    self.flush()
+                    yield self.checkpoint
+                self.batch.append((r, []))
+            elif self.batch and r["article"] == self.batch[-1][0]["id"]:
+                self.batch[-1][1].append(r)
+        if self.batch:
+            self.flush()
+            yield self.checkpoint
+
+    def _user_ids(self):
+        names = set()
+        for article, records in self.batch:
+            names.add(article["creator"])
+            names.update(r.get("editor") or r.get("user") for r in records)
+        names.discard(None)
+        return dict(
+            User.objects.filter(username__in=names).values_list("username", "id")
+        )
+
+    @transaction.atomic
+    def flush(self):
+        users = self._user_ids()
+        titles = [article["title"] for article, records in self.batch]
+        existing = set(
+            Article.objects.filter(title__in=titles).values_list("title", flat=True)
+        )
+        batch = [(a, r) for a, r in self.batch if a["title"] not in existing]
+        self.skipped += len(self.batch) - len(batch)
+        self.checkpoint = self.batch[-1][0]["id"]
+        self.batch = []
+        if not batch:
+            return
+
+        Article.objects.bulk_create(
+            Article(
+                title=a["title"],
+                content=a["content"],
+                summary=a["summary"],
+                markup=a["markup"],
+                creator_id=users.get(a["creator"]),
+                created_at=parse_datetime(a["created_at"]),
+                last_update=a["last_update"] and parse_datetime(a["last_update"]),
+                deleted=a["deleted"],
+                tags=a["tags"],
+            )
+            for a, records in batch
+        )
+        # bulk_create() does not set the ids on all databases
+        ids = dict(
+            Article.objects.filter(
+                title__in=[a["title"] for a, r in batch]
+            ).values_list("title", "id")
+        )
+
+        changesets = []
+        images = []
+        for a, records in batch:
+            article_id = ids[a["title"]]
+            for r in records:
+                if r["type"] == "changeset":
+                    changesets.append(
+                        ChangeSet(
+                            article_id=article_id,
+                            revision=r["revision"],
+                            editor_id=users.get(r["editor"]),
+                            old_title=r["old_title"],
+                            old_markup=r["old_markup"],
+                            content_diff=r["content_diff"],
+                            comment=r["comment"],
+                            modified=parse_datetime(r["modified"]),
+                            reverted=r["reverted"],
+                            chars_added=r["chars_added"],
+                            chars_removed=r["chars_removed"],
+                        )
+                    )
+                elif r["type"] == "image" and r["user"] in users:
+                    images.append(self._image(article_id, r, users[r["user"]]))
+        ChangeSet.objects.bulk_create(changesets)
+        Image.objects.bulk_create(images)
+        RecentChange.objects.populate(ids.values())
+
+        # Neither tags nor the title cache are updated without signals
+        for article in Article.objects.filter(pk__in=ids.values()).exclude(tags=""):
+            Tag.objects.update_tags(article, article.tags)
+        resolver.invalidate(*ids)
+        self.imported += len(batch)
+
+    def _image(self, article_id, record, user_id):
+        name = self.files.get(record["file"])
+        if name is None:
+            # Not part of the export, the file is expected to be present
+            # already, e.g. in a mirrored media directory
+            name = record["file"]
+        if content_storage.exists(name):
+            content_storage.share(name)
+        return Image(
+            content_type=ContentType.objects.get_for_model(Article),
+            object_id=article_id,
+            name=record["name"],
+            revision=record["revision"],
+            user_id=user_id,
+            date_submitted=parse_datetime(record["date_submitted"]),
+            image=name,
+        )
@@ -1,7 +1,20 @@
+from django.conf import settings
 from django.contrib.syndication.views import Feed, FeedDoesNotExist
-from wiki.models import ChangeSet, Article
+from django.core.cache import cache
+from wiki.models import RecentChange, Article
 from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
 
+
+def recent_changes(**filters):
+    """Return the latest changes, cached for a short time."""
+    key = "wiki-feed-%s" % "-".join("%s=%s" % f for f in sorted(filters.items()))
+    return cache.get_or_set(
+        key,
+        lambda: RecentChange.objects.visible().filter(**filters).fetch(30),
+        settings.WIKI_RECENT_CHANGES_CACHE_TIMEOUT,
+    )
+
+
 # Validated through http://validator.w3.org/feed/
 
 
@@ -14,9 +27,7 @@ class RssHistoryFeed(Feed):
     description_template = "wiki/feeds/history_description.html"
 
     def items(self):
-        return ChangeSet.objects.exclude(article__deleted=True).order_by("-modified")[
-            :30
-        ]
+        return recent_changes()
 
     def item_pubdate(self, item):
         """Return the item's pubdate.
@@ -62,11 +73,7 @@ class RssArticleHistoryFeed(Feed):
         return "Recent changes in %s" % item.title
 
     def items(self, item):
-        return (
-            ChangeSet.objects.exclude(article__deleted=True)
-            .filter(article__id__exact=item.id)
-            .order_by("-modified")[:30]
-        )
+        return recent_changes(article_id=item.id)
 
     def item_pubdate(self, item):
         """Returns the modified date."""
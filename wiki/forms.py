@@ -7,6 +7,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from wiki.models import Article
 from wiki.models import ChangeSet
+from wiki import resolver
 from django.conf import settings
 
 try:
@@ -140,5 +141,6 @@ class ArticleForm(forms.ModelForm):
         changeset = article.new_revision(
             self.old_content, self.old_title, self.old_markup, comment, editor
         )
+        resolver.invalidate(self.old_title, article.title)
 
         return article, changeset
@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from wiki.diff_engine import ENGINES, get_engine
+from wiki.models import Article
+
+
+class Command(BaseCommand):
+    help = """Compare the diff engines on revision pairs of the wiki.
+
+    For each engine the time to diff and to make a patch is measured. The
+    patches are checked by applying them to the old revision."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--articles",
+            type=int,
+            default=50,
+            help="Number of most recently changed articles to use.",
+        )
+        parser.add_argument(
+            "--revisions",
+            type=int,
+            default=20,
+            help="Number of revisions to use per article.",
+        )
+        parser.add_argument(
+            "--engine",
+            action="append",
+            choices=sorted(ENGINES),
+            help="Engine to benchmark. Defaults to all engines.",
+        )
+
+    def _revision_pairs(self, articles, revisions):
+        """Yield (older, newer) contents of consecutive revisions."""
+        engine = get_engine("dmp")
+        for article in Article.objects.order_by("-last_update")[:articles]:
+            newer = article.content
+            for changeset in article.changeset_set.order_by("-revision")[:revisions]:
+                older = engine.patch_apply(changeset.content_diff, newer)
+                yield older, newer
+                newer = older
+
+    def handle(self, *args, **options):
+        pairs = list(self._revision_pairs(options["articles"], options["revisions"]))
+        if not pairs:
+            self.stdout.write("No revisions found.")
+            return
+
+        size = sum(len(old) + len(new) for old, new in pairs)
+        self.stdout.write(
+            "{} revision pairs, {} characters in total".format(len(pairs), size)
+        )
+        for name in options["engine"] or sorted(ENGINES):
+            engine = get_engine(name)
+            slowest = total_diff = total_patch = 0
+            patch_size = broken = 0
+            for old, new in pairs:
+                start = time.perf_counter()
+                engine.diff(old, new)
+                elapsed = time.perf_counter() - start
+                total_diff += elapsed
+                slowest = max(slowest, elapsed)
+
+                start = time.perf_counter()
+                patch = engine.patch_make(old, new)
+                total_patch += time.perf_counter() - start
+                patch_size += len(patch)
+                if engine.patch_apply(patch, old) != new:
+                    broken += 1
+
+            self.stdout.write(
+                "{:6} diff: {:.3f}s total, {:.3f}s slowest | "
+                "patch: {:.3f}s total, {} characters, {} not applicable".format(
+                    name, total_diff, slowest, total_patch, patch_size, broken
+                )
+            )
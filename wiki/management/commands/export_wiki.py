@@ -0,0 +1,68 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from wiki import exchange
+
+
+class Command(BaseCommand):
+    help = """Export the wiki articles with their history and images.
+
+    The articles are written one by one, so memory usage does not depend on
+    the size of the wiki. With --checkpoint the id of the last written
+    article is recorded, and a later run continues after it. An ndjson
+    export is continued in the same file, a tar export needs a new file."""
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write, '-' for stdout.")
+        parser.add_argument(
+            "--format",
+            choices=exchange.FORMATS,
+            help="Defaults to tar for .tar, .tar.gz and .tgz files, else ndjson.",
+        )
+        parser.add_argument(
+            "--checkpoint", help="File to keep the id of the last exported article."
+        )
+        parser.add_argument(
+            "--after",
+            type=int,
+            default=0,
+            help="Export only articles with a higher id.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100,
+            help="Number of articles fetched per query.",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        fmt = options["format"]
+        if fmt is None:
+            fmt = "tar" if output.endswith((".tar", ".tar.gz", ".tgz")) else "ndjson"
+        after = max(options["after"], exchange.read_checkpoint(options["checkpoint"]))
+
+        exported = exchange.export_articles(after, options["chunk_size"])
+        if fmt == "tar":
+            compression = "gz" if output.endswith("gz") else ""
+            chunks = exchange.tar_chunks(exported, compression)
+        else:
+            chunks = exchange.ndjson_chunks(exported)
+
+        if output == "-":
+            out = sys.stdout.buffer
+        else:
+            out = open(output, "ab" if after and fmt == "ndjson" else "wb")
+        count = 0
+        try:
+            for pk, data in chunks:
+                out.write(data)
+                if pk is not None:
+                    count += 1
+                    out.flush()
+                    exchange.write_checkpoint(options["checkpoint"], pk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        self.stderr.write("Exported {} articles.".format(count))
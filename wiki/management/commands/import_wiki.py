@@ -0,0 +1,67 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from wiki import exchange
+
+
+class Command(BaseCommand):
+    help = """Import wiki articles exported with export_wiki.
+
+    The articles are created in batches with their history and images.
+    Articles whose title exists already are skipped. With --checkpoint the
+    id of the last imported article is recorded, and a later run continues
+    after it."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "input", nargs="+", help="Files to read in this order, '-' for stdin."
+        )
+        parser.add_argument(
+            "--format",
+            choices=exchange.FORMATS,
+            help="Defaults to tar for .tar, .tar.gz and .tgz files, else ndjson.",
+        )
+        parser.add_argument(
+            "--checkpoint", help="File to keep the id of the last imported article."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of articles created per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        importer = exchange.Importer(
+            options["batch_size"], exchange.read_checkpoint(options["checkpoint"])
+        )
+        try:
+            self._import(importer, options)
+        finally:
+            # Files of skipped articles are deleted again
+            importer.release_files()
+
+        self.stdout.write(
+            "Imported {} articles, skipped {} existing ones.".format(
+                importer.imported, importer.skipped
+            )
+        )
+
+    def _import(self, importer, options):
+        for path in options["input"]:
+            fmt = options["format"]
+            if fmt is None:
+                fmt = "tar" if path.endswith((".tar", ".tar.gz", ".tgz")) else "ndjson"
+
+            f = sys.stdin.buffer if path == "-" else open(path, "rb")
+            try:
+                if fmt == "tar":
+                    records = exchange.read_tar(f, importer.files)
+                else:
+                    records = exchange.read_ndjson(f)
+                for checkpoint in importer.feed(records):
+                    exchange.write_checkpoint(options["checkpoint"], checkpoint)
+            finally:
+                if f is not sys.stdin.buffer:
+                    f.close()
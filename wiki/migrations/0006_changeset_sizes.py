@@ -0,0 +1,38 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:27
+
+from django.db import migrations, models
+
+
+def calculate_sizes(apps, schema_editor):
+    from wiki.diff_engine import get_engine
+
+    engine = get_engine("dmp")
+    ChangeSet = apps.get_model("wiki", "ChangeSet")
+    batch = []
+    for cs in ChangeSet.objects.only("content_diff").iterator():
+        cs.chars_added, cs.chars_removed = engine.patch_sizes(cs.content_diff)
+        batch.append(cs)
+        if len(batch) == 500:
+            ChangeSet.objects.bulk_update(batch, ["chars_added", "chars_removed"])
+            batch = []
+    ChangeSet.objects.bulk_update(batch, ["chars_added", "chars_removed"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wiki", "0005_article_deleted"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="changeset",
+            name="chars_added",
+            field=models.IntegerField(default=0, verbose_name="Characters added"),
+        ),
+        migrations.AddField(
+            model_name="changeset",
+            name="chars_removed",
+            field=models.IntegerField(default=0, verbose_name="Characters removed"),
+        ),
+        migrations.RunPython(calculate_sizes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_recent_changes(apps, schema_editor):
+    ChangeSet = apps.get_model("wiki", "ChangeSet")
+    RecentChange = apps.get_model("wiki", "RecentChange")
+
+    entries = []
+    for cs in ChangeSet.objects.select_related("article").iterator():
+        entries.append(
+            RecentChange(
+                changeset_id=cs.pk,
+                article_id=cs.article_id,
+                article_title=cs.article.title,
+                article_deleted=cs.article.deleted,
+                revision=cs.revision,
+                old_title=cs.old_title,
+                editor_id=cs.editor_id,
+                comment=cs.comment,
+                chars_added=cs.chars_added,
+                chars_removed=cs.chars_removed,
+                modified=cs.modified,
+            )
+        )
+        if len(entries) == 500:
+            RecentChange.objects.bulk_create(entries)
+            entries = []
+    RecentChange.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("wiki", "0006_changeset_sizes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecentChange",
+            fields=[
+                (
+                    "changeset",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="recent",
+                        serialize=False,
+                        to="wiki.ChangeSet",
+                    ),
+                ),
+                ("article_title", models.CharField(max_length=50)),
+                ("article_deleted", models.BooleanField(default=False)),
+                ("revision", models.IntegerField()),
+                ("old_title", models.CharField(blank=True, max_length=50)),
+                ("comment", models.TextField(blank=True)),
+                ("chars_added", models.IntegerField(default=0)),
+                ("chars_removed", models.IntegerField(default=0)),
+                ("modified", models.DateTimeField()),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="wiki.Article"
+                    ),
+                ),
+                (
+                    "editor",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="recentchange",
+            index=models.Index(
+                fields=["article_deleted", "-modified", "-changeset"],
+                name="wiki_recent_article_66393c_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recentchange",
+            index=models.Index(
+                fields=["article", "-modified", "-changeset"],
+                name="wiki_recent_article_8496a1_idx",
+            ),
+        ),
+        migrations.RunPython(populate_recent_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wiki", "0007_recent_changes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="changeset",
+            name="old_title",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=50, verbose_name="Old Title"
+            ),
+        ),
+    ]
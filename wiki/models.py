@@ -1,16 +1,17 @@
 from datetime import datetime
 from django.urls import reverse
 
-# Google Diff Match Patch library
-# http://code.google.com/p/google-diff-match-patch
-from .diff_match_patch import diff_match_patch
+from .diff_engine import get_engine
+from . import resolver
 
 from django.db import models
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericRelation, GenericForeignKey
+from django.contrib.redirects.models import Redirect
 
 from tagging.fields import TagField
 
@@ -22,14 +23,26 @@ try:
 except ImportError:
     notification = None
 
-# We dont need to create a new one everytime
-dmp = diff_match_patch()
-
 
 def diff(txt1, txt2):
     """Create a 'diff' from txt1 to txt2."""
-    patch = dmp.patch_make(txt1, txt2)
-    return dmp.patch_toText(patch)
+    return get_engine().patch_make(txt1, txt2)
+
+
+def redirects_for(articles, batch_size=500):
+    """Return a dict of article id: Redirect for the articles which have a
+    django redirect.
+
+    Needs one query per batch_size articles.
+
+    """
+    paths = {a.get_absolute_url(): a.pk for a in articles}
+    path_list = list(paths)
+    result = {}
+    for i in range(0, len(path_list), batch_size):
+        for r in Redirect.objects.filter(old_path__in=path_list[i : i + batch_size]):
+            result[paths[r.old_path]] = r
+    return result
 
 
 try:
@@ -154,7 +167,9 @@ class ChangeSet(models.Model):
     revision = models.IntegerField(_("Revision Number"))
 
     # How to recreate this version
-    old_title = models.CharField(_("Old Title"), max_length=50, blank=True)
+    old_title = models.CharField(
+        _("Old Title"), max_length=50, blank=True, db_index=True
+    )
     old_markup = models.CharField(
         _("Article Content Markup"),
         max_length=3,
@@ -167,6 +182,9 @@ class ChangeSet(models.Model):
     comment = models.TextField(_("Editor comment"), blank=True)
     modified = models.DateTimeField(_("Modified at"), default=datetime.now)
     reverted = models.BooleanField(_("Reverted Revision"), default=False)
+    # Size of the change, calculated from content_diff on creation
+    chars_added = models.IntegerField(_("Characters added"), default=0)
+    chars_removed = models.IntegerField(_("Characters removed"), default=0)
 
     objects = ChangeSetManager()
 
@@ -209,12 +227,12 @@ class ChangeSet(models.Model):
 
         article = self.article
 
+        engine = get_engine()
         content = None
         for changeset in next_changes:
             if content is None:
                 content = article.content
-            patch = dmp.patch_fromText(changeset.content_diff)
-            content = dmp.patch_apply(patch, content)[0]
+            content = engine.patch_apply(changeset.content_diff, content)
 
             changeset.reverted = True
             changeset.save()
@@ -227,6 +245,7 @@ class ChangeSet(models.Model):
         article.title = changeset.old_title
         article.markup = changeset.old_markup
         article.save()
+        resolver.invalidate(old_title, article.title)
 
         article.new_revision(
             old_content=old_content,
@@ -254,6 +273,10 @@ class ChangeSet(models.Model):
                 )
             except self.DoesNotExist:
                 self.revision = 1
+            # content_diff leads from the new to the old content
+            self.chars_added, self.chars_removed = get_engine().patch_sizes(
+                self.content_diff
+            )
 
         super(ChangeSet, self).save(*args, **kwargs)
 
@@ -263,12 +286,26 @@ class ChangeSet(models.Model):
         newer_changesets = ChangeSet.objects.filter(
             article=self.article, revision__gt=self.revision
         ).order_by("-revision")
+        engine = get_engine()
         for changeset in newer_changesets:
-            patches = dmp.patch_fromText(changeset.content_diff)
-            content = dmp.patch_apply(patches, content)[0]
+            content = engine.patch_apply(changeset.content_diff, content)
         return content
 
     def compare_to(self, revision_from):
+        """Return the html diff from revision_from to this revision.
+
+        Revisions never change, so the result is cached.
+
+        """
+        key = "wiki-diff-%s-%s-%s" % (
+            self.article_id,
+            int(revision_from),
+            self.revision,
+        )
+        html = cache.get(key)
+        if html is not None:
+            return html
+
         other_content = ""
         if int(revision_from) > 0:
             other_content = (
@@ -278,6 +315,140 @@ class ChangeSet(models.Model):
                 .order_by("-revision")[0]
                 .get_content()
             )
-        diffs = dmp.diff_main(other_content, self.get_content())
-        # dmp.diff_cleanupSemantic(diffs)
-        return dmp.diff_prettyHtml(diffs)
+        engine = get_engine()
+        diffs = engine.diff(other_content, self.get_content())
+        # engine.cleanup_semantic(diffs)
+        html = engine.pretty_html(diffs, settings.WIKI_DIFF_MAX_SIZE)
+        cache.set(key, html, settings.WIKI_DIFF_CACHE_TIMEOUT)
+        return html
+
+
+class RecentChangeQuerySet(models.QuerySet):
+    def visible(self):
+        return self.filter(article_deleted=False).order_by("-modified", "-changeset")
+
+    def before(self, cursor):
+        """Return the changes older than cursor, see RecentChange.cursor.
+
+        Raises ValueError for an invalid cursor.
+
+        """
+        modified, changeset_id = cursor.rsplit("_", 1)
+        modified = datetime.fromisoformat(modified)
+        changeset_id = int(changeset_id)
+        return self.filter(
+            models.Q(modified__lt=modified)
+            | models.Q(modified=modified, changeset_id__lt=changeset_id)
+        )
+
+    def fetch(self, limit):
+        """Return a list of up to limit changes.
+
+        The editors and their existing profiles are fetched along, so
+        rendering user links needs no further queries.
+
+        """
+        from wlprofile.models import Profile
+
+        changes = list(self.select_related("editor")[:limit])
+        profiles = Profile.objects.in_bulk(
+            set(c.editor_id for c in changes if c.editor_id), field_name="user_id"
+        )
+        for c in changes:
+            if c.editor_id in profiles:
+                c.editor.wlprofile = profiles[c.editor_id]
+        return changes
+
+
+class RecentChangeManager(models.Manager.from_queryset(RecentChangeQuerySet)):
+    @staticmethod
+    def _values(changeset):
+        article = changeset.article
+        return {
+            "article": article,
+            "article_title": article.title,
+            "article_deleted": article.deleted,
+            "revision": changeset.revision,
+            "old_title": changeset.old_title,
+            "editor_id": changeset.editor_id,
+            "comment": changeset.comment,
+            "chars_added": changeset.chars_added,
+            "chars_removed": changeset.chars_removed,
+            "modified": changeset.modified,
+        }
+
+    def refresh_for_changeset(self, changeset):
+        """Create or update the entry of a changeset."""
+        entry, created = self.update_or_create(
+            changeset=changeset, defaults=self._values(changeset)
+        )
+        return entry
+
+    def populate(self, article_ids, batch_size=500):
+        """Create the entries of all changesets of the articles.
+
+        For changesets created with bulk_create(), which sends no signals.
+
+        """
+        changesets = ChangeSet.objects.filter(article_id__in=article_ids)
+        self.bulk_create(
+            (
+                self.model(changeset=cs, **self._values(cs))
+                for cs in changesets.select_related("article").iterator()
+            ),
+            batch_size=batch_size,
+        )
+
+    def refresh_for_article(self, article):
+        """Copy a changed title or deleted flag of an article."""
+        return (
+            self.filter(article=article)
+            .exclude(article_title=article.title, article_deleted=article.deleted)
+            .update(article_title=article.title, article_deleted=article.deleted)
+        )
+
+
+class RecentChange(models.Model):
+    """Denormalized copy of a ChangeSet for the recent changes and feeds.
+
+    The entries are kept up to date by the signal handlers in wiki.signals.
+    They are read in keyset order (modified, changeset), so deep pages of
+    the history cost the same as the first one.
+
+    """
+
+    changeset = models.OneToOneField(
+        ChangeSet, on_delete=models.CASCADE, primary_key=True, related_name="recent"
+    )
+    article = models.ForeignKey(Article, on_delete=models.CASCADE)
+    article_title = models.CharField(max_length=50)
+    article_deleted = models.BooleanField(default=False)
+    revision = models.IntegerField()
+    old_title = models.CharField(max_length=50, blank=True)
+    editor = models.ForeignKey(User, null=True, on_delete=models.CASCADE)
+    comment = models.TextField(blank=True)
+    chars_added = models.IntegerField(default=0)
+    chars_removed = models.IntegerField(default=0)
+    modified = models.DateTimeField()
+
+    objects = RecentChangeManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["article_deleted", "-modified", "-changeset"]),
+            models.Index(fields=["article", "-modified", "-changeset"]),
+        ]
+
+    def __str__(self):
+        return "%s #%s" % (self.article_title, self.revision)
+
+    @property
+    def cursor(self):
+        """Position of this change for RecentChangeQuerySet.before()."""
+        return "%s_%s" % (self.modified.isoformat(), self.changeset_id)
+
+    def get_absolute_url(self):
+        return reverse(
+            "wiki_changeset",
+            kwargs={"title": self.article_title, "revision": self.revision},
+        )
@@ -0,0 +1,97 @@
+"""Resolve wiki titles to articles.
+
+A title resolves to the article having this title, or to the article which
+had it before it was renamed. For deleted articles it is also noted whether
+a django redirect exists for them.
+
+The results are kept in an LRU cache of the process for at most
+WIKI_TITLE_CACHE_TIMEOUT seconds. Each title has a version in the shared
+cache, like the tags of mainpage.page_cache, so a title invalidated by any
+process is looked up again everywhere. A cached result costs one query of
+the shared cache instead of the lookups in the database.
+
+"""
+
+from collections import OrderedDict, namedtuple
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+
+from mainpage import page_cache
+
+# article_id: None if no article ever had this title
+# redirected_from: the title, if it is an old title of the article
+# redirect: True if the article is deleted and has a django redirect
+Resolution = namedtuple("Resolution", "article_id redirected_from redirect")
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+# Version of all titles, changed by clear()
+ALL_TITLES = "wiki-titles"
+
+
+def _tags(title):
+    digest = hashlib.md5(title.encode("utf-8")).hexdigest()
+    return [ALL_TITLES, "wiki-title-%s" % digest]
+
+
+def _lookup(title):
+    from wiki.models import Article, ChangeSet, redirects_for
+
+    redirected_from = None
+    row = Article.objects.filter(title=title).values_list("id", "deleted").first()
+    if row is None:
+        # try to find an article that once had this title
+        row = (
+            ChangeSet.objects.filter(old_title=title)
+            .order_by("-revision")
+            .values_list("article_id", "article__deleted")
+            .first()
+        )
+        redirected_from = title
+    if row is None:
+        return Resolution(None, None, False)
+
+    article_id, deleted = row
+    redirect = False
+    if deleted:
+        redirect = bool(redirects_for([Article.objects.get(pk=article_id)]))
+    return Resolution(article_id, redirected_from, redirect)
+
+
+def resolve(title):
+    """Return the Resolution for title."""
+    now = time.monotonic()
+    # Taken before the lookup, so a change made meanwhile is not hidden
+    versions = page_cache.versions(_tags(title))
+    with _lock:
+        entry = _cache.get(title)
+        if entry is not None and entry[0] > now and entry[1] == versions:
+            _cache.move_to_end(title)
+            return entry[2]
+
+    resolution = _lookup(title)
+    with _lock:
+        _cache[title] = (now + settings.WIKI_TITLE_CACHE_TIMEOUT, versions, resolution)
+        _cache.move_to_end(title)
+        while len(_cache) > settings.WIKI_TITLE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return resolution
+
+
+def invalidate(*titles):
+    """Forget the given titles in all processes, e.g. after renaming an
+    article."""
+    page_cache.purge(*[_tags(title)[1] for title in titles])
+    with _lock:
+        for title in titles:
+            _cache.pop(title, None)
+
+
+def clear():
+    page_cache.purge(ALL_TITLES)
+    with _lock:
+        _cache.clear()
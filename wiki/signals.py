@@ -0,0 +1,30 @@
+from django.contrib.redirects.models import Redirect
+from django.db.models.signals import post_delete, post_save
+
+from wiki import resolver
+from wiki.models import Article, ChangeSet, RecentChange
+
+
+def changeset_saved(instance, raw=False, **kwargs):
+    if raw:
+        return
+    RecentChange.objects.refresh_for_changeset(instance)
+
+
+def article_saved(instance, created=False, raw=False, **kwargs):
+    resolver.invalidate(instance.title)
+    if raw or created:
+        return
+    RecentChange.objects.refresh_for_article(instance)
+
+
+def redirect_changed(**kwargs):
+    # Redirects are rare, no need to find the affected titles
+    resolver.clear()
+
+
+def setup_signals():
+    post_save.connect(changeset_saved, sender=ChangeSet)
+    post_save.connect(article_saved, sender=Article)
+    post_save.connect(redirect_changed, sender=Redirect)
+    post_delete.connect(redirect_changed, sender=Redirect)
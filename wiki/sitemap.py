@@ -5,6 +5,7 @@ from mainpage.sitemaps import SitemapHTTPS
 class WikiSitemap(SitemapHTTPS):
     changefreq = "yearly"
     priority = 0.5
+    watermark = ("title", "last_update")
 
     def items(self):
         return Article.objects.exclude(deleted=True)
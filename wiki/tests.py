@@ -0,0 +1,329 @@
+import io
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.redirects.models import Redirect
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from wiki.diff_engine import TRUNCATED_NOTICE, get_engine
+from notification import models as notification
+from tagging.models import Tag
+
+from wiki import exchange, resolver
+from mainpage.models import StoredFile
+from wiki.models import Article, RecentChange, redirects_for
+from wlimages.models import Image
+
+OLD = "".join("Line %d of the page.\n" % i for i in range(200))
+NEW = OLD.replace("Line 42 of", "Line 42 in").replace("Line 150 of the page.\n", "")
+
+
+class TestDiffEngines_PatchRoundTrip_ExceptCorrectResult(TestCase):
+    def runTest(self):
+        for name in ("dmp", "lines"):
+            engine = get_engine(name)
+            patch = engine.patch_make(OLD, NEW)
+            self.assertEqual(engine.patch_apply(patch, OLD), NEW, name)
+            # Patches are interchangeable between the engines
+            other = get_engine("lines" if name == "dmp" else "dmp")
+            self.assertEqual(other.patch_apply(patch, OLD), NEW, name)
+
+
+class TestLineDiffEngine_RefinesChangedLines_ExceptCorrectResult(TestCase):
+    def runTest(self):
+        engine = get_engine("lines")
+        changes = [(op, text) for op, text in engine.diff(OLD, NEW) if op != 0]
+        self.assertEqual(
+            changes,
+            [(-1, "of"), (1, "in"), (-1, "Line 150 of the page.\n")],
+        )
+        self.assertEqual(engine.diff("", ""), [])
+
+
+@override_settings(WIKI_DIFF_TIMEOUT=0.000001)
+class TestLineDiffEngine_TimeoutReturnsCoarseDiff_ExceptCorrectResult(TestCase):
+    def runTest(self):
+        engine = get_engine("lines")
+        diffs = engine.diff(OLD, NEW)
+        old = "".join(text for op, text in diffs if op <= 0)
+        new = "".join(text for op, text in diffs if op >= 0)
+        self.assertEqual((old, new), (OLD, NEW))
+
+
+class TestChangeSet_SizesAndCachedDiff_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(title="Test", content="")
+        self.article.new_revision("", "Test", None, "created", None)
+        self.article.content = "Hello World"
+        self.article.save()
+        self.article.new_revision("", "Test", None, "", None)
+        self.article.content = "Hello Widelands"
+        self.article.save()
+        self.change = self.article.new_revision("Hello World", "Test", None, "", None)
+
+    def runTest(self):
+        self.assertEqual((self.change.chars_added, self.change.chars_removed), (8, 4))
+        html = self.change.compare_to(self.change.revision - 1)
+        self.assertIn('<ins class="inserted">', html)
+        # Served from the cache from now on
+        self.article.changeset_set.update(content_diff="")
+        self.assertEqual(self.change.compare_to(self.change.revision - 1), html)
+
+
+class TestPrettyHtml_LargeDiff_ExceptTruncated(TestCase):
+    def runTest(self):
+        engine = get_engine("dmp")
+        diffs = [(0, "a" * 10), (1, "b" * 10), (0, "c" * 10)]
+        self.assertNotIn(TRUNCATED_NOTICE, engine.pretty_html(diffs, 30))
+        html = engine.pretty_html(diffs, 15)
+        self.assertTrue(html.endswith(TRUNCATED_NOTICE))
+        self.assertIn("b" * 5 + "</ins>", html)
+        self.assertNotIn("ccc", html)
+
+
+@override_settings(WIKI_RECENT_CHANGES_PER_PAGE=2)
+class TestRecentChanges_KeysetPages_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("editor", "editor@example.com", "pw")
+        self.article = Article.objects.create(title="First", content="")
+        for i in range(3):
+            self.article.new_revision("", "First", None, "edit %d" % i, self.user)
+        self.other = Article.objects.create(title="Other", content="")
+        self.other.new_revision("", "Other", None, "other edit", self.user)
+
+    def runTest(self):
+        self.assertEqual(RecentChange.objects.count(), 4)
+
+        # Renames and deletions are copied
+        self.article.title = "Renamed"
+        self.article.save()
+        self.other.deleted = True
+        self.other.save()
+        self.assertEqual(
+            set(RecentChange.objects.values_list("article_title", flat=True)),
+            {"Renamed", "Other"},
+        )
+
+        response = self.client.get(reverse("wiki_history"))
+        changes = response.context["changes"]
+        self.assertEqual([c.comment for c in changes], ["edit 2", "edit 1"])
+        self.assertContains(response, "Renamed")
+        self.assertNotContains(response, "other edit")
+
+        response = self.client.get(
+            reverse("wiki_history"), {"before": response.context["next_cursor"]}
+        )
+        self.assertEqual([c.comment for c in response.context["changes"]], ["edit 0"])
+        self.assertIsNone(response.context["next_cursor"])
+
+        response = self.client.get(reverse("wiki_history"), {"before": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse("wiki_history_feed_rss"))
+        self.assertContains(response, "Renamed")
+        self.assertNotContains(response, "other edit")
+
+
+class TestTitleResolver_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        resolver.clear()
+        self.article = Article.objects.create(title="Old", content="Text")
+        self.article.new_revision("", "", None, "created", None)
+
+    def runTest(self):
+        self.assertEqual(resolver.resolve("Old").article_id, self.article.pk)
+        # Only the version of the title is read from the shared cache
+        with self.assertNumQueries(1):
+            resolver.resolve("Old")
+        self.assertIsNone(resolver.resolve("New").article_id)
+
+        # Titles invalidated by another process are looked up again
+        self.assertIsNone(resolver.resolve("Fresh").article_id)
+        entries = resolver._cache.copy()
+        fresh = Article.objects.create(title="Fresh", content="Text")
+        # This process still has the old entries
+        resolver._cache.update(entries)
+        self.assertEqual(resolver.resolve("Fresh").article_id, fresh.pk)
+
+        # Rename the article
+        self.article.title = "New"
+        self.article.save()
+        self.article.new_revision("Text", "Old", None, "renamed", None)
+        resolver.invalidate("Old", "New")
+
+        self.assertEqual(resolver.resolve("Old"), (self.article.pk, "Old", False))
+        self.assertEqual(resolver.resolve("New"), (self.article.pk, None, False))
+
+        response = self.client.get(reverse("wiki_article", args=["Old"]))
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response.context["article"], self.article)
+        response = self.client.get(reverse("wiki_article", args=["Missing"]))
+        self.assertEqual(response.context["article"].pk, None)
+
+        user = User.objects.create_user("observer", "observer@example.com", "pw")
+        notification.observe(self.article, user, "wiki_observed_article_changed")
+        self.client.force_login(user)
+        response = self.client.get(reverse("wiki_article", args=["New"]))
+        self.assertTrue(response.context["is_observing"])
+
+
+class TestViewArticle_ResolvesTitleOnce_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        cache.clear()
+        resolver.clear()
+        Article.objects.create(title="Once", content="Text")
+
+    def runTest(self):
+        with mock.patch.object(resolver, "resolve", wraps=resolver.resolve) as resolve:
+            response = self.client.get(reverse("wiki_article", args=["Once"]))
+        self.assertEqual(response.context["article"].title, "Once")
+        self.assertEqual(resolve.call_count, 1)
+
+
+class TestTrashList_RedirectsInConstantQueries_ExceptCorrectResult(TestCase):
+    def create_articles(self, start, stop):
+        site = Site.objects.get_current()
+        for i in range(start, stop):
+            article = Article.objects.create(
+                title="Deleted %d" % i, content="", deleted=True
+            )
+            if i % 2:
+                Redirect.objects.create(
+                    site=site,
+                    old_path=article.get_absolute_url(),
+                    new_path="/wiki/Target%d/" % i,
+                )
+
+    def setUp(self):
+        self.create_articles(0, 5)
+        self.staff = User.objects.create_user("staff", "staff@example.com", "pw")
+        self.staff.is_staff = True
+        self.staff.save()
+
+    def runTest(self):
+        with self.assertNumQueries(4):
+            # One for the articles, one per batch of redirects
+            redirects = redirects_for(Article.objects.all(), batch_size=2)
+        self.assertEqual(
+            sorted(r.new_path for r in redirects.values()),
+            ["/wiki/Target1/", "/wiki/Target3/"],
+        )
+        self.client.force_login(self.staff)
+        url = reverse("wiki_list_deleted")
+        # Fills the caches of the middleware and templates
+        self.client.get(url)
+        with self.assertNumQueries(26):
+            response = self.client.get(url)
+        self.assertEqual(
+            [
+                (a.title, r.new_path if r else None)
+                for a, r in response.context["articles"]
+            ],
+            [
+                ("Deleted 0", None),
+                ("Deleted 1", "/wiki/Target1/"),
+                ("Deleted 2", None),
+                ("Deleted 3", "/wiki/Target3/"),
+                ("Deleted 4", None),
+            ],
+        )
+
+        self.create_articles(5, 15)
+        # The same number of queries for three times the articles
+        with self.assertNumQueries(26):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context["articles"]), 15)
+
+
+class TestExchange_RoundTrip_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("editor", "editor@example.com", "pw")
+        for title in ("One", "Two", "Three"):
+            article = Article.objects.create(
+                title=title, content="First", creator=self.user, tags="tag"
+            )
+            article.new_revision("", title, None, "created", self.user)
+            article.content = "Second"
+            article.save()
+            article.new_revision("First", title, None, "changed", None)
+
+    def _export(self, chunks_func, after=0):
+        return b"".join(
+            data
+            for pk, data in chunks_func(exchange.export_articles(after, chunk_size=2))
+        )
+
+    def runTest(self):
+        ids = list(Article.objects.order_by("pk").values_list("pk", flat=True))
+        ndjson = self._export(exchange.ndjson_chunks)
+        tar = self._export(exchange.tar_chunks)
+        resumed = self._export(exchange.ndjson_chunks, after=ids[0])
+        self.assertTrue(ndjson.endswith(resumed))
+        Article.objects.all().delete()
+
+        for records in (
+            exchange.read_ndjson(io.BytesIO(ndjson)),
+            exchange.read_tar(io.BytesIO(tar), {}),
+        ):
+            importer = exchange.Importer(batch_size=2)
+            self.assertEqual(list(importer.feed(records)), [ids[1], ids[2]])
+            self.assertEqual(importer.imported, 3)
+            article = Article.objects.get(title="Two")
+            self.assertEqual(article.creator, self.user)
+            self.assertEqual(
+                article.changeset_set.get(revision=1).get_content(), "First"
+            )
+            self.assertEqual(article.changeset_set.get(revision=2).editor, None)
+            self.assertEqual(RecentChange.objects.filter(article=article).count(), 2)
+            self.assertEqual(
+                [t.name for t in Tag.objects.get_for_object(article)], ["tag"]
+            )
+
+            # Existing articles are skipped
+            importer = exchange.Importer()
+            list(importer.feed(exchange.read_ndjson(io.BytesIO(ndjson))))
+            self.assertEqual((importer.imported, importer.skipped), (0, 3))
+            Article.objects.all().delete()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestExchange_ImagesOfSkippedArticles_ExceptReleased(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("editor", "editor@example.com", "pw")
+        article = Article.objects.create(title="Pictures", content="", creator=user)
+        image = Image(
+            content_type=ContentType.objects.get_for_model(Article),
+            object_id=article.pk,
+            name="map.png",
+            revision=1,
+            user=user,
+        )
+        image.image.save("map.png", ContentFile(b"png"))
+        self.name = image.image.name
+
+    def runTest(self):
+        tar = b"".join(
+            data for pk, data in exchange.tar_chunks(exchange.export_articles())
+        )
+        importer = exchange.Importer()
+        list(importer.feed(exchange.read_tar(io.BytesIO(tar), importer.files)))
+        importer.release_files()
+        self.assertEqual(importer.skipped, 1)
+        self.assertEqual(StoredFile.objects.get(name=self.name).references, 1)
+
+        Article.objects.all().delete()
+        Image.objects.all().delete()
+        importer = exchange.Importer()
+        list(importer.feed(exchange.read_tar(io.BytesIO(tar), importer.files)))
+        importer.release_files()
+        self.assertEqual(importer.imported, 1)
+        # The orphaned reference of the deleted image and the imported one
+        self.assertEqual(StoredFile.objects.get(name=self.name).references, 2)
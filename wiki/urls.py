@@ -10,9 +10,18 @@ from wiki.feeds import (
     RssArticleHistoryFeed,
     AtomArticleHistoryFeed,
 )
-from wiki.models import Article
+from wiki.models import Article, ChangeSet
+from mainpage import page_cache
+from mainpage.conditional import shared
 from tagging.views import TaggedObjectList
 
+# The feeds show the latest changes of all articles
+history_feed = shared(
+    lambda request, **kwargs: [
+        page_cache.tag_for(Article),
+        page_cache.tag_for(ChangeSet),
+    ]
+)
 
 urlpatterns = [
     # Redirects
@@ -37,16 +46,18 @@ urlpatterns = [
     url(r"^trash/list/$", views.trash_list, name="wiki_list_deleted"),
     url(r"^history/$", views.history, name="wiki_history"),
     # Feeds
-    url(r"^feeds/rss/$", RssHistoryFeed(), name="wiki_history_feed_rss"),
-    url(r"^feeds/atom/$", AtomHistoryFeed(), name="wiki_history_feed_atom"),
+    url(r"^feeds/rss/$", history_feed(RssHistoryFeed()), name="wiki_history_feed_rss"),
+    url(
+        r"^feeds/atom/$", history_feed(AtomHistoryFeed()), name="wiki_history_feed_atom"
+    ),
     url(
         r"^(?P<title>" + settings.WIKI_URL_RE + r")/feeds/rss/$",
-        RssArticleHistoryFeed(),
+        history_feed(RssArticleHistoryFeed()),
         name="wiki_article_history_feed_rss",
     ),
     url(
         r"^(?P<title>" + settings.WIKI_URL_RE + r")/feeds/atom/$",
-        AtomArticleHistoryFeed(),
+        history_feed(AtomArticleHistoryFeed()),
         name="wiki_article_history_feed_atom",
     ),
     url(
@@ -10,18 +10,24 @@ from django.http import (
     HttpResponseNotAllowed,
     HttpResponse,
     HttpResponseForbidden,
+    StreamingHttpResponse,
 )
 from django.shortcuts import get_object_or_404, render, redirect
+from django.db.models import Exists, OuterRef
 from django.contrib.contenttypes.models import ContentType
 from django.contrib import messages
 from django.contrib.redirects.models import Redirect
 from django.contrib.sites.shortcuts import get_current_site
 
 from wiki.forms import ArticleForm
-from wiki.models import Article, ChangeSet, dmp
+from wiki.models import Article, ChangeSet, RecentChange, redirects_for
+from wiki.diff_engine import get_engine
+from wiki import resolver
 
 from wiki.utils import get_ct
 from django.contrib.auth.decorators import login_required
+from mainpage import page_cache
+from mainpage.conditional import conditional
 from mainpage.templatetags.wl_markdown import do_wl_markdown
 
 from mainpage.wl_utils import get_valid_cache_key
@@ -46,13 +52,28 @@ except ImportError:
 # default querysets
 ALL_ARTICLES = Article.objects.all()
 ALL_CHANGES = ChangeSet.objects.all()
+RECENT_CHANGES = RecentChange.objects.all()
 
 
 def get_redirect(article):
-    try:
-        return Redirect.objects.get(old_path=article.get_absolute_url())
-    except Redirect.DoesNotExist:
-        return None
+    return redirects_for([article]).get(article.pk)
+
+
+def with_observation(article_qs, user):
+    """Annotate whether user observes the articles, if notification is
+    used."""
+    if notification is None or not user.is_authenticated:
+        return article_qs
+    return article_qs.annotate(
+        is_observing=Exists(
+            notification.ObservedItem.objects.filter(
+                content_type=ContentType.objects.get_for_model(Article),
+                object_id=OuterRef("pk"),
+                user=user,
+                signal="post_save",
+            )
+        )
+    )
 
 
 def get_articles_by_group(
@@ -178,6 +199,25 @@ def article_list(
     return HttpResponseNotAllowed(["GET"])
 
 
+def _resolve(request, title):
+    """Resolve title only once per request, for article_tags() and
+    view_article()."""
+    resolutions = request.__dict__.setdefault("wiki_resolutions", {})
+    if title not in resolutions:
+        resolutions[title] = resolver.resolve(title)
+    return resolutions[title]
+
+
+def article_tags(request, title, revision=None, group_slug=None, *args, **kw):
+    """Tags of an article page for conditional()."""
+    if group_slug is None:
+        article_id = _resolve(request, title).article_id
+        if article_id is not None:
+            return [page_cache.tag_for(Article, article_id)]
+    return None
+
+
+@conditional(article_tags)
 def view_article(
     request,
     title,
@@ -212,32 +252,26 @@ def view_article(
         if not allow_read:
             return HttpResponseForbidden()
 
-        is_observing = False
-        redirected_from = None
-        try:
-            article = article_qs.get(**article_args)
-            if notification is not None:
-                is_observing = notification.is_observing(article, request.user)
-        except ArticleClass.DoesNotExist:
-            try:
-                # try to find an article that once had this title
-                article = (
-                    ChangeSet.objects.filter(old_title=title)
-                    .order_by("-revision")[0]
-                    .article
-                )
-                redirected_from = title
-                # if article is not None:
-                #    return redirect(article, permanent=True)
-            except IndexError:
-                article = ArticleClass(**article_args)
+        # The title may also be an old title of the article
+        resolution = _resolve(request, title)
+        redirected_from = resolution.redirected_from
+        article = None
+        if resolution.article_id is not None:
+            lookup = dict(article_args, pk=resolution.article_id)
+            del lookup["title"]
+            article = (
+                with_observation(article_qs, request.user).filter(**lookup).first()
+            )
+        if article is None:
+            article = ArticleClass(**article_args)
+            redirected_from = None
 
         if revision is not None:
             changeset = get_object_or_404(article.changeset_set, revision=revision)
             article.content = changeset.get_content()
 
         if article.deleted:
-            if get_redirect(article):
+            if resolution.redirect:
                 # A redirect is applied
                 # The django Redirects app takes care for redirecting
                 raise Http404()
@@ -247,15 +281,20 @@ def view_article(
                     request, "wiki/gone.html", context={"article": article}, status=410
                 )
 
+        if article.pk is not None:
+            page_cache.tag(request, page_cache.tag_for(article))
+
         template_params = {}
-        outdated = False
-        tags = [x.name for x in Tag.objects.get_for_object(article)]
-        if "outdated" in tags:
+        tags = []
+        if article.pk is not None:
+            tags = list(Tag.objects.get_for_object(article))
+        if "outdated" in [x.name for x in tags]:
             template_params.update({"outdated": True})
 
         template_params.update(
             {
                 "article": article,
+                "article_tags": tags,
                 "revision": revision,
                 "redirected_from": redirected_from,
                 "allow_write": allow_write,
@@ -263,7 +302,12 @@ def view_article(
         )
 
         if notification is not None:
-            template_params.update({"is_observing": is_observing, "can_observe": True})
+            template_params.update(
+                {
+                    "is_observing": getattr(article, "is_observing", False),
+                    "can_observe": True,
+                }
+            )
 
         if group_slug is not None:
             template_params["group"] = group
@@ -350,7 +394,7 @@ def edit_article(
             redirect_to = form.cleaned_data["redirect_to"]
             if redirect_to != "":
                 # Create or update the redirect
-                obj, created = Redirect.objects.update_or_create(
+                r, created = Redirect.objects.update_or_create(
                     site=get_current_site(request),
                     old_path=new_article.get_absolute_url(),
                     defaults={"new_path": redirect_to},
@@ -360,6 +404,7 @@ def edit_article(
                 r = get_redirect(new_article)
                 if r:
                     r.delete()
+                    r = None
 
             if new_article.deleted and new_article.tags:
                 # Remove all tags
@@ -380,7 +425,6 @@ def edit_article(
                     comment = (
                         "This Article was deleted and your observation was removed."
                     )
-                    r = get_redirect(new_article)
                     if r:
                         path = r.new_path
                         if not path.startswith("http"):
@@ -663,7 +707,7 @@ def history(
     group_slug_field=None,
     group_qs=None,
     article_qs=ALL_ARTICLES,
-    changes_qs=ALL_CHANGES,
+    changes_qs=RECENT_CHANGES,
     template_name="recentchanges.html",
     template_dir="wiki",
     extra_context=None,
@@ -684,10 +728,30 @@ def history(
         if not allow_read:
             return HttpResponseForbidden()
 
-        changes_qs = changes_qs.exclude(article__deleted=True)
+        changes_qs = changes_qs.visible()
+        cursor = request.GET.get("before")
+        if cursor:
+            try:
+                changes_qs = changes_qs.before(cursor)
+            except ValueError:
+                raise Http404
+
+        # Crawlers walk deep into the history, so every page is cached
+        # for a short time
+        per_page = settings.WIKI_RECENT_CHANGES_PER_PAGE
+        cache_key = get_valid_cache_key(
+            "wiki-recent-changes-%s-%s" % (group_slug, cursor)
+        )
+        changes = cache.get(cache_key)
+        if changes is None:
+            changes = changes_qs.fetch(per_page + 1)
+            cache.set(cache_key, changes, settings.WIKI_RECENT_CHANGES_CACHE_TIMEOUT)
 
         template_params = {
-            "changes": changes_qs.order_by("-modified"),
+            "changes": changes[:per_page],
+            "next_cursor": (
+                changes[per_page - 1].cursor if len(changes) > per_page else None
+            ),
             "allow_write": allow_write,
         }
         if group_slug is not None:
@@ -796,10 +860,14 @@ def article_diff(request):
     current_article = get_object_or_404(Article, pk=int(request.POST["article"]))
     content = request.POST["body"]
 
-    diffs = dmp.diff_main(current_article.content, content)
-    dmp.diff_cleanupSemantic(diffs)
+    engine = get_engine()
+    diffs = engine.diff(current_article.content, content)
+    engine.cleanup_semantic(diffs)
 
-    return HttpResponse(dmp.diff_prettyHtml(diffs), content_type="text/html")
+    return StreamingHttpResponse(
+        engine.pretty_html_chunks(diffs, settings.WIKI_DIFF_MAX_SIZE),
+        content_type="text/html",
+    )
 
 
 def backlinks(request, title):
@@ -868,15 +936,9 @@ def trash_list(request):
     if not request.user.is_staff:
         return HttpResponseForbidden()
 
-    del_articles = Article.objects.filter(deleted=True)
-    redirects = Redirect.objects.all()
-    articles = []
-    for a in del_articles:
-        article = [a, None]
-        for r in redirects:
-            if a.get_absolute_url() == r.old_path:
-                article[1] = r
-        articles.append(article)
+    del_articles = list(Article.objects.filter(deleted=True))
+    redirects = redirects_for(del_articles)
+    articles = [[a, redirects.get(a.pk)] for a in del_articles]
 
     context = {"articles": articles}
 
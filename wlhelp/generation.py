@@ -0,0 +1,49 @@
+"""Generation number of the encyclopedia.
+
+The content of the encyclopedia changes only when update_help runs. Each
+run starts a new generation, and the generation is part of the key of all
+cached encyclopedia data. So the pages are served from the cache until the
+next run, without invalidating anything explicitly.
+
+"""
+
+import time
+
+from django.core.cache import cache
+
+from mainpage import page_cache
+from mainpage.wl_utils import get_valid_cache_key
+
+GENERATION_KEY = "wlhelp-generation"
+# Tag of the encyclopedia pages in the page cache
+PAGE_TAG = "wlhelp"
+
+
+def current():
+    """Return the current generation."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Lost, e.g. by clearing the cache. Start a new generation which
+        # can't collide with keys of older ones.
+        cache.add(GENERATION_KEY, int(time.time()), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump():
+    """Start a new generation, called after regenerating the encyclopedia."""
+    old = cache.get(GENERATION_KEY) or 0
+    cache.set(GENERATION_KEY, max(int(time.time()), old + 1), None)
+    page_cache.purge(PAGE_TAG)
+
+
+def cached(generation, func, *parts):
+    """Return the cached result of func() for this generation.
+
+    parts - strings which identify the data
+
+    """
+    key = get_valid_cache_key(
+        "wlhelp-%s-%s" % (generation, "-".join(str(p) for p in parts))
+    )
+    return cache.get_or_set(key, func, None)
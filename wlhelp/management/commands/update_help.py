@@ -13,6 +13,7 @@ from ...models import Worker as WorkerModel
 from ...models import Tribe as TribeModel
 from ...models import Ware as WareModel
 from ...models import Building as BuildingModel
+from ... import generation
 
 from django.core.files import File
 from django.core.management.base import BaseCommand, CommandError
@@ -25,11 +26,23 @@ import re
 import json
 import subprocess
 import collections
+import filecmp
+import hashlib
 
 from django.conf import settings
 
 from widelandslib.tribe import *
-from widelandslib.make_flow_diagram import make_all_subgraphs
+from widelandslib.make_flow_diagram import (
+    write_all_subgraphs,
+    subgraph_directories,
+    process_dotfiles,
+)
+
+GRAPH_MODELS = {
+    "workers": WorkerModel,
+    "buildings": BuildingModel,
+    "wares": WareModel,
+}
 
 
 class TribeParser(object):
@@ -42,10 +55,14 @@ class TribeParser(object):
 
         name - name of the tribe
 
+        Existing rows and media files are updated in place. Graphs are only
+        rendered again if their dot source has changed.
+
         """
-        self._delete_old_media_dir(
-            name
-        )  # You can deactivate this line if you don't need to clean house.
+        # Names of the map objects found in the json files
+        self._seen = {WareModel: set(), WorkerModel: set(), BuildingModel: set()}
+        self._graphs = []
+        self._tdir = None
 
         base_directory = os.path.normpath(settings.WIDELANDS_SVN_DIR + "/data")
         json_directory = os.path.normpath(settings.MEDIA_ROOT + "/map_object_info")
@@ -71,7 +88,7 @@ class TribeParser(object):
                 raise
         new_name = path.join(dn, "icon.png")
         file = os.path.normpath(base_directory + "/" + tribeinfo["icon"])
-        shutil.copy(file, new_name)
+        self._copy_if_changed(file, new_name)
         self._to.icon_url = path.normpath(
             "%s/%s" % (settings.MEDIA_URL, new_name[len(settings.MEDIA_ROOT) :])
         )
@@ -79,10 +96,6 @@ class TribeParser(object):
 
     def parse(self, tribename, base_directory, json_directory):
         """Put all data into the database."""
-        self._delete_old_data(
-            tribename
-        )  # You can deactivate this line if you don't need to clean house.
-
         with open(
             os.path.normpath(json_directory + "/" + tribename + "_wares.json"), "r"
         ) as wares_file:
@@ -98,65 +111,112 @@ class TribeParser(object):
         ) as buildings_file:
             self._parse_buildings(base_directory, json.load(buildings_file))
 
-    def graph(self):
+        self._delete_stale_data()
+
+    def write_graphs(self, force=False):
+        """Write the dot sources of all graphs.
+
+        Returns the directories of the graphs which need to be rendered,
+        that are the ones whose source differs from the last run.
+
+        """
+        self._tdir = write_all_subgraphs(self._tribe)
+        self._graphs = []
+        for cls, name, fpath in subgraph_directories(self._tdir, self._tribe):
+            with open(path.join(fpath, "source.dot"), "rb") as f:
+                fingerprint = hashlib.sha256(f.read()).hexdigest()
+            if force or fingerprint != self._read_fingerprint(name):
+                self._graphs.append((cls, name, fpath, fingerprint))
+        return [fpath for cls, name, fpath, fingerprint in self._graphs]
+
+    def store_graphs(self, errors):
+        """Copy the rendered graphs and store their image maps.
+
+        errors - dict of directory: exception for graphs which failed to
+                 render
+
+        """
+        rendered = 0
+        for cls, name, fpath, fingerprint in self._graphs:
+            try:
+                if fpath in errors:
+                    raise errors[fpath]
+                inst = GRAPH_MODELS[cls].objects.get(tribe=self._to, name=name)
+                url = self._copy_picture(
+                    path.join(fpath, "menu.png"), name, "graph.png"
+                )
+                inst.graph_url = url
+                with open(path.join(fpath, "map.map")) as map_file:
+                    inst.imagemap = map_file.read()
+                inst.imagemap = self.map_mouseover_pattern.sub(
+                    r"\1Show the \2 \3\4", inst.imagemap
+                )
+                inst.save()
+                self._write_fingerprint(name, fingerprint)
+                rendered += 1
+            except Exception as e:
+                print(
+                    "Exception while handling",
+                    cls,
+                    "of",
+                    self._tribe.name,
+                    ":",
+                    name,
+                )
+                print(type(e), e, repr(e))
+
+        print("  rendered {} graphs for tribe {}".format(rendered, self._tribe.name))
+        shutil.rmtree(self._tdir)
+        self._delete_stale_media()
+
+    def graph(self, force=False, workers=None):
         """Make all graphs."""
-        tdir = make_all_subgraphs(self._tribe)
-        for obj, cls in [
-            (WorkerModel, "workers"),
-            (BuildingModel, "buildings"),
-            (WareModel, "wares"),
-        ]:
-            for inst in obj.objects.all().filter(tribe=self._to):
-                try:
-                    fpath = path.join(
-                        tdir, "help/%s/%s/%s/" % (self._tribe.name, cls, inst.name)
-                    )
-                    url = self._copy_picture(
-                        path.join(fpath, "menu.png"), inst.name, "graph.png"
-                    )
-                    inst.graph_url = url
-                    with open(path.join(fpath, "map.map")) as map_file:
-                        inst.imagemap = map_file.read()
-                    inst.imagemap = self.map_mouseover_pattern.sub(
-                        r"\1Show the \2 \3\4", inst.imagemap
-                    )
-                    inst.save()
-                except Exception as e:
-                    print(
-                        "Exception while handling",
-                        cls,
-                        "of",
-                        self._tribe.name,
-                        ":",
-                        inst.name,
-                    )
-                    print(type(e), e, repr(e))
-
-        shutil.rmtree(tdir)
-
-    def _delete_old_media_dir(self, tribename):
+        errors = process_dotfiles(self.write_graphs(force), workers)
+        self.store_graphs(errors)
+
+    def _media_dir(self, name):
+        return os.path.normpath(
+            "%s/wlhelp/img/%s/%s/" % (settings.MEDIA_ROOT, self._to.name, name)
+        )
+
+    def _read_fingerprint(self, name):
+        try:
+            with open(path.join(self._media_dir(name), "graph.sha256")) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_fingerprint(self, name, fingerprint):
+        with open(path.join(self._media_dir(name), "graph.sha256"), "w") as f:
+            f.write(fingerprint)
+
+    def _delete_stale_media(self):
         """Clean house, e.g. when we have renamed a map object."""
 
-        print("Deleting old media files...")
         sdir = os.path.normpath(
-            os.path.join(settings.MEDIA_ROOT, "wlhelp/img", tribename)
+            os.path.join(settings.MEDIA_ROOT, "wlhelp/img", self._to.name)
         )
-        if os.path.exists(sdir):
-            shutil.rmtree(sdir)
+        current = set().union(*self._seen.values())
+        for entry in os.listdir(sdir):
+            if os.path.isdir(path.join(sdir, entry)) and entry not in current:
+                print("Deleting old media files of", entry)
+                shutil.rmtree(path.join(sdir, entry))
 
-    def _delete_old_data(self, tribename):
+    def _delete_stale_data(self):
         """Clean house, e.g. when we have renamed a map object."""
 
-        t = TribeModel.objects.get(name=tribename)
-        print("Deleting old wares...")
-        for ware in WareModel.objects.filter(tribe=t):
-            ware.delete()
-        print("Deleting old workers...")
-        for worker in WorkerModel.objects.filter(tribe=t):
-            worker.delete()
-        print("Deleting old buildings...")
-        for building in BuildingModel.objects.filter(tribe=t):
-            building.delete()
+        for model, names in self._seen.items():
+            stale = model.objects.filter(tribe=self._to).exclude(name__in=names)
+            for obj in stale:
+                print("Deleting old", obj)
+                obj.delete()
+
+    @staticmethod
+    def _copy_if_changed(file, new_name):
+        # copy2 keeps the modification time, so unchanged files are detected
+        # by filecmp without reading them
+        if not path.exists(new_name) or not filecmp.cmp(file, new_name):
+            shutil.copy2(file, new_name)
 
     def _copy_picture(self, file, name, fname):
         """Copy the given image into the media directory.
@@ -166,16 +226,14 @@ class TribeParser(object):
         fname           - file name of the picture
 
         """
-        dn = os.path.normpath(
-            "%s/wlhelp/img/%s/%s/" % (settings.MEDIA_ROOT, self._to.name, name)
-        )
+        dn = self._media_dir(name)
         try:
             os.makedirs(dn)
         except OSError as o:
             if o.errno != 17:
                 raise
         new_name = path.join(dn, fname)
-        shutil.copy(file, new_name)
+        self._copy_if_changed(file, new_name)
 
         return "%s%s" % (settings.MEDIA_URL, new_name[len(settings.MEDIA_ROOT) :])
 
@@ -194,6 +252,7 @@ class TribeParser(object):
             workero = WorkerModel.objects.get_or_create(
                 tribe=self._to, name=worker["name"]
             )[0]
+            self._seen[WorkerModel].add(worker["name"])
             workero.displayname = worker["descname"]
             workero.image_url = nn
 
@@ -201,6 +260,8 @@ class TribeParser(object):
             workero.help = worker["helptext"]
 
             # See what the worker becomes
+            workero.exp = ""
+            workero.becomes = None
             if "becomes" in worker:
                 try:
                     if worker["becomes"]["experience"]:
@@ -227,6 +288,7 @@ class TribeParser(object):
             )
 
             w = WareModel.objects.get_or_create(tribe=self._to, name=ware["name"])[0]
+            self._seen[WareModel].add(ware["name"])
             w.displayname = ware["descname"]
             w.image_url = nn
 
@@ -259,6 +321,7 @@ class TribeParser(object):
             b = BuildingModel.objects.get_or_create(
                 tribe=self._to, name=building["name"]
             )[0]
+            self._seen[BuildingModel].add(building["name"])
             b.displayname = building["descname"]
             b.type = building["type"]
 
@@ -281,6 +344,9 @@ class TribeParser(object):
                 )
                 b.build_costs = build_costs
                 b.build_wares.set(build_wares)
+            else:
+                b.build_costs = ""
+                b.build_wares.clear()
 
             # Try to figure out who works there
             if "workers" in building:
@@ -289,10 +355,15 @@ class TribeParser(object):
                 )
                 b.workers_count = workers_count
                 b.workers_types.set(workers_types)
+            else:
+                b.workers_count = ""
+                b.workers_types.clear()
 
             # Try to figure out if this building can be enhanced
             if "enhancement" in building:
                 enhancement_hierarchy.append((b, building["enhancement"]))
+            else:
+                b.enhancement = None
 
             b.help = building["helptext"]
 
@@ -303,6 +374,9 @@ class TribeParser(object):
                 )
                 b.store_count = store_count
                 b.store_wares.set(store_wares)
+            else:
+                b.store_count = ""
+                b.store_wares.clear()
 
             # Output wares
             if "produced_wares" in building:
@@ -312,6 +386,8 @@ class TribeParser(object):
                         for w in building["produced_wares"]
                     ]
                 )
+            else:
+                b.output_wares.clear()
 
             # Output workers
             if "produced_workers" in building:
@@ -321,6 +397,8 @@ class TribeParser(object):
                         for w in building["produced_workers"]
                     ]
                 )
+            else:
+                b.output_workers.clear()
 
             b.save()
 
@@ -335,6 +413,19 @@ class TribeParser(object):
 class Command(BaseCommand):
     help = """Regenerates and parses the json files in a current checkout. """
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Render all graphs, also the unchanged ones.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of graphs rendered at the same time. Defaults to the number of cpus.",
+        )
+
     def handle(
         self, directory=os.path.normpath(settings.WIDELANDS_SVN_DIR + "/data"), **kwargs
     ):
@@ -346,12 +437,11 @@ class Command(BaseCommand):
         print(("JSON files will be written to: " + json_directory))
 
         # First, we make sure that JSON files have been generated.
-        current_dir = os.path.dirname(os.path.realpath(__file__))
         is_json_valid = False
-        os.chdir(settings.WIDELANDS_SVN_DIR)
         try:
             subprocess.check_call(
-                [os.path.normpath("wl_map_object_info"), json_directory]
+                [os.path.normpath("wl_map_object_info"), json_directory],
+                cwd=settings.WIDELANDS_SVN_DIR,
             )
         except:
             print(
@@ -373,14 +463,14 @@ class Command(BaseCommand):
             )
             sys.exit(1)
         try:
-            subprocess.check_call([validator_script, json_directory])
+            subprocess.check_call(
+                [validator_script, json_directory], cwd=settings.WIDELANDS_SVN_DIR
+            )
             is_json_valid = True
         except:
             print("Error: JSON files are not valid.")
             sys.exit(1)
 
-        os.chdir(current_dir)
-
         # We regenerate the encyclopedia only if the JSON files passed the
         # syntax check
         if is_json_valid:
@@ -389,9 +479,21 @@ class Command(BaseCommand):
             ) as source_file:
                 tribesinfo = json.load(source_file)
 
+            parsers = []
+            graphs = []
             for t in tribesinfo["tribes"]:
                 tribename = t["name"]
                 print("updating help for tribe ", tribename)
                 p = TribeParser(tribename)
                 p.parse(tribename, directory, json_directory)
-                p.graph()
+                graphs += p.write_graphs(kwargs["force"])
+                parsers.append(p)
+
+            # Render the changed graphs of all tribes in one pool
+            print("rendering {} changed graphs".format(len(graphs)))
+            errors = process_dotfiles(graphs, kwargs["workers"])
+            for p in parsers:
+                p.store_graphs(errors)
+
+            # Serve the new content from now on
+            generation.bump()
@@ -83,6 +83,33 @@ class BuildingManager(models.Manager):
     def headquarters(self):
         return self.all().filter(size="H")
 
+    def grouped_by_size(self, tribe):
+        """Return the buildings of the tribe grouped by size.
+
+        The keys are the size names, with "_enhanced" appended for buildings
+        which are enhanced from another one. Headquarters are never split.
+        Everything is done in one query.
+
+        """
+        buildings = list(
+            self.filter(tribe=tribe)
+            .select_related("tribe", "enhancement")
+            .order_by("displayname")
+        )
+        enhanced = set(b.enhancement_id for b in buildings if b.enhancement_id)
+        sizes = dict(Building.SIZES)
+        groups = {}
+        for size, name in Building.SIZES:
+            groups[name] = []
+            if size != "H":
+                groups[name + "_enhanced"] = []
+        for b in buildings:
+            name = sizes[b.size]
+            if b.pk in enhanced and b.size != "H":
+                name += "_enhanced"
+            groups[name].append(b)
+        return groups
+
         # return self.build_wares.count()
 
     pass
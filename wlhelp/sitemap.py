@@ -5,6 +5,7 @@ from mainpage.sitemaps import SitemapHTTPS
 class WlHelpTribeSitemap(SitemapHTTPS):
     changefreq = "yearly"
     priority = 0.5
+    watermark = ("name",)
 
     def items(self):
         return Tribe.objects.all()
@@ -16,9 +17,10 @@ class WlHelpTribeSitemap(SitemapHTTPS):
 class WlHelpBuildingSitemap(SitemapHTTPS):
     changefreq = "yearly"
     priority = 0.5
+    watermark = ("name", "tribe__name")
 
     def items(self):
-        return Building.objects.all()
+        return Building.objects.select_related("tribe")
 
     def location(self, obj):
         return "/encyclopedia/%s/buildings/%s" % (obj.tribe.name, obj.name)
@@ -27,9 +29,10 @@ class WlHelpBuildingSitemap(SitemapHTTPS):
 class WlHelpWareSitemap(SitemapHTTPS):
     changefreq = "yearly"
     priority = 0.5
+    watermark = ("name", "tribe__name")
 
     def items(self):
-        return Ware.objects.all()
+        return Ware.objects.select_related("tribe")
 
     def location(self, obj):
         return "/encyclopedia/%s/wares/%s" % (obj.tribe.name, obj.name)
@@ -38,9 +41,10 @@ class WlHelpWareSitemap(SitemapHTTPS):
 class WlHelpWorkerSitemap(SitemapHTTPS):
     changefreq = "yearly"
     priority = 0.5
+    watermark = ("name", "tribe__name")
 
     def items(self):
-        return Worker.objects.all()
+        return Worker.objects.select_related("tribe")
 
     def location(self, obj):
         return "/encyclopedia/%s/workers/%s" % (obj.tribe.name, obj.name)
@@ -5,7 +5,20 @@ Replace these with more appropriate tests for your application.
 
 """
 
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+import json
+import os
+import shutil
+import tempfile
+
+from widelandslib.tribe import Tribe, ProductionSite
+
+from . import generation
+from .management.commands.update_help import TribeParser
+from .models import Building, Tribe as TribeModel, Ware, Worker
 
 
 class SimpleTest(TestCase):
@@ -16,6 +29,216 @@ class SimpleTest(TestCase):
         self.assertEqual(1 + 1, 2)
 
 
+class TestTribeIndexes_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        data = {
+            "wares": {
+                "wares": [
+                    {"name": "log", "descname": "Log", "icon": "log.png"},
+                    {"name": "planks", "descname": "Planks", "icon": "planks.png"},
+                ]
+            },
+            "workers": {
+                "workers": [
+                    {
+                        "name": "carrier",
+                        "descname": "Carrier",
+                        "icon": "carrier.png",
+                    },
+                    {
+                        "name": "sawyer",
+                        "descname": "Sawyer",
+                        "icon": "sawyer.png",
+                        "becomes": {"name": "master_sawyer"},
+                    },
+                    {
+                        "name": "master_sawyer",
+                        "descname": "Master Sawyer",
+                        "icon": "master_sawyer.png",
+                    },
+                ]
+            },
+            "buildings": {
+                "buildings": [
+                    {
+                        "name": "sawmill",
+                        "descname": "Sawmill",
+                        "icon": "sawmill.png",
+                        "type": "productionsite",
+                        "size": "medium",
+                        "enhancement": "big_sawmill",
+                        "buildcost": [{"name": "log", "amount": 3}],
+                        "stored_wares": [{"name": "log", "amount": 8}],
+                        "produced_wares": ["planks"],
+                        "workers": [{"name": "sawyer", "amount": 1}],
+                    },
+                    {
+                        "name": "big_sawmill",
+                        "descname": "Big Sawmill",
+                        "icon": "big_sawmill.png",
+                        "type": "productionsite",
+                        "size": "medium",
+                        "enhanced": True,
+                        "stored_wares": [{"name": "log", "amount": 8}],
+                        "produced_wares": ["planks"],
+                        "workers": [{"name": "master_sawyer", "amount": 1}],
+                    },
+                    {
+                        "name": "warehouse",
+                        "descname": "Warehouse",
+                        "icon": "warehouse.png",
+                        "type": "warehouse",
+                        "size": "medium",
+                    },
+                ]
+            },
+        }
+        for kind, content in data.items():
+            with open(os.path.join(self.dir, "test_%s.json" % kind), "w") as f:
+                json.dump(content, f)
+        self.tribe = Tribe({"name": "test"}, self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def runTest(self):
+        t = self.tribe
+        self.assertIsInstance(t.buildings["sawmill"], ProductionSite)
+        self.assertEqual(
+            [b.name for b in t.wares["planks"].producers], ["sawmill", "big_sawmill"]
+        )
+        self.assertEqual(
+            [b.name for b in t.wares["log"].consumers], ["sawmill", "big_sawmill"]
+        )
+        self.assertEqual(t.wares["planks"].consumers, [])
+        self.assertEqual(t.buildings["big_sawmill"].base_building.name, "sawmill")
+        self.assertIsNone(t.buildings["sawmill"].base_building)
+        self.assertEqual(t.buildings["sawmill"].buildcost, {"log": 3})
+        self.assertEqual(
+            [w.name for w in t.workers["master_sawyer"].predecessors], ["sawyer"]
+        )
+        self.assertEqual(
+            [b.name for b in t.workers["sawyer"].productionsites], ["sawmill"]
+        )
+        self.assertEqual(t.workers["carrier"].productionsites, [])
+        self.assertFalse(hasattr(t.wares["log"], "__dict__"))
+
+
+class _EncyclopediaBase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tribe = TribeModel.objects.create(
+            name="barbarians", displayname="Barbarians"
+        )
+        self.hq = Building.objects.create(
+            name="headquarters", displayname="Headquarters", tribe=self.tribe, size="H"
+        )
+        self.hut = Building.objects.create(
+            name="lumberjacks_hut",
+            displayname="Lumberjack's Hut",
+            tribe=self.tribe,
+            size="S",
+        )
+        self.mill = Building.objects.create(
+            name="warmill", displayname="War Mill", tribe=self.tribe, size="M"
+        )
+        self.factory = Building.objects.create(
+            name="axfactory",
+            displayname="Ax Workshop",
+            tribe=self.tribe,
+            size="M",
+            enhancement=self.mill,
+        )
+        self.log = Ware.objects.create(
+            name="log", displayname="Log", tribe=self.tribe, help="Wood."
+        )
+
+
+class TestBuildingsGroupedBySize_ExceptCorrectResult(_EncyclopediaBase):
+    def runTest(self):
+        with self.assertNumQueries(1):
+            groups = Building.objects.grouped_by_size(self.tribe)
+        self.assertEqual(groups["headquarters"], [self.hq])
+        self.assertEqual(groups["small"], [self.hut])
+        self.assertEqual(groups["small_enhanced"], [])
+        self.assertEqual(groups["medium"], [self.factory])
+        self.assertEqual(groups["medium_enhanced"], [self.mill])
+        self.assertEqual(groups["mine"], [])
+
+
+class TestEncyclopediaCachedUntilNextGeneration_ExceptCorrectResult(_EncyclopediaBase):
+    def runTest(self):
+        url = reverse("wlhelp_ware_details", args=["barbarians", "log"])
+        self.assertContains(self.client.get(url), "Wood.")
+        Ware.objects.filter(pk=self.log.pk).update(help="Timber.")
+        self.assertContains(self.client.get(url), "Wood.")
+        generation.bump()
+        self.assertContains(self.client.get(url), "Timber.")
+
+
+class TestEncyclopediaBuildingsPage_ExceptCorrectResult(_EncyclopediaBase):
+    def runTest(self):
+        response = self.client.get(reverse("wlhelp_buildings", args=["barbarians"]))
+        self.assertContains(response, "Medium Enhanced Buildings")
+        self.assertNotContains(response, "Small Enhanced Buildings")
+        self.assertEqual(
+            self.client.get(reverse("wlhelp_buildings", args=["amazons"])).status_code,
+            404,
+        )
+
+
+class TestParserResetsDroppedData_ExceptCorrectResult(_EncyclopediaBase):
+    def parse(self, building, worker):
+        parser = TribeParser.__new__(TribeParser)
+        parser._to = self.tribe
+        parser._seen = {Ware: set(), Worker: set(), Building: set()}
+        parser._copy_picture = lambda file, name, fname: "/media/" + name
+        base = {"descname": "X", "icon": "x.png", "helptext": ""}
+        parser._parse_workers("", {"workers": [dict(base, **worker)]})
+        parser._parse_buildings(
+            "",
+            {
+                "buildings": [
+                    dict(base, type="productionsite", size="small", **building)
+                ]
+            },
+        )
+
+    def runTest(self):
+        self.parse(
+            {
+                "name": "lumberjacks_hut",
+                "enhancement": "headquarters",
+                "buildcost": [{"name": "log", "amount": 2}],
+                "workers": [{"name": "lumberjack", "amount": 1}],
+                "stored_wares": [{"name": "log", "amount": 4}],
+                "produced_wares": ["log"],
+                "produced_workers": ["lumberjack"],
+            },
+            {"name": "lumberjack", "becomes": {"name": "chief", "experience": "8"}},
+        )
+        hut = Building.objects.get(pk=self.hut.pk)
+        self.assertEqual(hut.enhancement, self.hq)
+        self.assertEqual(hut.build_costs, "2")
+        self.assertEqual(Worker.objects.get(name="lumberjack").exp, "8")
+
+        self.parse({"name": "lumberjacks_hut"}, {"name": "lumberjack"})
+        hut = Building.objects.get(pk=self.hut.pk)
+        self.assertIsNone(hut.enhancement)
+        self.assertEqual(
+            (hut.build_costs, hut.workers_count, hut.store_count), ("", "", "")
+        )
+        self.assertFalse(hut.build_wares.exists())
+        self.assertFalse(hut.workers_types.exists())
+        self.assertFalse(hut.store_wares.exists())
+        self.assertFalse(hut.output_wares.exists())
+        self.assertFalse(hut.output_workers.exists())
+        lumberjack = Worker.objects.get(name="lumberjack")
+        self.assertEqual(lumberjack.exp, "")
+        self.assertIsNone(lumberjack.becomes)
+
+
 __test__ = {
     "doctest": """
 Another way to test that 1 + 1 is equal to 2.
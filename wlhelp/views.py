@@ -2,121 +2,153 @@ from django.shortcuts import render, get_object_or_404
 from django.template import RequestContext
 from django.http import HttpResponse
 from .models import Worker, Ware, Building, Tribe
+from . import generation
+from mainpage import page_cache
+from mainpage.conditional import conditional
 
 
+def help_tags(request, *args, **kwargs):
+    """Tags of the encyclopedia pages for conditional()."""
+    return [generation.PAGE_TAG]
+
+
+@page_cache.tagged(generation.PAGE_TAG)
 def index(request):
-    tribes = Tribe.objects.all().order_by("displayname")
+    gen = generation.current()
+    tribes = generation.cached(
+        gen, lambda: list(Tribe.objects.all().order_by("displayname")), "tribes"
+    )
 
     return render(
         request,
         "wlhelp/index.html",
         {
             "tribes": tribes,
+            "help_generation": gen,
         },
     )
 
 
+@conditional(help_tags)
+@page_cache.tagged(generation.PAGE_TAG)
 def ware_details(request, tribe, ware):
-    w = get_object_or_404(Ware, tribe__name=tribe, name=ware)
-    t = Tribe.objects.get(name=tribe)
+    gen = generation.current()
+    w = generation.cached(
+        gen,
+        lambda: get_object_or_404(
+            Ware.objects.select_related("tribe"), tribe__name=tribe, name=ware
+        ),
+        "ware",
+        tribe,
+        ware,
+    )
 
     return render(
         request,
         "wlhelp/ware_details.html",
         {
             "ware": w,
-            "tribe": t,
+            "tribe": w.tribe,
+            "help_generation": gen,
         },
     )
 
 
+@conditional(help_tags)
+@page_cache.tagged(generation.PAGE_TAG)
 def building_details(request, tribe, building):
-    b = get_object_or_404(Building, tribe__name=tribe, name=building)
-    t = Tribe.objects.get(name=tribe)
+    gen = generation.current()
+    b = generation.cached(
+        gen,
+        lambda: get_object_or_404(
+            Building.objects.select_related("tribe"), tribe__name=tribe, name=building
+        ),
+        "building",
+        tribe,
+        building,
+    )
 
     return render(
         request,
         "wlhelp/building_details.html",
         {
             "building": b,
-            "tribe": t,
+            "tribe": b.tribe,
+            "help_generation": gen,
         },
     )
 
 
+@conditional(help_tags)
+@page_cache.tagged(generation.PAGE_TAG)
 def worker_details(request, tribe, worker):
-    w = get_object_or_404(Worker, tribe__name=tribe, name=worker)
-    t = Tribe.objects.get(name=tribe)
+    gen = generation.current()
+    w = generation.cached(
+        gen,
+        lambda: get_object_or_404(
+            Worker.objects.select_related("tribe"), tribe__name=tribe, name=worker
+        ),
+        "worker",
+        tribe,
+        worker,
+    )
 
     return render(
         request,
         "wlhelp/worker_details.html",
         {
             "worker": w,
-            "tribe": t,
+            "tribe": w.tribe,
+            "help_generation": gen,
         },
     )
 
 
+@page_cache.tagged(generation.PAGE_TAG)
 def workers(request, tribe="barbarians"):
-    t = get_object_or_404(Tribe, name=tribe)
+    gen = generation.current()
+    t = generation.cached(
+        gen, lambda: get_object_or_404(Tribe, name=tribe), "tribe", tribe
+    )
     return render(
         request,
         "wlhelp/workers.html",
         {
+            # Only evaluated if the content is not in the fragment cache
             "workers": Worker.objects.filter(tribe=t).order_by("displayname"),
             "tribe": t,
+            "help_generation": gen,
         },
     )
 
 
+@page_cache.tagged(generation.PAGE_TAG)
 def wares(request, tribe="barbarians"):
-    t = get_object_or_404(Tribe, name=tribe)
+    gen = generation.current()
+    t = generation.cached(
+        gen, lambda: get_object_or_404(Tribe, name=tribe), "tribe", tribe
+    )
     return render(
         request,
         "wlhelp/wares.html",
         {
+            # Only evaluated if the content is not in the fragment cache
             "wares": Ware.objects.filter(tribe=t).order_by("displayname"),
             "tribe": t,
+            "help_generation": gen,
         },
     )
 
 
+@page_cache.tagged(generation.PAGE_TAG)
 def buildings(request, tribe="barbarians"):
-    t = get_object_or_404(Tribe, name=tribe)
-
-    # Request all the objects
-    buildings = {}
-
-    # All headquarters
-    buildings["headquarters"] = Building.objects.filter(size="H", tribe=t).order_by(
-        "displayname"
+    gen = generation.current()
+    t = generation.cached(
+        gen, lambda: get_object_or_404(Tribe, name=tribe), "tribe", tribe
+    )
+    buildings = generation.cached(
+        gen, lambda: Building.objects.grouped_by_size(t), "buildings", tribe
     )
-
-    # Now, all small buildings
-    small = Building.objects.filter(size="S", tribe=t).order_by("displayname")
-    buildings["small"] = small.filter(enhanced_from=None)
-    buildings["small_enhanced"] = small.exclude(enhanced_from=None)
-
-    # Now, all medium buildings
-    medium = Building.objects.filter(size="M", tribe=t).order_by("displayname")
-    buildings["medium"] = medium.filter(enhanced_from=None)
-    buildings["medium_enhanced"] = medium.exclude(enhanced_from=None)
-
-    # Now, all big buildings
-    big = Building.objects.filter(size="B", tribe=t).order_by("displayname")
-    buildings["big"] = big.filter(enhanced_from=None)
-    buildings["big_enhanced"] = big.exclude(enhanced_from=None)
-
-    # Now, all mines
-    mine = Building.objects.filter(size="I", tribe=t).order_by("displayname")
-    buildings["mine"] = mine.filter(enhanced_from=None)
-    buildings["mine_enhanced"] = mine.exclude(enhanced_from=None)
-
-    # Now, all ports
-    port = Building.objects.filter(size="P", tribe=t).order_by("displayname")
-    buildings["port"] = port.filter(enhanced_from=None)
-    buildings["port_enhanced"] = port.exclude(enhanced_from=None)
 
     return render(
         request,
@@ -124,5 +156,6 @@ def buildings(request, tribe="barbarians"):
         {
             "buildings": buildings,
             "tribe": t,
+            "help_generation": gen,
         },
     )
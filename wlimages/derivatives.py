@@ -0,0 +1,177 @@
+"""Resized and converted variants (derivatives) of uploaded images.
+
+A derivative is made of an image below MEDIA_ROOT, a size and a format. The
+size is the maximum of width and height of the derivative, images are never
+scaled up. Derivatives are generated on first request by a bounded pool of
+worker threads and stored on disk below MEDIA_ROOT/derivatives, named by
+the sha256 hash of the content of the source image. So a changed source gets
+new derivatives and identical sources share them.
+
+Settings:
+
+IMAGE_DERIVATIVE_WIDTHS:     The allowed sizes
+IMAGE_DERIVATIVE_SOURCES:    Directories below MEDIA_ROOT containing the
+                             images, other files are refused
+IMAGE_DERIVATIVE_WORKERS:    Maximum number of images generated at once
+IMAGE_DERIVATIVE_TIMEOUT:    Seconds to wait for a derivative
+IMAGE_DERIVATIVE_PREGENERATE: (size, format) pairs created by the command
+                              'pregenerate_derivatives'
+
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from PIL import Image
+
+# File extensions of the source images
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
+
+# Format name used in urls -> (PIL format, content type)
+FORMATS = {
+    "png": ("PNG", "image/png"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+class DerivativeError(Exception):
+    """Raised for invalid sources, sizes or formats."""
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+            thread_name_prefix="wlimages-derivatives",
+        )
+    return _executor
+
+
+def source_path(name):
+    """Return the absolute path of the image name, relative to MEDIA_ROOT."""
+
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    path = os.path.realpath(os.path.join(root, name))
+    allowed = tuple(
+        os.path.join(root, d.strip("/")) + os.sep
+        for d in settings.IMAGE_DERIVATIVE_SOURCES
+    )
+    if (
+        not path.startswith(allowed)
+        or not path.lower().endswith(SOURCE_EXTENSIONS)
+        or not os.path.isfile(path)
+    ):
+        raise DerivativeError("No such image: %s" % name)
+    return path
+
+
+@lru_cache(maxsize=4096)
+def _content_digest(path, mtime, size):
+    # mtime and size are part of the cache key, so a changed file is
+    # hashed again
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def derivative_path(source, size, fmt):
+    st = os.stat(source)
+    digest = _content_digest(source, st.st_mtime_ns, st.st_size)
+    return os.path.join(
+        settings.MEDIA_ROOT,
+        "derivatives",
+        digest[:2],
+        "%s_%d.%s" % (digest, size, fmt),
+    )
+
+
+def _open(source):
+    try:
+        return Image.open(source)
+    except Image.DecompressionBombError:
+        raise DerivativeError("Image is too large: %s" % source)
+
+
+def _render(source, target, size, fmt):
+    with _open(source) as image:
+        # Let the JPEG decoder scale down while decoding, which is much
+        # faster than decoding the full image
+        image.draft("RGB", (size, size))
+        if fmt == "jpeg":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        image.thumbnail((size, size), Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, FORMATS[fmt][0])
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def _generate(source, target, size, fmt):
+    try:
+        _render(source, target, size, fmt)
+    finally:
+        with _lock:
+            _pending.pop(target, None)
+
+
+def submit(name, size, fmt):
+    """Queue the generation of a derivative.
+
+    Returns the path of the derivative and a future, which is None if the
+    derivative already exists.
+
+    """
+
+    if size not in settings.IMAGE_DERIVATIVE_WIDTHS:
+        raise DerivativeError("Size %s is not allowed" % size)
+    if fmt not in FORMATS:
+        raise DerivativeError("Format %s is not supported" % fmt)
+
+    source = source_path(name)
+    target = derivative_path(source, size, fmt)
+    if os.path.exists(target):
+        return target, None
+
+    with _lock:
+        # Concurrent requests for the same derivative share one job
+        future = _pending.get(target)
+        if future is None:
+            future = _get_executor().submit(_generate, source, target, size, fmt)
+            _pending[target] = future
+    return target, future
+
+
+def get_derivative(name, size, fmt):
+    """Return the path of the derivative, generating it if needed.
+
+    Raises concurrent.futures.TimeoutError if the generation takes longer
+    than IMAGE_DERIVATIVE_TIMEOUT.
+
+    """
+
+    target, future = submit(name, size, fmt)
+    if future is not None:
+        future.result(timeout=settings.IMAGE_DERIVATIVE_TIMEOUT)
+    return target
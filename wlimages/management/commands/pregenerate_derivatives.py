@@ -0,0 +1,57 @@
+from concurrent.futures import wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from wlimages import derivatives
+from wlimages.models import Image
+from wlprofile.models import Profile
+from wlscreens.models import Screenshot
+
+
+class Command(BaseCommand):
+    help = "Create the derivatives of uploaded images in advance."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            action="append",
+            help="Size to create. Defaults to IMAGE_DERIVATIVE_PREGENERATE.",
+        )
+        parser.add_argument("--format", default="webp", choices=derivatives.FORMATS)
+
+    def _names(self):
+        for s in Screenshot.objects.only("screenshot"):
+            yield s.screenshot.name
+        for p in Profile.objects.exclude(avatar="").only("avatar"):
+            yield p.avatar.name
+        for i in Image.objects.only("image"):
+            yield i.image.name
+
+    def handle(self, *args, **options):
+        if options["size"]:
+            variants = [(size, options["format"]) for size in options["size"]]
+        else:
+            variants = settings.IMAGE_DERIVATIVE_PREGENERATE
+
+        futures = []
+        invalid = 0
+        for name in self._names():
+            for size, fmt in variants:
+                try:
+                    target, future = derivatives.submit(name, size, fmt)
+                except derivatives.DerivativeError as e:
+                    self.stderr.write(str(e))
+                    invalid += 1
+                    continue
+                if future is not None:
+                    futures.append(future)
+
+        wait(futures)
+        errors = sum(1 for f in futures if f.exception() is not None)
+        self.stdout.write(
+            "Created {} derivatives, {} failed.".format(
+                len(futures) - errors, invalid + errors
+            )
+        )
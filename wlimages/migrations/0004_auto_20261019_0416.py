@@ -0,0 +1,22 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:16
+
+from django.db import migrations, models
+import mainpage.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wlimages", "0003_remove_image_editor_ip"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="image",
+            name="image",
+            field=models.ImageField(
+                storage=mainpage.storage.ContentAddressedStorage(),
+                upload_to="wlimages/",
+            ),
+        ),
+    ]
@@ -6,9 +6,10 @@ from django.contrib.auth.models import User
 from django.utils.translation import ugettext_lazy as _
 from django.db import IntegrityError
 from datetime import datetime
-from django.conf import settings
 from django.core.files.storage import FileSystemStorage
 
+from mainpage.storage import content_storage
+
 
 class ImageManager(models.Manager):
     """We overwrite the defaults manager to make sure that the create function
@@ -44,15 +45,8 @@ class ImageManager(models.Manager):
             revision=1,
             name=image.name,
         )
-        path = "%swlimages/%s" % (settings.MEDIA_ROOT, safe_filename)
-
-        destination = open(path, "wb")
-        for chunk in image.chunks():
-            destination.write(chunk)
-
-        im.image = "wlimages/%s" % (safe_filename)
-
-        im.save()
+        # Identical images are stored only once by the content storage
+        im.image.save(safe_filename, image)
 
 
 class Image(models.Model):
@@ -78,7 +72,7 @@ class Image(models.Model):
     date_submitted = models.DateTimeField(
         _("date/time submitted"), default=datetime.now
     )
-    image = models.ImageField(upload_to="wlimages/")
+    image = models.ImageField(upload_to="wlimages/", storage=content_storage)
 
     objects = ImageManager()
 
@@ -7,6 +7,8 @@
 
 # import re
 from django import template
+from django.urls import reverse
+from django.utils.http import urlencode
 from wlimages.forms import UploadImageForm
 import os.path
 
@@ -52,3 +54,23 @@ def has_file(obj):
 
 
 register.filter("has_file", has_file)
+
+
+def derivative(image, spec):
+    """Return the url of a resized variant of an image.
+
+    Usage: {{ screenshot.screenshot|derivative:"160" }} or with a format
+    {{ profile.avatar|derivative:"80,png" }}. The default format is webp.
+
+    """
+    if not image:
+        return ""
+    name = getattr(image, "name", image)
+    size, _, fmt = str(spec).partition(",")
+    return "%s?%s" % (
+        reverse("wlimages_derivative", args=[name]),
+        urlencode({"w": size, "fmt": fmt or "webp"}),
+    )
+
+
+register.filter("derivative", derivative)
@@ -18,9 +18,13 @@ import sys
 sys.path.append("..")
 
 import PIL
+import os
+import tempfile
 from io import BytesIO
+from unittest import mock
 
-from django.test import TestCase
+from django.conf import settings
+from django.test import TestCase, override_settings
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -104,6 +108,54 @@ class TestImages_TestModelAddingTwiceTheSameNameDifferentRevision_ExceptRaises(
         self.assertEqual(Image.objects.filter(name="test").count(), 2)
 
 
+###########################################################################
+#                            DERIVATIVE TESTS                             #
+###########################################################################
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestImages_Derivatives(TestCase):
+    def setUp(self):
+        for d in ("wlimages", "pybb"):
+            os.makedirs(os.path.join(settings.MEDIA_ROOT, d), exist_ok=True)
+            PIL.Image.new("RGB", (400, 200)).save(
+                os.path.join(settings.MEDIA_ROOT, d, "big.png")
+            )
+
+    def test_ResizedImage_ExceptCorrectResult(self):
+        k = self.client.get(
+            reverse("wlimages_derivative", args=["wlimages/big.png"]),
+            {"w": 160, "fmt": "webp"},
+        )
+        self.assertEqual(k.status_code, 200)
+        self.assertEqual(k["Content-Type"], "image/webp")
+        image = PIL.Image.open(BytesIO(b"".join(k.streaming_content)))
+        self.assertEqual(image.size, (160, 80))
+
+    def test_NotAllowedSize_Except404(self):
+        k = self.client.get(
+            reverse("wlimages_derivative", args=["wlimages/big.png"]), {"w": 123}
+        )
+        self.assertEqual(k.status_code, 404)
+
+    def test_ImageOutsideOfSourceDirectories_Except404(self):
+        k = self.client.get(
+            reverse("wlimages_derivative", args=["pybb/big.png"]), {"w": 160}
+        )
+        self.assertEqual(k.status_code, 404)
+
+    def test_DecompressionBomb_Except404(self):
+        with mock.patch.object(PIL.Image, "MAX_IMAGE_PIXELS", 100):
+            k = self.client.get(
+                reverse("wlimages_derivative", args=["wlimages/big.png"]), {"w": 160}
+            )
+        self.assertEqual(k.status_code, 404)
+
+    def test_PathOutsideOfMediaRoot_Except404(self):
+        k = self.client.get(
+            reverse("wlimages_derivative", args=["../../etc/passwd"]), {"w": 160}
+        )
+        self.assertEqual(k.status_code, 404)
+
+
 ###############
 # Other Tests #
 ###############
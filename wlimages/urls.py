@@ -2,6 +2,7 @@ from django.conf.urls import *
 from .views import *
 
 urlpatterns = [
+    url(r"^derivative/(?P<name>.+)$", derivative, name="wlimages_derivative"),
     url(
         r"^upload/(?P<content_type>\d+)/(?P<object_id>\d+)/(?P<next>.*)$",
         upload,
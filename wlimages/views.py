@@ -1,10 +1,14 @@
+from concurrent.futures import TimeoutError
+
 from django.contrib.auth.decorators import login_required
 from django.contrib.contenttypes.models import ContentType
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render
+from django.utils.cache import patch_cache_control
 
 from .models import Image
 from .forms import UploadImageForm
+from . import derivatives
 
 
 def display(request, image, revision):
@@ -23,6 +27,27 @@ def display(request, image, revision):
     return r
 
 
+def derivative(request, name):
+    """Serve a resized variant of an uploaded image.
+
+    The size and format are given by the parameters 'w' and 'fmt', e.g.
+    /images/derivative/wlscreens/screens/Build20/menu.png?w=320&fmt=webp
+
+    """
+    fmt = request.GET.get("fmt", "webp")
+    try:
+        size = int(request.GET.get("w", ""))
+        path = derivatives.get_derivative(name, size, fmt)
+    except (ValueError, derivatives.DerivativeError, OSError):
+        raise Http404("No such image")
+    except TimeoutError:
+        return HttpResponse("Image is being generated", status=503)
+
+    response = FileResponse(open(path, "rb"), content_type=derivatives.FORMATS[fmt][1])
+    patch_cache_control(response, public=True, max_age=86400)
+    return response
+
+
 @login_required
 def upload(request, content_type, object_id, next="/"):
     if request.method == "POST":
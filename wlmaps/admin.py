@@ -2,7 +2,7 @@
 # encoding: utf-8
 #
 
-from .models import Map
+from .models import Map, MapUpload
 from django.contrib import admin
 
 
@@ -71,3 +71,12 @@ class MapAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Map, MapAdmin)
+
+
+class MapUploadAdmin(admin.ModelAdmin):
+    list_display = ["file", "uploader", "created", "status"]
+    list_filter = ["status"]
+    readonly_fields = ("file", "uploader", "created", "map")
+
+
+admin.site.register(MapUpload, MapUploadAdmin)
@@ -8,5 +8,7 @@ class WlMapsConfig(AppConfig):
 
     def ready(self):
         from wlmaps.management import create_notice_types
+        from wlmaps.signals import setup_signals
 
         signals.post_migrate.connect(create_notice_types, sender=self)
+        setup_signals()
@@ -13,25 +13,45 @@ VERSION_CHOICES = (
 
 
 class MapFilter(django_filters.FilterSet):
+    # Filtering and sorting is done on the denormalized MapCatalog, which
+    # has the needed indexes and the rating values.
+    name__icontains = django_filters.CharFilter(
+        field_name="catalog__name_lower", method="filter_name", label="Name contains"
+    )
     uploader = django_filters.CharFilter(
         field_name="uploader__username", lookup_expr="iexact", label="Uploader"
     )
-    nr_players = django_filters.RangeFilter()
-    w = django_filters.RangeFilter()
-    h = django_filters.RangeFilter()
+    nr_players = django_filters.RangeFilter(
+        field_name="catalog__nr_players", label="Max Players"
+    )
+    w = django_filters.RangeFilter(field_name="catalog__w", label="Width")
+    h = django_filters.RangeFilter(field_name="catalog__h", label="Height")
+    size_class = django_filters.ChoiceFilter(
+        field_name="catalog__size_class",
+        choices=models.MapCatalog.SIZE_CHOICES,
+        label="Size",
+    )
     o = django_filters.OrderingFilter(
-        fields=("pub_date", "w", "h", "ratings__average"),
+        # The public name of the rating ordering is kept for existing links
+        fields=(
+            ("catalog__pub_date", "pub_date"),
+            ("catalog__w", "w"),
+            ("catalog__h", "h"),
+            ("catalog__rating_average", "ratings__average"),
+        ),
         field_labels={
-            "pub_date": "Upload date",
-            "w": "Width",
-            "h": "Height",
-            "ratings__average": "Rating",
+            "catalog__pub_date": "Upload date",
+            "catalog__w": "Width",
+            "catalog__h": "Height",
+            "catalog__rating_average": "Rating",
         },
     )
 
     class Meta:
         model = models.Map
         fields = {
-            "name": ["icontains"],
             "author": ["iexact"],
         }
+
+    def filter_name(self, queryset, name, value):
+        return queryset.filter(**{"%s__contains" % name: value.lower()})
@@ -0,0 +1,182 @@
+"""Background processing of uploaded maps.
+
+Each upload is processed in its own sandbox directory, so uploads of files
+with the same name can't collide. The map info tool runs with the
+Widelands data directory as its working directory instead of changing the
+working directory of the whole process. The number of concurrently running
+tools is bounded by the size of the thread pool.
+
+Settings:
+
+MAP_INGEST_TOOL:    The executable which creates the json and minimap
+MAP_INGEST_WORKERS: Number of worker threads. With 0 uploads get
+                    processed directly in the calling thread.
+MAP_INGEST_TIMEOUT: Seconds after the tool gets killed
+
+The queue of the thread pool is lost when the process ends. Uploads left
+waiting or processing are picked up again by the process_map_uploads
+command.
+
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, close_old_connections, transaction
+
+from wlmaps.models import Map, MapUpload
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class IngestError(Exception):
+    """Raised if an uploaded map can't be turned into a Map."""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.MAP_INGEST_WORKERS,
+                thread_name_prefix="wlmaps-ingest",
+            )
+    return _executor
+
+
+def submit(upload):
+    """Queue the MapUpload for processing."""
+
+    if settings.MAP_INGEST_WORKERS == 0:
+        process(upload.pk)
+    else:
+        _get_executor().submit(_process_in_thread, upload.pk)
+
+
+def _process_in_thread(upload_id):
+    try:
+        process(upload_id)
+    except Exception:
+        logger.exception("Processing of map upload %s failed", upload_id)
+    finally:
+        close_old_connections()
+
+
+def process(upload_id):
+    """Run the map info tool for the upload and create the Map.
+
+    Returns the upload, or None if it was already claimed by another worker.
+
+    """
+
+    # Claim the upload, so it is never processed twice
+    claimed = MapUpload.objects.filter(pk=upload_id, status=MapUpload.PENDING).update(
+        status=MapUpload.PROCESSING, started=datetime.now()
+    )
+    if not claimed:
+        return None
+
+    upload = MapUpload.objects.get(pk=upload_id)
+    sandbox = tempfile.mkdtemp(prefix="wlmap_")
+    try:
+        upload.map = _create_map(upload, sandbox)
+        upload.status = MapUpload.DONE
+        upload.save(update_fields=["map", "status"])
+    except Exception as e:
+        if isinstance(e, IngestError):
+            upload.error = str(e)
+        else:
+            logger.exception("Processing of map upload %s failed", upload_id)
+            upload.error = "The map file could not be processed."
+        upload.status = MapUpload.FAILED
+        upload.save(update_fields=["status", "error"])
+        upload.file.delete(save=False)
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+    return upload
+
+
+def _run_map_info(map_file):
+    try:
+        subprocess.run(
+            [settings.MAP_INGEST_TOOL, map_file],
+            cwd=settings.WIDELANDS_SVN_DIR or None,
+            timeout=settings.MAP_INGEST_TIMEOUT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except subprocess.TimeoutExpired:
+        raise IngestError("Processing the map file took too long.")
+    except (subprocess.CalledProcessError, OSError):
+        raise IngestError("The map file could not be processed.")
+
+    try:
+        with open(map_file + ".json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        raise IngestError("The map file could not be processed.")
+
+
+def _create_map(upload, sandbox):
+    # 'wl_map_info' needs the original file extension and writes its
+    # results next to the map file
+    map_file = os.path.join(sandbox, os.path.basename(upload.file.name))
+    with upload.file.open("rb") as src, open(map_file, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+
+    mapinfo = _run_map_info(map_file)
+
+    map = Map(
+        name=mapinfo["name"],
+        author=mapinfo["author"],
+        w=mapinfo["width"],
+        h=mapinfo["height"],
+        nr_players=mapinfo["nr_players"],
+        descr=mapinfo["description"],
+        hint=mapinfo["hint"],
+        world_name=mapinfo["world_name"],
+        file=upload.file.name,
+        uploader=upload.uploader,
+        uploader_comment=upload.uploader_comment,
+    )
+    # The field is called 'wl_version_after' even though it actually means the
+    # _minimum_ WL version required to play the map for historical reasons
+    if "minimum_required_widelands_version" in mapinfo:
+        map.wl_version_after = mapinfo["minimum_required_widelands_version"]
+    else:
+        map.wl_version_after = "build {}".format(
+            mapinfo["needs_widelands_version_after"] + 1
+        )
+
+    # mapinfo["minimap"] is the absolute path to the image file in the sandbox
+    with open(mapinfo["minimap"], "rb") as f:
+        map.minimap.save(os.path.basename(mapinfo["minimap"]), File(f), save=False)
+
+    try:
+        # Name and slug are unique, which also covers concurrent uploads
+        with transaction.atomic():
+            map.save()
+    except IntegrityError:
+        map.minimap.delete(save=False)
+        raise IngestError("A map with the same name already exists.")
+    except Exception:
+        map.minimap.delete(save=False)
+        raise
+
+    # The map uses the file of the upload as well
+    map.file.storage.share(map.file.name)
+    return map
@@ -0,0 +1,35 @@
+"""Process the map uploads which were left behind.
+
+The uploads are queued in the memory of the process which received them.
+After a restart, uploads still waiting are processed here, and uploads
+whose processing was interrupted are processed again.
+
+"""
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from wlmaps import ingest
+from wlmaps.models import MapUpload
+
+
+class Command(BaseCommand):
+    help = "Process waiting map uploads and retry interrupted ones."
+
+    def handle(self, *args, **options):
+        # Processing can't take much longer than the timeout of the tool
+        stale = datetime.now() - timedelta(seconds=settings.MAP_INGEST_TIMEOUT + 60)
+        requeued = MapUpload.objects.filter(
+            status=MapUpload.PROCESSING, started__lt=stale
+        ).update(status=MapUpload.PENDING)
+        if requeued:
+            self.stdout.write("Requeued %d interrupted uploads" % requeued)
+
+        pending = MapUpload.objects.filter(status=MapUpload.PENDING).order_by("pk")
+        for upload_id in pending.values_list("pk", flat=True):
+            # None if a running worker claimed it meanwhile
+            upload = ingest.process(upload_id)
+            if upload is not None:
+                self.stdout.write("Upload %d: %s" % (upload.pk, upload.error or "done"))
@@ -0,0 +1,121 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_catalog(apps, schema_editor):
+    Map = apps.get_model("wlmaps", "Map")
+    MapCatalog = apps.get_model("wlmaps", "MapCatalog")
+    Rating = apps.get_model("star_ratings", "Rating")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    ratings = {}
+    try:
+        ct = ContentType.objects.get(app_label="wlmaps", model="map")
+        for r in Rating.objects.filter(content_type=ct):
+            ratings[r.object_id] = r
+    except ContentType.DoesNotExist:
+        pass
+
+    entries = []
+    for m in Map.objects.all():
+        size = max(m.w, m.h)
+        if size <= 96:
+            size_class = 1
+        elif size <= 160:
+            size_class = 2
+        elif size <= 256:
+            size_class = 3
+        else:
+            size_class = 4
+        rating = ratings.get(m.pk)
+        entries.append(
+            MapCatalog(
+                map=m,
+                name_lower=m.name.lower(),
+                nr_players=m.nr_players,
+                w=m.w,
+                h=m.h,
+                size_class=size_class,
+                pub_date=m.pub_date,
+                rating_average=rating.average if rating else 0,
+                rating_count=rating.count if rating else 0,
+            )
+        )
+    MapCatalog.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wlmaps", "0004_auto_20210201_1547"),
+        ("star_ratings", "0003_auto_20160721_1127"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MapCatalog",
+            fields=[
+                (
+                    "map",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="catalog",
+                        serialize=False,
+                        to="wlmaps.Map",
+                    ),
+                ),
+                ("name_lower", models.CharField(db_index=True, max_length=255)),
+                ("nr_players", models.PositiveIntegerField()),
+                ("w", models.PositiveIntegerField()),
+                ("h", models.PositiveIntegerField()),
+                (
+                    "size_class",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (1, "Small (up to 96)"),
+                            (2, "Medium (up to 160)"),
+                            (3, "Large (up to 256)"),
+                            (4, "Huge"),
+                        ]
+                    ),
+                ),
+                ("pub_date", models.DateTimeField()),
+                (
+                    "rating_average",
+                    models.DecimalField(decimal_places=3, default=0, max_digits=6),
+                ),
+                ("rating_count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="mapcatalog",
+            index=models.Index(
+                fields=["nr_players", "w", "h"], name="wlmaps_mapc_nr_play_6e8646_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mapcatalog",
+            index=models.Index(
+                fields=["size_class", "nr_players"],
+                name="wlmaps_mapc_size_cl_50e52c_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mapcatalog",
+            index=models.Index(
+                fields=["rating_average", "pub_date"],
+                name="wlmaps_mapc_rating__97ff1e_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mapcatalog",
+            index=models.Index(
+                fields=["pub_date"], name="wlmaps_mapc_pub_dat_504102_idx"
+            ),
+        ),
+        migrations.RunPython(populate_catalog, migrations.RunPython.noop),
+    ]
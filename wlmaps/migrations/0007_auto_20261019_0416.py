@@ -0,0 +1,41 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:16
+
+from django.db import migrations, models
+import mainpage.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wlmaps", "0006_mapupload"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="map",
+            name="file",
+            field=models.FileField(
+                storage=mainpage.storage.ContentAddressedStorage(),
+                upload_to="wlmaps/maps",
+                verbose_name="Mapfile",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="map",
+            name="minimap",
+            field=models.ImageField(
+                storage=mainpage.storage.ContentAddressedStorage(),
+                upload_to="wlmaps/minimaps",
+                verbose_name="Minimap",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="mapupload",
+            name="file",
+            field=models.FileField(
+                storage=mainpage.storage.ContentAddressedStorage(),
+                upload_to="wlmaps/maps",
+                verbose_name="Mapfile",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-19 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wlmaps", "0007_auto_20261019_0416"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mapupload",
+            name="started",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -9,6 +9,7 @@ from django.db.models.signals import pre_delete
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
 from star_ratings.models import Rating
+from mainpage.storage import content_storage
 
 import datetime
 import os
@@ -29,8 +30,12 @@ class Map(models.Model):
 
     descr = models.TextField(verbose_name="Description")
     hint = models.TextField(verbose_name="Hint", blank=True)
-    minimap = models.ImageField(verbose_name="Minimap", upload_to="wlmaps/minimaps")
-    file = models.FileField(verbose_name="Mapfile", upload_to="wlmaps/maps")
+    minimap = models.ImageField(
+        verbose_name="Minimap", upload_to="wlmaps/minimaps", storage=content_storage
+    )
+    file = models.FileField(
+        verbose_name="Mapfile", upload_to="wlmaps/maps", storage=content_storage
+    )
 
     world_name = models.CharField(max_length=50, blank=True)
 
@@ -94,3 +99,137 @@ class Map(models.Model):
         self.minimap.delete()
         self.file.delete()
         super(Map, self).delete(*args, **kwargs)
+
+
+class MapUpload(models.Model):
+    """An uploaded map file waiting to be processed by 'wl_map_info'.
+
+    The processing is done in the background by wlmaps.ingest. On success
+    a Map is created and linked to this upload.
+
+    """
+
+    PENDING = "pending"
+    PROCESSING = "processing"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Waiting for processing"),
+        (PROCESSING, "Processing"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    file = models.FileField(
+        verbose_name="Mapfile", upload_to="wlmaps/maps", storage=content_storage
+    )
+    uploader_comment = models.TextField(verbose_name="Uploader comment", blank=True)
+    uploader = models.ForeignKey(User, on_delete=models.CASCADE)
+    created = models.DateTimeField(default=datetime.datetime.now)
+    started = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(
+        max_length=12, choices=STATUS_CHOICES, default=PENDING, db_index=True
+    )
+    error = models.TextField(blank=True)
+    map = models.ForeignKey(Map, null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        ordering = ("-created",)
+
+    def __str__(self):
+        # The file of failed uploads is deleted
+        return "%s (%s)" % (os.path.basename(self.file.name or ""), self.status)
+
+    def get_absolute_url(self):
+        return reverse("wlmaps_upload_status", kwargs={"upload_id": self.pk})
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+
+class MapCatalogManager(models.Manager):
+    def refresh_for_map(self, map):
+        """Create or update the catalog entry of map."""
+
+        rating = map.ratings.first()
+        entry, created = self.update_or_create(
+            map=map,
+            defaults={
+                "name_lower": map.name.lower(),
+                "nr_players": map.nr_players,
+                "w": map.w,
+                "h": map.h,
+                "size_class": MapCatalog.size_class_for(map.w, map.h),
+                "pub_date": map.pub_date,
+                "rating_average": rating.average if rating else 0,
+                "rating_count": rating.count if rating else 0,
+            },
+        )
+        return entry
+
+    def refresh_rating(self, rating):
+        """Copy the values of a star_ratings Rating to the catalog."""
+
+        return self.filter(map_id=rating.object_id).update(
+            rating_average=rating.average, rating_count=rating.count
+        )
+
+
+class MapCatalog(models.Model):
+    """Denormalized data used for browsing and sorting maps.
+
+    The entries are kept up to date by the signal handlers in
+    wlmaps.signals, so the map list needs no join over the generic
+    relation of star_ratings.
+
+    """
+
+    SIZE_SMALL = 1
+    SIZE_MEDIUM = 2
+    SIZE_LARGE = 3
+    SIZE_HUGE = 4
+    SIZE_CHOICES = (
+        (SIZE_SMALL, "Small (up to 96)"),
+        (SIZE_MEDIUM, "Medium (up to 160)"),
+        (SIZE_LARGE, "Large (up to 256)"),
+        (SIZE_HUGE, "Huge"),
+    )
+
+    map = models.OneToOneField(
+        Map, on_delete=models.CASCADE, primary_key=True, related_name="catalog"
+    )
+    name_lower = models.CharField(max_length=255, db_index=True)
+    nr_players = models.PositiveIntegerField()
+    w = models.PositiveIntegerField()
+    h = models.PositiveIntegerField()
+    size_class = models.PositiveSmallIntegerField(choices=SIZE_CHOICES)
+    pub_date = models.DateTimeField()
+    rating_average = models.DecimalField(max_digits=6, decimal_places=3, default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    objects = MapCatalogManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["nr_players", "w", "h"]),
+            models.Index(fields=["size_class", "nr_players"]),
+            models.Index(fields=["rating_average", "pub_date"]),
+            models.Index(fields=["pub_date"]),
+        ]
+
+    def __str__(self):
+        return "Catalog entry for %s" % self.map.name
+
+    @classmethod
+    def size_class_for(cls, w, h):
+        """Classify a map by its larger dimension."""
+
+        size = max(w, h)
+        if size <= 96:
+            return cls.SIZE_SMALL
+        if size <= 160:
+            return cls.SIZE_MEDIUM
+        if size <= 256:
+            return cls.SIZE_LARGE
+        return cls.SIZE_HUGE
@@ -0,0 +1,37 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save, post_delete
+from star_ratings.models import Rating
+
+from wlmaps.models import Map, MapCatalog
+
+# Fields of a map which are not part of the catalog. Saving only these
+# (e.g. when downloading a map) needs no refresh of the catalog entry.
+NON_CATALOG_FIELDS = {"nr_downloads", "uploader_comment"}
+
+
+def map_saved(instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if update_fields and set(update_fields) <= NON_CATALOG_FIELDS:
+        return
+    MapCatalog.objects.refresh_for_map(instance)
+
+
+def rating_changed(instance, **kwargs):
+    if instance.content_type_id != ContentType.objects.get_for_model(Map).id:
+        return
+    MapCatalog.objects.refresh_rating(instance)
+
+
+def rating_deleted(instance, **kwargs):
+    if instance.content_type_id != ContentType.objects.get_for_model(Map).id:
+        return
+    MapCatalog.objects.filter(map_id=instance.object_id).update(
+        rating_average=0, rating_count=0
+    )
+
+
+def setup_signals():
+    post_save.connect(map_saved, sender=Map)
+    post_save.connect(rating_changed, sender=Rating)
+    post_delete.connect(rating_deleted, sender=Rating)
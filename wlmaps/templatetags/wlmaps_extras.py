@@ -0,0 +1,28 @@
+from django import template
+from star_ratings import app_settings
+
+from wlmaps.models import MapCatalog
+
+register = template.Library()
+
+
+@register.inclusion_tag("wlmaps/inlines/rating.html")
+def catalog_ratings(map):
+    """Show the rating of a map as the read only widget of star_ratings.
+
+    The values are taken from the catalog entry of the map, so unlike the
+    ratings tag of star_ratings this runs no queries. Maps without an entry
+    are shown as not rated.
+
+    """
+    try:
+        catalog = map.catalog
+    except MapCatalog.DoesNotExist:
+        average, count = 0, 0
+    else:
+        average, count = catalog.rating_average, catalog.rating_count
+    return {
+        "average": average,
+        "count": count,
+        "star_count": app_settings.STAR_RATINGS_RANGE,
+    }
@@ -0,0 +1,130 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from mainpage.models import StoredFile
+from wlmaps import ingest
+from wlmaps.models import Map, MapUpload
+
+elven_forests = os.path.dirname(__file__) + "/data/Elven Forests.wmf"
+fake_map_info = os.path.dirname(__file__) + "/data/wl_map_info"
+
+
+def create_upload(user, **kwargs):
+    upload = MapUpload(uploader=user, **kwargs)
+    with open(elven_forests, "rb") as f:
+        upload.file.save("Elven Forests.wmf", File(f))
+    return upload
+
+
+###########
+# Helpers #
+###########
+
+
+@override_settings(
+    MAP_INGEST_TOOL=fake_map_info,
+    MAP_INGEST_WORKERS=0,
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    WIDELANDS_SVN_DIR=tempfile.gettempdir(),
+)
+class _IngestBase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="uploader")
+
+
+@override_settings(
+    MAP_INGEST_TOOL=fake_map_info,
+    MAP_INGEST_WORKERS=1,
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    WIDELANDS_SVN_DIR=tempfile.gettempdir(),
+)
+class _IngestInWorkerThreadBase(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="uploader")
+
+    def tearDown(self):
+        ingest._executor = None
+
+
+#############
+# TestCases #
+#############
+
+
+class TestWLMaps_IngestUpload_ExceptFileSharedWithMap(_IngestBase):
+    def runTest(self):
+        upload = ingest.process(create_upload(self.user).pk)
+        self.assertEqual(upload.map.file.name, upload.file.name)
+        self.assertEqual(StoredFile.objects.get(name=upload.file.name).references, 2)
+        upload.map.delete()
+        self.assertTrue(upload.file.storage.exists(upload.file.name))
+
+
+class TestWLMaps_IngestUnexpectedError_ExceptFailedUpload(_IngestBase):
+    def runTest(self):
+        upload = create_upload(self.user)
+        with mock.patch.object(ingest, "_run_map_info", return_value={}):
+            with self.assertLogs("wlmaps.ingest"):
+                upload = ingest.process(upload.pk)
+        self.assertEqual(upload.status, MapUpload.FAILED)
+        self.assertEqual(upload.error, "The map file could not be processed.")
+
+
+class TestWLMaps_IngestDuplicateName_ExceptFailedUpload(_IngestBase):
+    def runTest(self):
+        ingest.process(create_upload(self.user).pk)
+        # Like a concurrent upload, which didn't see the first map yet
+        upload = ingest.process(create_upload(self.user).pk)
+        self.assertEqual(upload.status, MapUpload.FAILED)
+        self.assertEqual(upload.error, "A map with the same name already exists.")
+        self.assertEqual(Map.objects.count(), 1)
+
+
+class TestWLMaps_ProcessLeftBehindUploads_ExceptCorrectResult(_IngestBase):
+    def runTest(self):
+        waiting = create_upload(self.user)
+        interrupted = create_upload(
+            self.user,
+            status=MapUpload.PROCESSING,
+            started=datetime.now() - timedelta(hours=1),
+        )
+        running = create_upload(
+            self.user, status=MapUpload.PROCESSING, started=datetime.now()
+        )
+        call_command("process_map_uploads", stdout=StringIO())
+        statuses = dict(MapUpload.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[waiting.pk], MapUpload.DONE)
+        # The name is taken by the first map meanwhile
+        self.assertEqual(statuses[interrupted.pk], MapUpload.FAILED)
+        self.assertEqual(statuses[running.pk], MapUpload.PROCESSING)
+
+
+class TestWLMaps_IngestInWorkerThread_ExceptCorrectResult(_IngestInWorkerThreadBase):
+    def runTest(self):
+        upload = create_upload(self.user)
+        ingest.submit(upload)
+        ingest._get_executor().shutdown(wait=True)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, MapUpload.DONE)
+        self.assertEqual(upload.map.name, "Elven Forests")
+
+
+class TestWLMaps_IngestFailureInWorkerThread_ExceptFailedUpload(
+    _IngestInWorkerThreadBase
+):
+    def runTest(self):
+        upload = create_upload(self.user)
+        with mock.patch.object(ingest, "_run_map_info", side_effect=KeyError("name")):
+            with self.assertLogs("wlmaps.ingest"):
+                ingest.submit(upload)
+                ingest._get_executor().shutdown(wait=True)
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, MapUpload.FAILED)
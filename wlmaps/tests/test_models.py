@@ -101,3 +101,22 @@ class TestWLMapsModels_Map(DjangoTest):
                 "uploader_comment": "Rockdamap",
             },
         )
+
+    def test_CatalogEntryCreated_expectCorrectResult(self):
+        entry = MapCatalog.objects.get(map=self.map)
+        self.assertEqual(entry.name_lower, "map")
+        self.assertEqual(entry.size_class, MapCatalog.SIZE_MEDIUM)
+        self.assertEqual(entry.rating_count, 0)
+
+    def test_CatalogFollowsRating_expectCorrectResult(self):
+        Rating.objects.rate(self.map, 8, user=self.user)
+        entry = MapCatalog.objects.get(map=self.map)
+        self.assertEqual(entry.rating_count, 1)
+        self.assertEqual(entry.rating_average, 8)
+
+    def test_CatalogFollowsMapChange_expectCorrectResult(self):
+        self.map.w = 400
+        self.map.save()
+        entry = MapCatalog.objects.get(map=self.map)
+        self.assertEqual(entry.w, 400)
+        self.assertEqual(entry.size_class, MapCatalog.SIZE_HUGE)
@@ -2,21 +2,32 @@
 # encoding: utf-8
 #
 
-from django.test import TestCase as DjangoTest, Client
+from django.test import TestCase as DjangoTest, Client, override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 
 from wlmaps.models import *
 
 import os
+import tempfile
 
 elven_forests = os.path.dirname(__file__) + "/data/Elven Forests.wmf"
+# Fake of the map info tool, which doesn't need a widelands installation
+fake_map_info = os.path.dirname(__file__) + "/data/wl_map_info"
 
 ###########
 # Helpers #
 ###########
 
 
+@override_settings(
+    MAP_INGEST_TOOL=fake_map_info,
+    MAP_INGEST_WORKERS=0,
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    WIDELANDS_SVN_DIR=tempfile.gettempdir(),
+)
 class _LoginToSite(DjangoTest):
     def setUp(self):
         u = User.objects.create(username="root", email="root@root.com")
@@ -83,6 +94,33 @@ class TestWLMaps_UploadWithInvalidMap_ExceptError(_LoginToSite):
         self.assertEqual(len(Map.objects.all()), 0)
 
 
+class TestWLMaps_UploadStatus_ExceptCorrectResult(_LoginToSite):
+    def runTest(self):
+        url = reverse("wlmaps_upload")
+        with open(elven_forests, "rb") as f:
+            k = self.client.post(url, {"file": f})
+        upload = MapUpload.objects.get()
+        self.assertRedirects(k, upload.get_absolute_url(), target_status_code=302)
+
+        k = self.client.get(
+            upload.get_absolute_url(), HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+        self.assertEqual(k.json()["status"], MapUpload.DONE)
+        self.assertEqual(k.json()["url"], "/maps/elven-forests/")
+
+
+class TestWLMaps_UploadStatusOfInvalidMap_ExceptError(_LoginToSite):
+    def runTest(self):
+        url = reverse("wlmaps_upload")
+        with open(__file__, "rb") as f:
+            self.client.post(url, {"file": f})
+        upload = MapUpload.objects.get()
+        self.assertEqual(upload.status, MapUpload.FAILED)
+
+        k = self.client.get(upload.get_absolute_url())
+        self.assertContains(k, "The map file could not be processed.")
+
+
 # Viewing
 
 
@@ -132,3 +170,27 @@ class TestWLMapsViews_Viewing(DjangoTest):
     def test_ViewingNonExistingMap_Except404(self):
         c = self.client.get(reverse("wlmaps_view", args=("a-map-that-doesnt-exist",)))
         self.assertEqual(c.status_code, 404)
+
+    def test_FilterAndSortMapList_ExceptCorrectResult(self):
+        c = self.client.get(
+            reverse("wlmaps_index"),
+            {"name__icontains": "LONG", "o": "-ratings__average"},
+        )
+        self.assertEqual(c.status_code, 200)
+        self.assertEqual(list(c.context["map_list"]), [self.map1])
+
+    def test_MapListShowsRatingWidget_ExceptCatalogValues(self):
+        MapCatalog.objects.filter(map=self.map).update(rating_average=4, rating_count=2)
+        with CaptureQueriesContext(connection) as queries:
+            c = self.client.get(reverse("wlmaps_index"))
+        self.assertContains(c, 'class="star-ratings"', count=2)
+        self.assertContains(c, "4 (2 Votes)")
+        self.assertFalse(
+            [q for q in queries if "star_ratings_rating" in q["sql"]],
+            "The widget must not query the ratings of star_ratings",
+        )
+
+    def test_MapListWithoutCatalogEntry_ExceptNotRated(self):
+        MapCatalog.objects.filter(map=self.map).delete()
+        c = self.client.get(reverse("wlmaps_index"))
+        self.assertContains(c, "0 (0 Votes)")
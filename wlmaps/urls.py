@@ -8,6 +8,11 @@ from .views import *
 urlpatterns = [
     url(r"^$", MapList.as_view(), name="wlmaps_index"),
     url(r"^upload/$", upload, name="wlmaps_upload"),
+    url(
+        r"^upload/(?P<upload_id>\d+)/$",
+        upload_status,
+        name="wlmaps_upload_status",
+    ),
     url(r"^(?P<map_slug>[-\w]+)/$", view, name="wlmaps_view"),
     url(
         r"^(?P<map_slug>[-\w]+)/edit_comment/$",
@@ -4,6 +4,7 @@
 import os
 
 from .forms import UploadMapForm, EditCommentForm
+from . import ingest
 from django.views.generic import ListView
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
@@ -18,12 +19,16 @@ from django.urls import reverse
 from django.conf import settings
 from . import filters, models
 
+from django.utils.decorators import method_decorator
+from mainpage import page_cache
+from mainpage.conditional import conditional
 from mainpage.wl_utils import get_real_ip
 
 
 #########
 # Views #
 #########
+@method_decorator(page_cache.tagged(page_cache.tag_for(models.Map)), name="dispatch")
 class MapList(ListView):
     model = models.Map
 
@@ -34,7 +39,9 @@ class MapList(ListView):
             if not get.get("o"):
                 get["o"] = "-pub_date"
 
-            self._filter = filters.MapFilter(get, queryset=super().get_queryset())
+            self._filter = filters.MapFilter(
+                get, queryset=super().get_queryset().select_related("catalog")
+            )
 
         return self._filter
 
@@ -98,8 +105,16 @@ def download(request, map_slug):
     return response
 
 
+def map_tags(request, map_slug):
+    """Tags of a map page for conditional()."""
+    pk = models.Map.objects.filter(slug=map_slug).values_list("pk", flat=True).first()
+    return pk and [page_cache.tag_for(models.Map, pk)]
+
+
+@conditional(map_tags)
 def view(request, map_slug):
     map = get_object_or_404(models.Map, slug=map_slug)
+    page_cache.tag(request, page_cache.tag_for(map))
     context = {
         "map": map,
     }
@@ -128,10 +143,11 @@ def upload(request):
     if request.method == "POST":
         form = UploadMapForm(request.POST, request.FILES)
         if form.is_valid():
-            map = form.save(commit=False)
-            map.uploader = request.user
-            map.save()
-            return HttpResponseRedirect(map.get_absolute_url())
+            upload = form.save(commit=False)
+            upload.uploader = request.user
+            upload.save()
+            ingest.submit(upload)
+            return HttpResponseRedirect(upload.get_absolute_url())
     else:
         form = UploadMapForm()
 
@@ -139,3 +155,33 @@ def upload(request):
         "form": form,
     }
     return render(request, "wlmaps/upload.html", context)
+
+
+@login_required
+def upload_status(request, upload_id):
+    """Show the processing state of an uploaded map.
+
+    Ajax requests get the state as json for polling. If the map is
+    processed, the user is redirected to it.
+
+    """
+    upload = get_object_or_404(models.MapUpload, pk=upload_id, uploader=request.user)
+    map_url = upload.map.get_absolute_url() if upload.map else None
+
+    if request.is_ajax():
+        return JsonResponse(
+            {
+                "status": upload.status,
+                "finished": upload.finished,
+                "error": upload.error,
+                "url": map_url,
+            }
+        )
+
+    if map_url:
+        return HttpResponseRedirect(map_url)
+
+    context = {
+        "upload": upload,
+    }
+    return render(request, "wlmaps/upload_status.html", context)
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:56
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, F, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    """Keep only the first vote of a user per poll."""
+    Choice = apps.get_model("wlpoll", "Choice")
+    Vote = apps.get_model("wlpoll", "Vote")
+    duplicates = (
+        Vote.objects.values("user", "poll")
+        .annotate(count=Count("id"), keep=Min("id"))
+        .filter(count__gt=1)
+    )
+    for d in duplicates:
+        votes = Vote.objects.filter(user=d["user"], poll=d["poll"]).exclude(
+            id=d["keep"]
+        )
+        for vote in votes:
+            Choice.objects.filter(pk=vote.choice_id, votes__gt=0).update(
+                votes=F("votes") - 1
+            )
+        votes.delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("wlpoll", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="vote",
+            unique_together={("user", "poll")},
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.urls import reverse
 import datetime
 
@@ -22,11 +23,23 @@ class Poll(models.Model):
 
     objects = PollManager()
 
+    def results(self):
+        """Return a list of (choice, votes), cached until the next vote."""
+        key = "wlpoll-results-%d" % self.pk
+        results = cache.get(key)
+        if results is None:
+            results = list(self.choices.order_by("pk").values_list("choice", "votes"))
+            cache.set(key, results)
+        return results
+
+    def invalidate_results(self):
+        cache.delete("wlpoll-results-%d" % self.pk)
+
     def total_votes(self):
-        return self.choices.all().aggregate(models.Sum("votes"))["votes__sum"]
+        return sum(votes for choice, votes in self.results())
 
     def has_user_voted(self, u):
-        return u.poll_votes.filter(poll=self).count() > 0
+        return self.id in voted_polls(u)
 
     def is_closed(self):
         if self.closed_date is None:
@@ -54,3 +67,20 @@ class Vote(models.Model):
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE)
     choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
     date_voted = models.DateTimeField("voted at", default=datetime.datetime.now)
+
+    class Meta:
+        unique_together = ["user", "poll"]
+
+
+def voted_polls(user):
+    """Return the set of poll ids user voted on, cached until the next vote."""
+    key = "wlpoll-voted-%d" % user.pk
+    voted = cache.get(key)
+    if voted is None:
+        voted = set(user.poll_votes.values_list("poll_id", flat=True))
+        cache.set(key, voted)
+    return voted
+
+
+def invalidate_voted_polls(user_id):
+    cache.delete("wlpoll-voted-%d" % user_id)
@@ -2,7 +2,8 @@
 # encoding: utf-8
 #
 
-from wlpoll.models import Choice, Poll
+from mainpage import fragments
+from wlpoll.models import Choice, Poll, voted_polls
 from django import template
 from urllib.parse import urlencode, quote
 
@@ -17,11 +18,11 @@ class DisplayPollNode(template.Node):
         """Render this Poll using Highcharts"""
         p = self._poll.resolve(context)
 
-        choices = p.choices.all()
-
         _esc = lambda s: s.replace("'", "\\'")
 
-        data = ",\n".join("[ '%s', %i ]" % (_esc(c.choice), c.votes) for c in choices)
+        data = ",\n".join(
+            "[ '%s', %i ]" % (_esc(choice), votes) for choice, votes in p.results()
+        )
 
         s = r"""
         <script type="text/javascript">
@@ -85,12 +86,16 @@ class GetOpenPolls(template.Node):
         """Only has side effects."""
         if "user" in context:
             user = context["user"]
-            rv = []
-            for p in Poll.objects.open():
-                p.user_has_voted = (
-                    False if user.is_anonymous() else p.has_user_voted(user)
-                )
-                rv.append(p)
+            rv = fragments.get(
+                "open_polls",
+                "all",
+                lambda: list(Poll.objects.open().prefetch_related("choices")),
+            )
+            voted = set()
+            if rv and not user.is_anonymous:
+                voted = voted_polls(user)
+            for p in rv:
+                p.user_has_voted = p.id in voted
             context[self._vn] = rv
         return ""
 
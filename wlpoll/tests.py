@@ -5,7 +5,12 @@ Replace these with more appropriate tests for your application.
 
 """
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from wlpoll.models import Choice, Poll, Vote, voted_polls
 
 
 class SimpleTest(TestCase):
@@ -24,3 +29,35 @@ Another way to test that 1 + 1 is equal to 2.
 True
 """
 }
+
+
+class TestVote_OncePerUser_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.poll = Poll.objects.create(name="Favourite tribe")
+        self.yes = Choice.objects.create(poll=self.poll, choice="Atlanteans")
+        Choice.objects.create(poll=self.poll, choice="Frisians")
+        self.users = [
+            User.objects.create_user("voter%d" % i, "v%d@example.com" % i, "pw")
+            for i in range(2)
+        ]
+
+    def vote(self, user):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse("wlpoll_vote", args=[self.poll.pk]), {"choice_id": self.yes.pk}
+        )
+
+    def runTest(self):
+        self.assertEqual(self.poll.total_votes(), 0)
+        self.assertEqual(self.vote(self.users[0]).status_code, 302)
+        self.assertEqual(self.vote(self.users[0]).status_code, 403)
+        self.assertEqual(self.poll.results(), [("Atlanteans", 1), ("Frisians", 0)])
+
+        # A vote stored meanwhile by a concurrent request
+        self.assertEqual(voted_polls(self.users[1]), set())
+        Vote.objects.create(user=self.users[1], poll=self.poll, choice=self.yes)
+        self.assertEqual(self.vote(self.users[1]).status_code, 403)
+        self.yes.refresh_from_db()
+        self.assertEqual(self.yes.votes, 1)
+        self.assertEqual(voted_polls(self.users[1]), {self.poll.pk})
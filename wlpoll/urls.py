@@ -4,6 +4,7 @@
 
 from .models import Poll
 from django.conf.urls import *
+from django.db.models import Sum
 from . import views
 from django.views.generic.dates import ArchiveIndexView
 
@@ -14,7 +15,9 @@ urlpatterns = [
     url(
         r"^$",
         ArchiveIndexView.as_view(
-            model=Poll, date_field="pub_date", template_name="wlpoll/poll_list.html"
+            queryset=Poll.objects.annotate(vote_count=Sum("choices__votes")),
+            date_field="pub_date",
+            template_name="wlpoll/poll_list.html",
         ),
         name="wlpoll_archive",
     ),
@@ -6,8 +6,10 @@ from django.http import (
     HttpResponseRedirect,
     HttpResponseForbidden,
 )
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.urls import reverse
-from .models import Poll, Choice, Vote
+from .models import Poll, Choice, Vote, invalidate_voted_polls, voted_polls
 from django.views import generic
 
 
@@ -29,16 +31,22 @@ def vote(request, object_id, next=None):
     p = get_object_or_404(Poll, pk=object_id)
 
     user = request.user
-    if user.poll_votes.filter(poll=p):
+    if p.id in voted_polls(user):
         return HttpResponseForbidden("Can't vote more than once")
 
     if not p.is_closed() and "choice_id" in request.POST:
         c = get_object_or_404(Choice, pk=int(request.POST["choice_id"]), poll=p)
 
-        c.votes += 1
-        c.save()
-
-        v = Vote.objects.create(user=user, poll=p, choice=c)
-        v.save()
+        # The unique vote per user and poll rejects concurrent second
+        # votes, the counter is increased in the database
+        try:
+            with transaction.atomic():
+                Vote.objects.create(user=user, poll=p, choice=c)
+                Choice.objects.filter(pk=c.pk).update(votes=F("votes") + 1)
+        except IntegrityError:
+            return HttpResponseForbidden("Can't vote more than once")
+        finally:
+            invalidate_voted_polls(user.pk)
+        p.invalidate_results()
 
     return HttpResponseRedirect(reverse("wlpoll_detail", args=(p.id,)))
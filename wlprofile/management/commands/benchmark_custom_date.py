@@ -0,0 +1,55 @@
+"""Measure the cost of the custom_date filter.
+
+Formats a number of timestamps spread over the last days with the default
+format and with a format using only the django date syntax, and compares
+them with django's own date filter.
+
+"""
+
+import timeit
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import date as django_date
+
+from wlprofile.templatetags.custom_date import do_custom_date
+
+
+class Command(BaseCommand):
+    help = "Time the formatting of timestamps with custom_date."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=1000, help="Timestamps formatted per run."
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs, the fastest is reported."
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        now = datetime.now()
+        dates = [now - timedelta(minutes=17 * i) for i in range(count)]
+        cases = [
+            (
+                "custom_date, %s" % settings.DEFAULT_TIME_DISPLAY,
+                lambda: [
+                    do_custom_date(settings.DEFAULT_TIME_DISPLAY, d, 2.0) for d in dates
+                ],
+            ),
+            (
+                "custom_date, Y-m-d H:i",
+                lambda: [do_custom_date("Y-m-d H:i", d, 2.0) for d in dates],
+            ),
+            (
+                "django date, Y-m-d H:i",
+                lambda: [django_date(d, "Y-m-d H:i") for d in dates],
+            ),
+        ]
+        for name, run in cases:
+            best = min(timeit.repeat(run, number=1, repeat=options["repeat"]))
+            self.stdout.write(
+                "%s: %.1fms for %d timestamps (%.1fus each)"
+                % (name, best * 1000, count, best * 1000000 / count)
+            )
@@ -9,12 +9,13 @@
 # Last Modified: $Date$
 #
 
-from django.utils.translation import ugettext as _
+from django.utils.translation import get_language, ugettext as _
 from django import template
 from django.template.defaultfilters import date as django_date
 from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.auth.models import User
 import re
+from functools import lru_cache
 from datetime import date as ddate, tzinfo, timedelta, datetime
 from django.conf import settings
 import time
@@ -46,82 +47,134 @@ class FixedOffset(tzinfo):
         return ZERO
 
 
-def do_custom_date(format, date, timezone=1.0, now=None):
-    """Returns a string formatted representation of date according to format.
-    This accepts all formats that strftime also accepts, but it also accepts
-    some new options which are dependant on the current date.
+def _tz_name(timezone):
+    if timezone > 0:
+        return "UTC+" + str(timezone)
+    elif timezone < 0:
+        return "UTC" + str(timezone)
+    return "UTC"
 
-        %NY(format)        (natural year) for example %NY(.%Y) will give ".2008" if this year is not 2008, else
-                            an empty string
-        %ND(alternatives)  (natural day) for example %ND(%d.%m.%Y)
-        -> Yields today, yesterday, tomorrow or 2.12.2008
 
-    format      - format string as described above
-    date        - datetime object to display
-    timezone    - valid timezone as int
-    now         - overwrite the value for now; only for debug reasons
+@lru_cache(maxsize=64)
+def _timezone(offset, name):
+    return FixedOffset(offset, name)
+
+
+# (time to renew, now, timezone of the server)
+_anchor = (0, None, None)
+
+
+def _now_and_server_timezone():
+    """Return the current time and the timezone of the server.
+
+    Both are renewed once a second, so all dates of a page are shown
+    relative to the same point in time.
 
     """
-    if now is None:
-        now = datetime.now()
+    global _anchor
+    monotonic = time.monotonic()
+    if monotonic >= _anchor[0]:
+        dst = time.localtime().tm_gmtoff / 60 / 60
+        _anchor = (
+            monotonic + 1,
+            datetime.now(),
+            _timezone(dst * 60, "UTC+%s".format(dst)),
+        )
+    return _anchor[1], _anchor[2]
 
-    ############################
-    # Set Timezone Information's
-    #
-    # set the timezone named info
-    if timezone > 0:
-        tz_info = "UTC+" + str(timezone)
-    elif timezone < 0:
-        tz_info = "UTC" + str(timezone)
-    else:
-        tz_info = "UTC"
-    # set the server timezone for tzinfo
-    dst = time.localtime().tm_gmtoff / 60 / 60
-    ForumStdTimeZone = FixedOffset(dst * 60, "UTC+%s".format(dst))
-
-    # set the user's timezone information
-    ForumUserTimeZone = FixedOffset(timezone * 60, tz_info)
-    # if there is tzinfo not set
-    try:
-        if not date.tzinfo:
-            date = date.replace(tzinfo=ForumStdTimeZone)
-        date = date.astimezone(ForumUserTimeZone)
-    except AttributeError:  # maybe this is no valid date object?
-        return format
 
-    # If it's done, timezone informations are now available ;)
-    ############################
+def _expand(format, same_year, day):
+    """Replace the natural year and day expressions in format.
+
+    same_year - True if the date is in the current year
+    day       - the date is today (0), tomorrow (1), yesterday (-1) or
+                another day (None)
+
+    """
 
     def _replace_ny(g):
-        if now.year == date.year:
+        if same_year:
             return ""
         return g.group(1)
 
     def _replace_nd(g):
-        delta = ddate(date.year, date.month, date.day) - ddate(
-            now.year, now.month, now.day
-        )
-        if delta.days == 0:
+        if day == 0:
             return _(r"\T\o\d\a\y")
-        elif delta.days == 1:
+        elif day == 1:
             return _(r"\T\o\m\o\r\r\o\w")
-        elif delta.days == -1:
+        elif day == -1:
             return _(r"\Y\e\s\t\e\r\d\a\y")
         else:
             return g.group(1)
 
-    try:
-        while 1:
-            oformat = format
-            format = natural_year_expr.sub(_replace_ny, format)
-            format = natural_day_expr.sub(_replace_nd, format)
-            if oformat == format:
-                break
-        data = django_date(date, format)
-    except NotImplementedError:
-        return format
+    while 1:
+        oformat = format
+        format = natural_year_expr.sub(_replace_ny, format)
+        format = natural_day_expr.sub(_replace_nd, format)
+        if oformat == format:
+            return format
 
-    return data
+
+class _Formatter(object):
+    """Formats dates for one format and timezone.
+
+    The natural expressions can only be replaced in a few ways, the
+    resulting formats are kept in plans.
+
+    """
+
+    def __init__(self, format, timezone):
+        self.format = format
+        self.timezone = _timezone(timezone * 60, _tz_name(timezone))
+        self.plans = {}
+
+    def __call__(self, date, now, server_timezone):
+        try:
+            if not date.tzinfo:
+                date = date.replace(tzinfo=server_timezone)
+            date = date.astimezone(self.timezone)
+        except AttributeError:  # maybe this is no valid date object?
+            return self.format
+
+        days = (
+            ddate(date.year, date.month, date.day) - ddate(now.year, now.month, now.day)
+        ).days
+        key = (now.year == date.year, days if -1 <= days <= 1 else None, get_language())
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = self.plans[key] = _expand(self.format, *key[:2])
+
+        try:
+            return django_date(date, plan)
+        except NotImplementedError:
+            return self.format
+
+
+@lru_cache(maxsize=256)
+def _formatter(format, timezone):
+    return _Formatter(format, timezone)
+
+
+def do_custom_date(format, date, timezone=1.0, now=None):
+    """Returns a string formatted representation of date according to format.
+    This accepts all formats that strftime also accepts, but it also accepts
+    some new options which are dependant on the current date.
+
+        %NY(format)        (natural year) for example %NY(.%Y) will give ".2008" if this year is not 2008, else
+                            an empty string
+        %ND(alternatives)  (natural day) for example %ND(%d.%m.%Y)
+        -> Yields today, yesterday, tomorrow or 2.12.2008
+
+    format      - format string as described above
+    date        - datetime object to display
+    timezone    - valid timezone as int
+    now         - overwrite the value for now; only for debug reasons
+
+    """
+    anchor, server_timezone = _now_and_server_timezone()
+    if now is None:
+        now = anchor
+    return _formatter(format, timezone)(date, now, server_timezone)
 
 
 @register.filter
@@ -134,7 +187,9 @@ def custom_date(date, user):
             date,
         )
     try:
-        userprofile = User.objects.get(username=user).wlprofile
+        if not isinstance(user, User):
+            user = User.objects.get(username=user)
+        userprofile = user.wlprofile
         return do_custom_date(userprofile.time_display, date, userprofile.time_zone)
     except ObjectDoesNotExist:
         return do_custom_date(
@@ -3,7 +3,7 @@
 import unittest
 import datetime
 
-from .templatetags.custom_date import do_custom_date
+from .templatetags.custom_date import _formatter, do_custom_date
 
 
 class _CustomDate_Base(unittest.TestCase):
@@ -105,6 +105,18 @@ class TestCustomDate_RecursiveReplacementHitDayTodayHitYear_ExceptCorrectResult(
         self.assertEqual("12.04.08: Today", rv)
 
 
+class TestCustomDate_CompiledFormatReused_ExceptCorrectResult(_CustomDate_Base):
+    def runTest(self):
+        format = "%ND(j.m.%NY(Y))"
+        now = datetime.datetime(2008, 4, 13, 10, 0, 0)
+        yesterday = do_custom_date(format, self.date, 0, now)
+        older = do_custom_date(format, self.date - datetime.timedelta(3), 0, now)
+        self.assertEqual("Yesterday", yesterday)
+        self.assertEqual("9.04.", older)
+        self.assertIs(_formatter(format, 0), _formatter(format, 0))
+        self.assertEqual(len(_formatter(format, 0).plans), 2)
+
+
 #########
 # FAILS #
 #########
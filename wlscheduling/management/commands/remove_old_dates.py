@@ -7,6 +7,4 @@ class Command(BaseCommand):
     help = "Removes dates that are already passed"
 
     def handle(self, *args, **options):
-        for date in Availabilities.objects.all():
-            if datetime.utcnow() > date.avail_time:
-                date.delete()
+        Availabilities.objects.filter(avail_time__lt=datetime.utcnow()).delete()
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:55
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    Availabilities = apps.get_model("wlscheduling", "Availabilities")
+    duplicates = (
+        Availabilities.objects.values("user", "avail_time")
+        .annotate(count=Count("id"), keep=Min("id"))
+        .filter(count__gt=1)
+    )
+    for d in duplicates:
+        Availabilities.objects.filter(
+            user=d["user"], avail_time=d["avail_time"]
+        ).exclude(id=d["keep"]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("wlscheduling", "0002_auto_20221208_1902"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="availabilities",
+            name="avail_time",
+            field=models.DateTimeField(
+                db_index=True, help_text="this user is available for this whole hour"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="availabilities",
+            unique_together={("user", "avail_time")},
+        ),
+    ]
@@ -1,14 +1,59 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
+from datetime import datetime
+
 from django.db import models
 from django.contrib.auth.models import User
 
 
+class AvailabilitiesQuerySet(models.QuerySet):
+    def upcoming(self):
+        return self.filter(avail_time__gt=datetime.utcnow())
+
+    def by_user(self):
+        """Return a dict of username: sorted list of times."""
+        result = {}
+        rows = self.order_by("avail_time").values_list("user__username", "avail_time")
+        for username, avail_time in rows:
+            result.setdefault(username, []).append(avail_time)
+        return result
+
+    def overlapping(self, user):
+        """The availabilities of other users at the times user is
+        available."""
+        return self.filter(
+            avail_time__in=Availabilities.objects.filter(user=user).values("avail_time")
+        ).exclude(user=user)
+
+    def replace(self, user, times):
+        """Store times as the availabilities of user.
+
+        Only the differences to the stored times are written, times in the
+        past are ignored.
+
+        """
+        now = datetime.utcnow()
+        times = set(t for t in times if t > now)
+        stored = set(self.filter(user=user).values_list("avail_time", flat=True))
+        if stored - times:
+            self.filter(user=user, avail_time__in=stored - times).delete()
+        # Times stored by a concurrent request meanwhile are skipped
+        self.bulk_create(
+            (Availabilities(user=user, avail_time=t) for t in sorted(times - stored)),
+            ignore_conflicts=True,
+        )
+
+
 class Availabilities(models.Model):
     user = models.ForeignKey(
         User, related_name="availabilities", on_delete=models.CASCADE
     )
     avail_time = models.DateTimeField(
-        help_text="this user is available for this whole hour"
+        help_text="this user is available for this whole hour", db_index=True
     )
+
+    objects = AvailabilitiesQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ["user", "avail_time"]
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from wlscheduling.models import Availabilities
+from wlscheduling.views import TIME_FORMAT
+
+
+class TestScheduling_DiffAndOverlaps_ExceptCorrectResult(TestCase):
+    def setUp(self):
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        self.hours = [now + timedelta(hours=h) for h in range(1, 5)]
+        self.user = User.objects.create_user("player", "player@example.com", "pw")
+        self.other = User.objects.create_user("other", "other@example.com", "pw")
+        Availabilities.objects.replace(self.other, self.hours[1:3])
+        self.user.wlprofile.time_zone = 2
+        self.user.wlprofile.save()
+
+    def local(self, hour):
+        return datetime.strftime(hour + timedelta(hours=2), TIME_FORMAT)
+
+    def runTest(self):
+        Availabilities.objects.replace(self.user, self.hours[:2])
+        self.client.force_login(self.user)
+        posted = {"a": self.local(self.hours[1]), "b": self.local(self.hours[2])}
+        response = self.client.post(reverse("scheduling_scheduling"), posted)
+        self.assertEqual(
+            sorted(
+                Availabilities.objects.filter(user=self.user).values_list(
+                    "avail_time", flat=True
+                )
+            ),
+            self.hours[1:3],
+        )
+        self.assertEqual(
+            json.loads(response.context["current_user_availabilities"]),
+            [self.local(h) for h in self.hours[1:3]],
+        )
+        self.assertEqual(
+            json.loads(response.context["other_users_availabilities"]),
+            {"other": [self.local(h) for h in self.hours[1:3]]},
+        )
+
+        # Storing the same times again changes nothing
+        with self.assertNumQueries(1):
+            Availabilities.objects.replace(self.user, self.hours[1:3])
+
+        # Like a double submit, which didn't see the times stored meanwhile
+        Availabilities.objects.none().replace(self.user, self.hours[1:3])
+        self.assertEqual(Availabilities.objects.filter(user=self.user).count(), 2)
+
+        response = self.client.get(reverse("scheduling_find"))
+        self.assertEqual(
+            json.loads(response.context["other_users_availabilities"]),
+            {"other": [self.local(h) for h in self.hours[1:3]]},
+        )
@@ -0,0 +1,78 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from wlscreens.models import Category, Screenshot
+from wlscreens.thumbnails import process_many
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+class Command(BaseCommand):
+    help = (
+        "Import all images of a directory as screenshots into a category. The "
+        "file names without extension are used as names of the screenshots."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory")
+        parser.add_argument("category", help="Name of the category")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of processes. Defaults to the number of cpus.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.time()
+        directory = options["directory"]
+        if not os.path.isdir(directory):
+            raise CommandError("No such directory: {}".format(directory))
+
+        category, created = Category.objects.get_or_create(name=options["category"])
+        existing = {s.name: s for s in category.screenshots.all()}
+
+        paths = sorted(
+            os.path.join(directory, f)
+            for f in os.listdir(directory)
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        jobs = []
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            jobs.append(
+                (path, existing[name].thumbnail_key if name in existing else "")
+            )
+
+        imported = unchanged = failed = 0
+        for path, key, data, seconds, error in process_many(
+            jobs, settings.THUMBNAIL_SIZE, options["workers"]
+        ):
+            if error:
+                failed += 1
+                self.stderr.write("{}: {}".format(path, error))
+                continue
+            if data is None:
+                unchanged += 1
+                continue
+
+            name = os.path.splitext(os.path.basename(path))[0]
+            screenshot = existing.get(name) or Screenshot(name=name, category=category)
+            with open(path, "rb") as f:
+                screenshot.screenshot.save(os.path.basename(path), File(f), save=False)
+                screenshot.set_thumbnail(data, key)
+                # The thumbnail is up to date now, so save() won't create it again
+                screenshot.save()
+            imported += 1
+            if options["verbosity"] > 1:
+                self.stdout.write("{}: {:.3f}s".format(path, seconds))
+
+        self.stdout.write(
+            "Imported {} screenshots, {} unchanged, {} failed in {:.1f}s.".format(
+                imported, unchanged, failed, time.time() - start
+            )
+        )
@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from wlscreens.models import Screenshot
+from wlscreens.thumbnails import process_many
+
+
+class Command(BaseCommand):
+    help = "Recreate the thumbnails of screenshots in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recreate also thumbnails which are up to date.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of processes. Defaults to the number of cpus.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.time()
+        screenshots = {s.screenshot.path: s for s in Screenshot.objects.all()}
+        jobs = [
+            (path, "" if options["force"] else s.thumbnail_key)
+            for path, s in screenshots.items()
+        ]
+
+        created = unchanged = failed = 0
+        for path, key, data, seconds, error in process_many(
+            jobs, settings.THUMBNAIL_SIZE, options["workers"]
+        ):
+            s = screenshots[path]
+            if error:
+                failed += 1
+                self.stderr.write("{}: {}".format(s, error))
+                continue
+            if data is None:
+                unchanged += 1
+                continue
+
+            s.set_thumbnail(data, key)
+            # Use update() to avoid hashing the screenshot again in save()
+            Screenshot.objects.filter(pk=s.pk).update(
+                thumbnail=s.thumbnail.name, thumbnail_key=key
+            )
+            created += 1
+            if options["verbosity"] > 1:
+                self.stdout.write("{}: {:.3f}s".format(s, seconds))
+
+        self.stdout.write(
+            "Created {} thumbnails, {} unchanged, {} failed in {:.1f}s.".format(
+                created, unchanged, failed, time.time() - start
+            )
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wlscreens", "0002_auto_20190410_1737"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="screenshot",
+            name="thumbnail_key",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -1,13 +1,12 @@
 from django.db import models
 
 from django.template.defaultfilters import slugify
-from PIL import Image
-from io import BytesIO
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.files.storage import FileSystemStorage
 import os
 from django.conf import settings
 
+from wlscreens.thumbnails import thumbnail_key, render_thumbnail
 
 # Taken from django snippet 976
 
@@ -76,40 +75,31 @@ class Screenshot(models.Model):
         default=0,
         help_text="The position inside the category",
     )
+    # See wlscreens.thumbnails.thumbnail_key()
+    thumbnail_key = models.CharField(max_length=64, blank=True, editable=False)
 
     class Meta:
         unique_together = ("name", "category")
         ordering = ["-category__name", "position"]
 
+    def set_thumbnail(self, data, key):
+        """Store the png data as thumbnail."""
+
+        name = os.path.split(self.screenshot.name)[-1] + ".png"
+        self.thumbnail.save(
+            name, SimpleUploadedFile(name, data, content_type="image/png"), save=False
+        )
+        self.thumbnail_key = key
+
     def save(self, *args, **kwargs):
-        # Open original screenshot which we want to thumbnail using PIL's Image
-        # object
         try:
-            image = Image.open(self.screenshot)
-
-            # As of now, the uploaded image is of PngImageFile. PIL relies that
-            # this file is around in the future when we want to do anything
-            # with its data. That is not guaranteed here though, because this
-            # is a temporary file that django will delete at some point in
-            # time. We convert it into an in-memory file here to avoid this
-            # problem, in the same step we fix its mode to be RGB.
-            image = image.convert("RGB")
-
-            image.thumbnail(settings.THUMBNAIL_SIZE, Image.ANTIALIAS)
-
-            # Save the thumbnail
-            temp_handle = BytesIO()
-            image.save(temp_handle, "png")
-            image.close()
-            temp_handle.seek(0)
-
-            # Save to the thumbnail field
-            suf = SimpleUploadedFile(
-                os.path.split(self.screenshot.name)[-1],
-                temp_handle.read(),
-                content_type="image/png",
-            )
-            self.thumbnail.save(suf.name + ".png", suf, save=False)
+            # Create the thumbnail only if the screenshot or the size of
+            # thumbnails has changed
+            key = thumbnail_key(self.screenshot, settings.THUMBNAIL_SIZE)
+            if key != self.thumbnail_key or not self.thumbnail:
+                self.set_thumbnail(
+                    render_thumbnail(self.screenshot, settings.THUMBNAIL_SIZE), key
+                )
 
             # Save this photo instance
             super(Screenshot, self).save(*args, **kwargs)
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase as DjangoTest, override_settings
+from PIL import Image
+
+from wlscreens.models import Category, Screenshot
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestImportScreenshots(DjangoTest):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        Image.new("RGB", (640, 480)).save(os.path.join(self.dir, "Menu.png"))
+        Image.new("RGB", (800, 600)).save(os.path.join(self.dir, "Game.jpg"))
+        with open(os.path.join(self.dir, "Broken.png"), "wb") as f:
+            f.write(b"no image")
+
+    def _import(self):
+        out = StringIO()
+        call_command(
+            "import_screenshots",
+            self.dir,
+            "Build 22",
+            workers=1,
+            stdout=out,
+            stderr=StringIO(),
+        )
+        return out.getvalue()
+
+    def test_import_expectCorrectResult(self):
+        out = self._import()
+        self.assertIn("Imported 2 screenshots, 0 unchanged, 1 failed", out)
+        s = Screenshot.objects.get(name="Game", category__name="Build 22")
+        self.assertEqual(s.thumbnail.width, 160)
+        self.assertTrue(s.thumbnail_key)
+
+    def test_importTwice_expectUnchanged(self):
+        self._import()
+        out = self._import()
+        self.assertIn("Imported 0 screenshots, 2 unchanged", out)
+
+    def test_regenerate_expectCorrectResult(self):
+        self._import()
+        out = StringIO()
+        call_command("regenerate_thumbnails", workers=1, stdout=out)
+        self.assertIn("Created 0 thumbnails, 2 unchanged", out.getvalue())
+
+        call_command("regenerate_thumbnails", force=True, workers=1, stdout=out)
+        self.assertIn("Created 2 thumbnails, 0 unchanged", out.getvalue())
@@ -13,6 +13,7 @@ from django.conf import settings
 from django.test import TestCase as DjangoTest
 from django.db import IntegrityError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
 from io import BytesIO
 
 from unittest import TestCase
@@ -0,0 +1,76 @@
+"""Creation of screenshot thumbnails.
+
+The functions here are used by Screenshot.save() and by the management
+commands 'import_screenshots' and 'regenerate_thumbnails', which run them
+in a pool of processes. So this module must not use the database.
+
+"""
+
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+
+from PIL import Image
+
+
+def thumbnail_key(fileobj, size):
+    """Return a hash of the image content and the thumbnail size.
+
+    A thumbnail has to be recreated only if this key changes.
+
+    """
+    sha = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(64 * 1024), b""):
+        sha.update(chunk)
+    fileobj.seek(0)
+    sha.update(("%dx%d" % tuple(size)).encode())
+    return sha.hexdigest()
+
+
+def render_thumbnail(fileobj, size):
+    """Return the thumbnail of the image as png data."""
+
+    with Image.open(fileobj) as image:
+        # For JPEG images the decoder does most of the downscaling, which
+        # avoids decoding the full image
+        image.draft("RGB", size)
+        image = image.convert("RGB")
+        # reducing_gap lets PIL use the fast Image.reduce() before resampling
+        image.thumbnail(size, Image.LANCZOS, reducing_gap=2.0)
+
+        png = BytesIO()
+        image.save(png, "png")
+    return png.getvalue()
+
+
+def process(path, size, old_key=""):
+    """Create the thumbnail for the image file at path.
+
+    Returns a tuple (path, key, data, seconds, error). data is None if the
+    key equals old_key, that is the thumbnail is up to date.
+
+    """
+    start = time.time()
+    try:
+        with open(path, "rb") as f:
+            key = thumbnail_key(f, size)
+            data = None if key == old_key else render_thumbnail(f, size)
+    except (IOError, ValueError) as e:
+        return path, "", None, time.time() - start, str(e)
+    return path, key, data, time.time() - start, None
+
+
+def process_many(jobs, size, workers=None):
+    """Run process() for (path, old_key) pairs in a pool of processes.
+
+    Yields the results in the order they are finished.
+
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process, path, size, old_key) for path, old_key in jobs
+        ]
+        for future in as_completed(futures):
+            yield future.result()